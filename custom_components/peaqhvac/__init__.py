@@ -7,9 +7,11 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 
 from custom_components.peaqhvac.service.hub.hub import Hub
+from custom_components.peaqhvac.service.hvac.offset.offset_coordinator_factory import OffsetFactory
 
 from .const import DOMAIN, HVACBRAND_NIBE, LISTENER_FN_CLOSE, PLATFORMS
 from .service.models.config_model import ConfigModel
+from .service.models.enums.offset_strategy import OffsetStrategy
 from .services import async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
@@ -33,6 +35,7 @@ async def async_setup_entry(hass: HomeAssistant, config: ConfigEntry) -> bool:
     huboptions.heating.non_hours_water_boost = await async_get_existing_param(config, "non_hours_water_boost", [])
     huboptions.heating.demand_hours_water_boost = await async_get_existing_param(config, "demand_hours_water_boost", [])
     huboptions.weather_entity = await async_get_existing_param(config, "weather_entity", None)
+    huboptions.misc.offset_strategy = OffsetFactory.get_strategy(await async_get_existing_param(config, "offset_strategy", OffsetStrategy.Heuristic.value))
 
     huboptions.heating.low_dm = int((await async_get_existing_param(config, "low_degree_minutes", "-600")).replace(" ", ""))
     huboptions.heating.very_cold_temp = int((await async_get_existing_param(config, "very_cold_temp", "-12")).replace(" ", ""))
@@ -68,6 +71,9 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
+        hub = hass.data[DOMAIN].get("hub")
+        if hub is not None:
+            hub.stop()
         hass.data[DOMAIN].pop(entry.entry_id)
     return unload_ok
 
@@ -77,6 +77,7 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         _lowdm = await self._get_existing_param("low_degree_minutes", "-600")
         _verycoldtemp = await self._get_existing_param("very_cold_temp", "-12")
         _weather_entity = await self._get_existing_param("weather_entity", None)
+        _offset_strategy = await self._get_existing_param("offset_strategy", "heuristic")
 
         return self.async_show_form(
             step_id="init",
@@ -91,5 +92,6 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                 vol.Optional("low_degree_minutes", default=_lowdm): cv.string,
                 vol.Optional("very_cold_temp", default=_verycoldtemp): cv.string,
                 vol.Optional("weather_entity", default=_weather_entity): cv.string,
+                vol.Optional("offset_strategy", default=_offset_strategy): vol.In(["heuristic", "planner"]),
                 })
         )
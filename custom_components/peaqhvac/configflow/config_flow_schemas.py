@@ -16,5 +16,6 @@ OPTIONAL_SCHEMA = vol.Schema({
     vol.Optional("low_degree_minutes", default="-600"): cv.string,
     vol.Optional("very_cold_temp", default="-12"): cv.string,
     vol.Optional("weather_entity"): cv.string,
+    vol.Optional("offset_strategy", default="heuristic"): vol.In(["heuristic", "planner"]),
 })
 
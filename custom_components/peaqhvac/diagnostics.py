@@ -0,0 +1,18 @@
+"""Diagnostics support for peaqhvac."""
+from __future__ import annotations
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    hub = hass.data[DOMAIN]["hub"]
+    return {
+        "observer":        hub.observer.diagnostics(),
+        "loop_latency":    hub.loop_latency.metrics,
+        "state_batches":   hub.states.batcher.metrics,
+        "prognosis_cache": hub.prognosis.cache.metrics,
+        "weather_polling": hub.prognosis.poller.metrics,
+    }
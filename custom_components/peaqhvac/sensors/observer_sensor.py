@@ -0,0 +1,33 @@
+from custom_components.peaqhvac.sensors.sensorbase import SensorBase
+
+
+class ObserverSensor(SensorBase):
+    """Queue depth of the observer, with a summary of its metrics. Only set up when observer metrics are enabled."""
+    def __init__(self, hub, entry_id, name: str = "observer queue"):
+        self._attr_name = f"{hub.hubname} {name.capitalize()}"
+        super().__init__(hub, self._attr_name, entry_id)
+        self._state = 0
+        self._attributes = {}
+
+    @property
+    def state(self) -> int:
+        return self._state
+
+    @property
+    def icon(self) -> str:
+        return "mdi:tray-full"
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        return self._attributes
+
+    async def async_update(self) -> None:
+        observer = self._hub.observer
+        self._state = observer.queue_depth
+        self._attributes = {
+            "in_flight": observer.diagnostics()["in_flight"],
+            "overruns":  observer.overruns,
+            "p50_ms":    observer.latency.metrics["p50_ms"],
+            "p99_ms":    observer.latency.metrics["p99_ms"],
+            **observer.metrics.summary(),
+        }
@@ -8,6 +8,7 @@ from typing import Callable
 
 from custom_components.peaqhvac.const import LATEST_WATER_BOOST, NEXT_WATER_START
 from custom_components.peaqhvac.service.hub.hubsensors import HubSensors
+from custom_components.peaqhvac.service.hub.loop_latency import LoopLatencyMonitor
 from custom_components.peaqhvac.service.hub.state_changes import StateChanges
 from custom_components.peaqhvac.service.hub.weather_prognosis import \
     WeatherPrognosis
@@ -34,14 +35,34 @@ class Hub:
         self._is_initialized = False
         self.state_machine = hass
         self.trackerentities = []
-        self.observer = Observer(hass) #todo: move to creation factory
+        self.observer = Observer(
+            hass,
+            fan_out=hub_options.misc.observer_fan_out,
+            handler_timeout=hub_options.misc.observer_handler_timeout,
+            metrics=hub_options.misc.observer_metrics
+        ) #todo: move to creation factory
         self.options = hub_options
         self.peaqev_discovered: bool = self.get_peaqev()
         self.sensors = HubSensors(self, hub_options, hass, self.peaqev_discovered)
         self.states = StateChanges(self, hass)
         self.hvac = HvacFactory.create(hass, self.options, self, self.observer)
         self.update_system = UpdateSystem(hass, self, self.observer, self.hvac.set_operation_call_parameters)
-        self.spotprice = SpotPriceFactory.create(
+        self.spotprice = self._create_spotprice()
+
+        self.prognosis = WeatherPrognosis(hass, self.sensors.average_temp_outdoors, self.observer, self.options.weather_entity)
+        self.offset = OffsetFactory.create(self, observer=self.observer)
+        self.options.hub = self
+        self.loop_latency = LoopLatencyMonitor()
+
+    def stop(self) -> None:
+        self.observer.stop()
+        self.states.batcher.cancel()
+        self.prognosis.stop()
+        self.offset.stop()
+        self.loop_latency.stop()
+
+    def _create_spotprice(self):
+        return SpotPriceFactory.create(
             hub=self,
             observer=self.observer,
             system=PeaqSystem.PeaqHvac,
@@ -49,15 +70,12 @@ class Hub:
             is_active=True
         )
 
-        self.prognosis = WeatherPrognosis(hass, self.sensors.average_temp_outdoors, self.observer, self.options.weather_entity)
-        self.offset = OffsetFactory.create(self, observer=self.observer)
-        self.options.hub = self
-
     async def async_setup(self) -> None:
+        self.loop_latency.start()
         await self.async_setup_trackers()
         if self.prognosis.entity is not None:
             _LOGGER.debug("Weather-prognosis is enabled, will update weather.")
-            await self.prognosis.async_update_weather()
+            self.prognosis.start()
 
     async def async_setup_trackers(self):
         self.trackerentities.append(self.spotprice.entity)
@@ -89,7 +107,7 @@ class Hub:
         if entity_id is not None:
             try:
                 if old_state is None or old_state != new_state:
-                    await self.states.async_update_sensor(entity_id, new_state.state)
+                    self.states.queue_sensor(entity_id, new_state.state)
             except Exception as e:
                 _LOGGER.exception(f"Unable to handle data: {entity_id} old: {old_state}, new: {new_state}. Raised expection: {e}")
 
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+LOOP_LATENCY_INTERVAL = 1
+
+
+class LoopLatencyMonitor:
+    """
+    Measures how late the event loop runs a callback that is scheduled every interval.
+    Anything blocking the loop shows up as lag.
+    """
+    def __init__(self, interval: float = LOOP_LATENCY_INTERVAL):
+        self._interval = interval
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._handle: asyncio.TimerHandle | None = None
+        self._expected: float = 0
+        self.samples: int = 0
+        self.total_lag: float = 0
+        self.max_lag: float = 0
+
+    @property
+    def mean_lag(self) -> float:
+        return self.total_lag / self.samples if self.samples else 0
+
+    @property
+    def metrics(self) -> dict:
+        return {
+            "samples":     self.samples,
+            "mean_lag_ms": round(self.mean_lag * 1000, 2),
+            "max_lag_ms":  round(self.max_lag * 1000, 2),
+        }
+
+    @property
+    def is_running(self) -> bool:
+        return self._handle is not None
+
+    def start(self) -> None:
+        if self.is_running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._schedule()
+
+    def stop(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def reset(self) -> None:
+        self.samples = 0
+        self.total_lag = 0
+        self.max_lag = 0
+
+    def _schedule(self) -> None:
+        self._expected = self._loop.time() + self._interval
+        self._handle = self._loop.call_at(self._expected, self._tick)
+
+    def _tick(self) -> None:
+        lag = max(0.0, self._loop.time() - self._expected)
+        self.samples += 1
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+        self._schedule()
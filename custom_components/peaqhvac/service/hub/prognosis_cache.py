@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import threading
+from datetime import datetime
+
+PROGNOSIS_CACHE_SIZE = 16
+
+PrognosisKey = tuple[int, float, datetime]
+
+
+class PrognosisCache:
+    """
+    Hvac-prognoses keyed on (forecast version, temperature rounded to 0.1, hour). A new forecast gets a new version,
+    so a prognosis that was computed from an older forecast is never returned. The oldest entry is evicted first.
+    Only the key is rounded, a hit returns the prognosis computed from the first unrounded temperature of its bucket.
+    """
+    def __init__(self, maxsize: int = PROGNOSIS_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: dict[PrognosisKey, list] = {}
+        self._lock = threading.Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.computes: int = 0
+        self.compute_time: float = 0
+        self.max_compute_time: float = 0
+
+    @staticmethod
+    def key(version: int, temperature: float, hour: datetime) -> PrognosisKey:
+        return version, round(temperature, 1), hour
+
+    def get(self, key: PrognosisKey) -> list | None:
+        ret = self._entries.get(key)
+        if ret is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return ret
+
+    def put(self, key: PrognosisKey, prognosis: list, compute_time: float) -> None:
+        self.computes += 1
+        self.compute_time += compute_time
+        self.max_compute_time = max(self.max_compute_time, compute_time)
+        with self._lock:
+            self._entries[key] = prognosis
+            while len(self._entries) > self.maxsize:
+                del self._entries[next(iter(self._entries))]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0
+
+    @property
+    def metrics(self) -> dict:
+        return {
+            "hits":               self.hits,
+            "misses":             self.misses,
+            "hit_ratio":          round(self.hit_ratio, 3),
+            "size":               len(self._entries),
+            "computes":           self.computes,
+            "compute_ms_total":   round(self.compute_time * 1000, 2),
+            "compute_ms_mean":    round(self.compute_time * 1000 / self.computes, 3) if self.computes else 0,
+            "compute_ms_max":     round(self.max_compute_time * 1000, 3),
+        }
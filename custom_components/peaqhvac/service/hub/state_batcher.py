@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable
+
+from custom_components.peaqhvac.service.observer.models.dispatch_latency import \
+    DispatchLatency
+
+_LOGGER = logging.getLogger(__name__)
+
+BATCH_WINDOW = 0.25
+
+
+class StateChangeBatcher:
+    """
+    Collects state changes for a short window and processes them together, so that a burst of sensor updates runs
+    the downstream pipeline once. A later value for an entity that is already pending replaces the earlier one.
+    """
+    def __init__(self, async_process: Callable[[dict[str, str]], Awaitable], window: float = BATCH_WINDOW):
+        self._async_process = async_process
+        self.window = window
+        self._pending: dict[str, str] = {}
+        self._first_change: float | None = None
+        self._handle: asyncio.TimerHandle | None = None
+        self._lock = asyncio.Lock()
+        self._tasks: set[asyncio.Task] = set()
+        self.batches: int = 0
+        self.changes: int = 0
+        self.coalesced: int = 0
+        self.last_batch_size: int = 0
+        self.max_batch_size: int = 0
+        self.latency = DispatchLatency()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    @property
+    def metrics(self) -> dict:
+        processed = self.changes - self.coalesced - self.pending
+        return {
+            "batches":         self.batches,
+            "changes":         self.changes,
+            "coalesced":       self.coalesced,
+            "mean_batch_size": round(processed / self.batches, 2) if self.batches else 0,
+            "last_batch_size": self.last_batch_size,
+            "max_batch_size":  self.max_batch_size,
+            **self.latency.metrics,
+        }
+
+    def add(self, entity: str, value) -> None:
+        self.changes += 1
+        if entity in self._pending:
+            self.coalesced += 1
+        elif not self._pending:
+            self._first_change = time.monotonic()
+        self._pending[entity] = value
+        if self._handle is None:
+            self._handle = asyncio.get_running_loop().call_later(self.window, self._start_flush)
+
+    def cancel(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        for task in list(self._tasks):
+            task.cancel()
+        self._pending = {}
+
+    def _start_flush(self) -> None:
+        self._handle = None
+        task = asyncio.get_running_loop().create_task(self.async_flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def async_flush(self) -> None:
+        """Processes whatever is pending right away. Changes that arrive meanwhile go into the next batch."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        async with self._lock:
+            if not self._pending:
+                return
+            batch, first_change = self._pending, self._first_change
+            self._pending, self._first_change = {}, None
+            try:
+                await self._async_process(batch)
+            except Exception as e:
+                _LOGGER.exception(f"Unable to process state changes {list(batch)}: {e}")
+            finally:
+                self.batches += 1
+                self.last_batch_size = len(batch)
+                self.max_batch_size = max(self.max_batch_size, len(batch))
+                if first_change is not None:
+                    self.latency.add(time.monotonic() - first_change)
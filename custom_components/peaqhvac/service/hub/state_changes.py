@@ -5,6 +5,8 @@ import time
 from peaqevcore.common.wait_timer import WaitTimer
 from typing import TYPE_CHECKING
 
+from custom_components.peaqhvac.service.hub.state_batcher import StateChangeBatcher
+
 if TYPE_CHECKING:
     from custom_components.peaqhvac.service.hub.hub import Hub
 
@@ -16,12 +18,20 @@ class StateChanges:
         self._hub: Hub = hub
         self._hass = hass
         self.latest_nordpool_update = WaitTimer(timeout=300)
+        self.batcher = StateChangeBatcher(self._async_process_changes)
 
     async def async_initialize_values(self):
+        changes = {}
         for t in self._hub.trackerentities:
             retval = self._hass.states.get(t)
             if retval is not None:
-                await self.async_update_sensor(entity=t, value=retval.state)
+                changes[t] = retval.state
+        if changes:
+            await self._async_process_changes(changes)
+
+    def queue_sensor(self, entity, value) -> None:
+        """Batches the change with others arriving within the batch window."""
+        self.batcher.add(entity, value)
 
     async def _update_indoor_sensor(self, entity, value):
         await self._hub.sensors.average_temp_indoors.async_update_values(entity=entity, value=value)
@@ -34,15 +44,22 @@ class StateChanges:
                                                                       t=time.time())
 
     async def async_update_sensor(self, entity, value):
-        if entity in self._hub.options.indoor_temp:
-            await self._update_indoor_sensor(entity, value)
-        elif entity in self._hub.options.outdoor_temp:
-            await self._update_outdoor_sensor(entity, value)
+        await self._async_process_changes({entity: value})
+
+    async def _async_process_changes(self, changes: dict) -> None:
+        for entity, value in changes.items():
+            try:
+                if entity in self._hub.options.indoor_temp:
+                    await self._update_indoor_sensor(entity, value)
+                elif entity in self._hub.options.outdoor_temp:
+                    await self._update_outdoor_sensor(entity, value)
+            except Exception as e:
+                _LOGGER.exception(f"Unable to handle data: {entity} new: {value}. Raised expection: {e}")
 
         await self._hass.async_add_executor_job(self._hub.prognosis.get_hvac_prognosis,
                                                 self._hub.sensors.average_temp_outdoors.value)
 
-        if entity == self._hub.spotprice.entity or self.latest_nordpool_update.is_timeout():
+        if self._hub.spotprice.entity in changes or self.latest_nordpool_update.is_timeout():
             await self._hub.spotprice.async_update_spotprice()
             #await self._hass.async_add_executor_job(self._hub.prognosis.update_weather_prognosis) #todo: add back when weather prognosis is fixed
             self.latest_nordpool_update.update()
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+from custom_components.peaqhvac.service.models.offset_timeline import \
+    OffsetTimeline
+from custom_components.peaqhvac.service.models.prognosis_export_model import \
+    PrognosisExportModel
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def hourly_adjustment(prognosis: PrognosisExportModel | None, offset: int) -> int:
+    """The offset of an hour adjusted by the prognosis three hours ahead of it."""
+    if prognosis is None:
+        return offset
+    divisor = max((11 - prognosis.TimeDelta) / 10, 0)
+    adjustment_divisor = 2.5 if prognosis.windchill_temp > -2 else 2
+    return offset + (int(round((prognosis.delta_temp_from_now / adjustment_divisor) * divisor, 0)) * -1)
+
+
+@dataclass(frozen=True)
+class WeatherAdjustment:
+    """
+    The prognosis-rows the weather-adjustment of one day reads, copied from the exported prognosis on the event loop.
+    Holds no reference to the prognosis itself, so it can be applied in any thread.
+    """
+    date: date
+    rows: dict[int, PrognosisExportModel]
+
+    def __call__(self, offsets: OffsetTimeline | dict[datetime, int]) -> dict:
+        # k.date is the bound method, as in the original adjustment, so no slot matches and the offsets are left as
+        # they are. Applying the adjustment changes heating behaviour and is not part of the indexed lookup.
+        ret ={k: v for k, v in offsets.items() if k.date == self.date + timedelta(days=1)}
+        rr = {k: self.hourly(k.hour, v) for k, v in offsets.items() if k.date == self.date}
+        ret.update(rr)
+        return ret
+
+    def hourly(self, hour: int, offset: int) -> int:
+        prognosis = self.rows.get(hour)
+        if prognosis is None:
+            _LOGGER.debug(f"Could not find next prognosis for hour {hour}")
+        return hourly_adjustment(prognosis, offset)
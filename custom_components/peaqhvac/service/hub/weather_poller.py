@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable
+
+from custom_components.peaqhvac.service.models.enums.weather_poll_result import \
+    WeatherPollResult
+
+_LOGGER = logging.getLogger(__name__)
+
+WEATHER_POLL_MIN = 30
+WEATHER_POLL_MAX = 1800
+WEATHER_POLL_FAILURE_MAX = 3600
+
+
+class WeatherPoller:
+    """
+    Calls the weather service on an adaptive schedule. After startup or a changed forecast it polls every min_interval,
+    then doubles the interval for every poll that returns the same forecast, up to max_interval. Failed polls back off
+    the same way up to failure_max_interval. refresh() polls right away, but never sooner than min_interval after the
+    previous call.
+    """
+    def __init__(
+            self,
+            async_poll: Callable[[], Awaitable[WeatherPollResult]],
+            min_interval: float = WEATHER_POLL_MIN,
+            max_interval: float = WEATHER_POLL_MAX,
+            failure_max_interval: float = WEATHER_POLL_FAILURE_MAX
+    ):
+        self._async_poll = async_poll
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.failure_max_interval = failure_max_interval
+        self.interval: float = min_interval
+        self.failures: int = 0
+        self.polls: int = 0
+        self.changes: int = 0
+        self.failed: int = 0
+        self.refreshes: int = 0
+        self._calls: deque[float] = deque()
+        self._last_call: float | None = None
+        self._last_success: float | None = None
+        self._last_change: float | None = None
+        self._handle: asyncio.TimerHandle | None = None
+        self._task: asyncio.Task | None = None
+        self._poll_again: bool = False
+
+    @property
+    def is_running(self) -> bool:
+        return self._handle is not None or self._task is not None
+
+    @property
+    def calls_per_hour(self) -> int:
+        self._prune(time.monotonic())
+        return len(self._calls)
+
+    @property
+    def staleness(self) -> float | None:
+        """Seconds since the last successful poll, None if there has not been one."""
+        return None if self._last_success is None else time.monotonic() - self._last_success
+
+    @property
+    def metrics(self) -> dict:
+        now = time.monotonic()
+        staleness = self.staleness
+        return {
+            "interval_s":      self.interval,
+            "polls":           self.polls,
+            "changes":         self.changes,
+            "failed":          self.failed,
+            "failures_in_row": self.failures,
+            "refreshes":       self.refreshes,
+            "calls_per_hour":  self.calls_per_hour,
+            "staleness_s":     round(staleness, 1) if staleness is not None else None,
+            "since_change_s":  round(now - self._last_change, 1) if self._last_change is not None else None,
+        }
+
+    def start(self) -> None:
+        """Starts the first poll as a task, which schedules the following polls. Does not wait for the weather service."""
+        if self.is_running:
+            return
+        self._start()
+
+    def stop(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def refresh(self) -> None:
+        self.refreshes += 1
+        self._schedule(self._refresh_delay())
+
+    def _refresh_delay(self) -> float:
+        if self._last_call is None:
+            return 0
+        return max(0.0, self._last_call + self.min_interval - time.monotonic())
+
+    def _schedule(self, delay: float) -> None:
+        """Schedules the next poll in delay seconds, unless one is already due sooner."""
+        loop = asyncio.get_running_loop()
+        if self._handle is not None:
+            if self._handle.when() <= loop.time() + delay:
+                return
+            self._handle.cancel()
+        self._handle = loop.call_later(delay, self._start)
+
+    def _start(self) -> None:
+        self._handle = None
+        if self._task is not None:
+            self._poll_again = True
+            return
+        self._task = asyncio.get_running_loop().create_task(self._async_run())
+
+    async def _async_run(self) -> None:
+        now = time.monotonic()
+        self._last_call = now
+        self._calls.append(now)
+        self._prune(now)
+        self.polls += 1
+        try:
+            result = await self._async_poll()
+        except Exception as e:
+            _LOGGER.exception(f"Weather poll failed: {e}")
+            result = WeatherPollResult.Failed
+        self._update(result, time.monotonic())
+        self._task = None
+        if self._poll_again:
+            self._poll_again = False
+            self._schedule(self._refresh_delay())
+        self._schedule(self.interval)
+
+    def _update(self, result: WeatherPollResult, now: float) -> None:
+        match result:
+            case WeatherPollResult.Changed:
+                self.changes += 1
+                self.failures = 0
+                self._last_success = self._last_change = now
+                self.interval = self.min_interval
+            case WeatherPollResult.Unchanged:
+                self._last_success = now
+                self.interval = self.min_interval if self.failures else min(self.interval * 2, self.max_interval)
+                self.failures = 0
+            case _:
+                self.failed += 1
+                if not self.failures:
+                    self.interval = self.min_interval
+                self.failures += 1
+                self.interval = min(self.interval * 2, self.failure_max_interval)
+
+    def _prune(self, now: float) -> None:
+        while self._calls and self._calls[0] < now - 3600:
+            self._calls.popleft()
@@ -1,13 +1,29 @@
 from __future__ import annotations
 
 import logging
+import time
 from datetime import datetime, timedelta, timezone
+from operator import itemgetter
 from typing import Tuple
 
 import homeassistant.helpers.template as template
-from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.core import callback
+from homeassistant.helpers.event import (async_track_state_change_event,
+                                         async_track_time_interval)
 from peaqevcore.common.models.observer_types import ObserverTypes
 
+from custom_components.peaqhvac.service.hub.prognosis_cache import \
+    PrognosisCache
+from custom_components.peaqhvac.service.hub.weather_adjustment import (
+    WeatherAdjustment, hourly_adjustment)
+from custom_components.peaqhvac.service.hub.weather_poller import \
+    WeatherPoller
+from custom_components.peaqhvac.service.models.enums.weather_poll_result import \
+    WeatherPollResult
+from custom_components.peaqhvac.service.models.offset_timeline import \
+    OffsetTimeline
+from custom_components.peaqhvac.service.models.prognosis_columns import \
+    PrognosisColumns
 from custom_components.peaqhvac.service.models.prognosis_export_model import \
     PrognosisExportModel
 from custom_components.peaqhvac.service.models.weather_object import \
@@ -15,27 +31,71 @@ from custom_components.peaqhvac.service.models.weather_object import \
 
 _LOGGER = logging.getLogger(__name__)
 
+FORECAST_FIELDS = (
+    "datetime", "condition", "temperature", "wind_speed", "wind_bearing", "precipitation_probability", "precipitation"
+)
+_forecast_values = itemgetter(*FORECAST_FIELDS)
+
 
 class WeatherPrognosis:
     def __init__(self, hass, average_temp_outdoors, observer, weather_entity: str):
         self._hass = hass
         self.average_temp_outdoors = average_temp_outdoors
         self.observer = observer
-        self.prognosis_list: list[WeatherObject] = []
+        self.forecast_version: int = 0
+        self._prognosis_list: list[WeatherObject] = []
+        self._forecast_fingerprint: int | None = None
+        self.cache = PrognosisCache()
         self._hvac_prognosis_list: list = []
         self._weather_export_model: list = []
+        self._weather_export_index: dict[datetime, int] = {}
         self._current_temperature = 1000
         self.entity = weather_entity
+        self.poller = WeatherPoller(self.async_update_weather)
+        self._unsubscribers: list = []
         _LOGGER.debug("WeatherPrognosis initialized with entity: %s", self.entity)
-        if self.entity is not None:
-            async_track_time_interval(self._hass, self.async_update_weather, timedelta(seconds=30))
+
+    def start(self) -> None:
+        """
+        Starts polling the forecast in the background. A changed forecast updates the export model right away, and it
+        is refreshed every 30 seconds between polls.
+        """
+        self.poller.start()
+        self._unsubscribers = [
+            async_track_time_interval(self._hass, self.async_update_export_model, timedelta(seconds=30)),
+            async_track_state_change_event(self._hass, [self.entity], self._on_weather_change),
+        ]
+
+    def stop(self) -> None:
+        self.poller.stop()
+        for unsub in self._unsubscribers:
+            unsub()
+        self._unsubscribers = []
+
+    @callback
+    def _on_weather_change(self, event) -> None:
+        self.poller.refresh()
 
     @property
     def prognosis(self) -> list:
         return self._weather_export_model
 
-    async def async_update_weather(self, *args):
-        await self.update_weather_prognosis()
+    @property
+    def prognosis_list(self) -> list[WeatherObject]:
+        return self._prognosis_list
+
+    @prognosis_list.setter
+    def prognosis_list(self, val: list[WeatherObject]):
+        self._prognosis_list = val
+        self.forecast_version += 1
+
+    async def async_update_weather(self, *args) -> WeatherPollResult:
+        result = await self.update_weather_prognosis()
+        if result is WeatherPollResult.Changed:
+            await self.async_update_export_model()
+        return result
+
+    async def async_update_export_model(self, *args):
         if len(self._hvac_prognosis_list) > 0:
             ret = self._hvac_prognosis_list
         else:
@@ -48,10 +108,16 @@ class WeatherPrognosis:
                 ret = []
         if ret != self._weather_export_model:
             await self.observer.async_broadcast(ObserverTypes.PrognosisChanged)
-            self._weather_export_model = ret
+            self.set_export_model(ret)
             _LOGGER.debug("Weather-prognosis updated", ret)
 
-    async def update_weather_prognosis(self):
+    def set_export_model(self, prognosis: PrognosisColumns | list[PrognosisExportModel]) -> None:
+        """Sets the exported prognosis and indexes it on the UTC start of each hour."""
+        dts = prognosis.DT if isinstance(prognosis, PrognosisColumns) else [p.DT for p in prognosis]
+        self._weather_export_model = prognosis
+        self._weather_export_index = {dt.astimezone(timezone.utc): idx for idx, dt in enumerate(dts)}
+
+    async def update_weather_prognosis(self) -> WeatherPollResult:
         try:
             ret = await self._hass.services.async_call(
                 "weather",
@@ -61,130 +127,130 @@ class WeatherPrognosis:
                 return_response=True
             )
         except Exception as e:
-            _LOGGER.error(f"Could not get weather-prognosis: {e}")
-            return
-        if ret is not None:
-            try:
-                ret_attr = ret.get(self.entity, {}).get("forecast", [])
-                if len(ret_attr):
-                    await self.async_set_prognosis(ret_attr)
-                else:
-                    _LOGGER.error(
-                        f"Wether prognosis cannot be updated :({len(ret_attr)})"
-                    )
-            except Exception as e:
-                _LOGGER.error(f"Could not update weather-prognosis: {e}")
-                return
-        else:
-            _LOGGER.error("could not get weather-prognosis.")
+            self._log_poll_failure(f"Could not get weather-prognosis: {e}")
+            return WeatherPollResult.Failed
+        if ret is None:
+            self._log_poll_failure("could not get weather-prognosis.")
+            return WeatherPollResult.Failed
+        try:
+            ret_attr = ret.get(self.entity, {}).get("forecast", [])
+            if not len(ret_attr):
+                self._log_poll_failure(f"Wether prognosis cannot be updated :({len(ret_attr)})")
+                return WeatherPollResult.Failed
+            changed = await self.async_set_prognosis(ret_attr)
+        except Exception as e:
+            self._log_poll_failure(f"Could not update weather-prognosis: {e}")
+            return WeatherPollResult.Failed
+        if changed is None:
+            return WeatherPollResult.Failed
+        if self.poller.failures:
+            _LOGGER.info(f"Weather-prognosis is available again after {self.poller.failures} failed attempts.")
+        return WeatherPollResult.Changed if changed else WeatherPollResult.Unchanged
 
-    def get_weatherprognosis_adjustment(self, offsets:dict[datetime, int]) -> dict:
-        ret = {k:v for k,v in offsets.items() if k.date == datetime.now().date()+timedelta(days=1)}
-        rr = {k:self._get_weatherprognosis_hourly_adjustment(k.hour, v) for k,v in offsets.items() if k.date == datetime.now().date()}
-        ret.update(rr)
-        return ret
+    def _log_poll_failure(self, message: str) -> None:
+        """Logs the first failure in a row as an error, the following ones while backing off only on debug."""
+        _LOGGER.log(logging.DEBUG if self.poller.failures else logging.ERROR, message)
+
+    def get_weatherprognosis_adjustment(self, offsets: OffsetTimeline | dict[datetime, int]) -> dict:
+        return self.adjustment_snapshot()(offsets)
+
+    def adjustment_snapshot(self) -> WeatherAdjustment:
+        """Copies the prognosis-rows today's weather-adjustment reads, so it can be applied off the event loop."""
+        now = datetime.now()
+        rows = {}
+        for hour in range(24):
+            row = self._get_next_prognosis(now, hour)
+            if row is not None:
+                rows[hour] = row
+        return WeatherAdjustment(now.date(), rows)
 
-    def get_hvac_prognosis(self, current_temperature: float) -> list:
-        ret = []
+    def get_hvac_prognosis(self, current_temperature: float) -> PrognosisColumns | list:
         try:
             self._current_temperature = float(current_temperature)
         except Exception as e:
             _LOGGER.warning(f"Could not parse temperature as float: {e}")
-            return ret
-        corrected_temp_delta = 0
+            return []
         now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        key = self.cache.key(self.forecast_version, self._current_temperature, now)
+        ret = self.cache.get(key)
+        if ret is None:
+            start = time.perf_counter()
+            ret = self._compute_hvac_prognosis(self._current_temperature, now)
+            if not ret:
+                return ret
+            self.cache.put(key, ret, time.perf_counter() - start)
+        self._hvac_prognosis_list = ret
+        return ret
 
-        valid_progs = [p for idx, p in enumerate(self.prognosis_list) if p.DT >= now]
+    def _compute_hvac_prognosis(self, temperature: float, now: datetime) -> PrognosisColumns | list:
+        """
+        Corrects the forecast from now on towards the current temperature, decaying over the first four hours, and
+        computes the windchill of every hour. The forecast-hour of now itself only sets the correction.
+        """
+        valid_progs = [p for p in self.prognosis_list if p.DT >= now]
         if len(valid_progs) == 0:
-            return ret
+            return []
+        dts, temps, corrected, winds, hours = [], [], [], [], []
+        corrected_temp_delta = 0
         for p in valid_progs:
-            c = p.DT - now
-            if c.seconds == 0:
-                corrected_temp_delta = round(self._current_temperature - p.Temperature, 2)
+            seconds = (p.DT - now).seconds
+            if seconds == 0:
+                corrected_temp_delta = round(temperature - p.Temperature, 2)
                 continue
-
-            temp = self._get_temp(p, corrected_temp_delta, c)
-            hourdiff = int(c.seconds / 3600)
-            hour_prognosis = PrognosisExportModel(
-                prognosis_temp=p.Temperature,
-                corrected_temp=temp,
-                windchill_temp=self._correct_temperature_for_windchill(temp, p.Wind_Speed),
-                DT=p.DT,
-                TimeDelta=hourdiff,
-                _base_temp = self._current_temperature
-            )
-            #_LOGGER.debug(f"Hour prognosis: {hour_prognosis.prognosis_temp}, {hour_prognosis.corrected_temp}, {hour_prognosis.DT}, {hour_prognosis.TimeDelta}")
-            ret.append(hour_prognosis)
-
-        self._hvac_prognosis_list = ret
-        return ret
-
-    @staticmethod
-    def _get_temp(p, corrected_temp_delta, c):
-        if 3600 <= c.seconds <= 14400:
-            decay_factor = 1 / (c.seconds / 3600)
-            corr = corrected_temp_delta * decay_factor
-            t3 = p.Temperature + corr
-            return round(t3, 1)
-        return p.Temperature
+            dts.append(p.DT)
+            temps.append(p.Temperature)
+            winds.append(p.Wind_Speed)
+            hours.append(int(seconds / 3600))
+            if 3600 <= seconds <= 14400:
+                corrected.append(round(p.Temperature + corrected_temp_delta * (1 / (seconds / 3600)), 1))
+            else:
+                corrected.append(p.Temperature)
+        return PrognosisColumns(dts, temps, corrected, self._windchill(corrected, winds), hours, temperature)
 
     def _get_weatherprognosis_hourly_adjustment(self, hour, offset) -> int:
         _LOGGER.debug(f"Getting weatherprognosis adjustment for hour {hour} with offset {offset}")
         try:
-            now = datetime.now().replace(hour=hour, minute=0, second=0, microsecond=0)
-            proghour = now
-            if now.minute > 30:
-                proghour = now + timedelta(hours=1)
-            proghour = proghour.astimezone(timezone.utc)
-            _next_prognosis = self._get_two_hour_prog(proghour)
-            ret = offset
-            if _next_prognosis is not None and int(hour) >= now.hour:
-                divisor = max((11 - _next_prognosis.TimeDelta) / 10, 0)
-                adjustment_divisor = 2.5 if _next_prognosis.windchill_temp > -2 else 2
-                adj = (int(round((_next_prognosis.delta_temp_from_now / adjustment_divisor) * divisor, 0)) * -1)
-                ret = offset + adj
-            else:
-                _LOGGER.debug(f"Could not find next prognosis for hour {hour}")
-            return ret
+            return hourly_adjustment(self._get_next_prognosis(datetime.now(), hour), offset)
         except Exception as e:
             _LOGGER.error(f"Could not get weatherprognosis adjustment: {e}")
             return offset
 
-    async def async_set_prognosis(self, import_list: list):
+    async def async_set_prognosis(self, import_list: list) -> bool | None:
+        """
+        Parses the forecast, unless it is the same as the previous one.
+        Returns whether the forecast changed, or None if it could not be parsed.
+        """
         try:
-            ret = []
-            for i in import_list:
-                ret.append(
-                    WeatherObject(
-                        _DTstr=i["datetime"],
-                        WeatherCondition=i["condition"],
-                        Temperature=i["temperature"],
-                        Wind_Speed=i["wind_speed"],
-                        Wind_Bearing=i["wind_bearing"],
-                        Precipitation_Probability=i["precipitation_probability"],
-                        Precipitation=i["precipitation"],
-                    )
-                )
+            values = [_forecast_values(i) for i in import_list]
+            fingerprint = hash(tuple(values))
+            if fingerprint == self._forecast_fingerprint:
+                return False
+            ret = [WeatherObject(*v) for v in values]
+            self._forecast_fingerprint = fingerprint
             if ret != self.prognosis_list:
                 self.prognosis_list = ret
                 await self.observer.async_broadcast(ObserverTypes.PrognosisChanged)
+                return True
+            return False
         except Exception as e:
             _LOGGER.error(f"Could not finalize _set_prognosis: {e}")
+            return None
 
     @staticmethod
-    def _correct_temperature_for_windchill(
-            temp: float, windspeed: float
-    ) -> float:
-        windspeed_corrected = windspeed
-        ret = 13.12
-        ret += 0.6215 * temp
-        ret -= 11.37 * windspeed_corrected**0.16
-        ret += 0.3965 * temp * windspeed_corrected**0.16
-        return round(ret, 1)
+    def _windchill(temps: list[float], windspeeds: list[float]) -> list[float]:
+        powers = [w ** 0.16 for w in windspeeds]
+        return [round(13.12 + 0.6215 * t - 11.37 * w + 0.3965 * t * w, 1) for t, w in zip(temps, powers)]
 
-    def _get_two_hour_prog(self, thishour: datetime) -> PrognosisExportModel | None:
-        for p in self.prognosis:
-            c = timedelta.total_seconds(p.DT - thishour)
-            if c == 10800:
-                return p
+    def _get_next_prognosis(self, now: datetime, hour: int) -> PrognosisExportModel | None:
+        now = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+        proghour = now
+        if now.minute > 30:
+            proghour = now + timedelta(hours=1)
+        _next_prognosis = self._get_two_hour_prog(proghour.astimezone(timezone.utc))
+        if _next_prognosis is not None and int(hour) >= now.hour:
+            return _next_prognosis
         return None
+
+    def _get_two_hour_prog(self, thishour: datetime) -> PrognosisExportModel | None:
+        idx = self._weather_export_index.get(thishour + timedelta(hours=3))
+        return None if idx is None else self._weather_export_model[idx]
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import logging
+from collections import OrderedDict
+from datetime import datetime
+
+from custom_components.peaqhvac.service.models.enums.hvac_presets import HvacPresets
+
+_LOGGER = logging.getLogger(__name__)
+
+OFFSET_CACHE_SIZE = 8
+
+
+class OffsetCache:
+    """Bounded LRU-cache for calculated raw offsets, keyed on the inputs of the calculation"""
+    def __init__(self, maxsize: int = OFFSET_CACHE_SIZE):
+        self._maxsize = maxsize
+        self._data: OrderedDict[tuple, dict] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @staticmethod
+    def make_key(
+            prices: list[float],
+            prices_tomorrow: list[float],
+            tolerance: int | None,
+            indoors_preset: HvacPresets,
+            min_price: float,
+            dt: datetime
+    ) -> tuple:
+        return (
+            tuple(prices or ()),
+            tuple(prices_tomorrow or ()),
+            tolerance,
+            indoors_preset,
+            min_price,
+            dt.replace(minute=0, second=0, microsecond=0)
+        )
+
+    def get(self, key: tuple) -> dict | None:
+        ret = self._data.get(key)
+        if ret is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return ret
+
+    def put(self, key: tuple, value: dict) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    @property
+    def info(self) -> dict:
+        return {
+            "hits":    self.hits,
+            "misses":  self.misses,
+            "size":    len(self._data),
+            "maxsize": self._maxsize,
+        }
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable
+
+from custom_components.peaqhvac.service.hvac.offset.offset_planner import \
+    planned_offsets
+from custom_components.peaqhvac.service.hvac.offset.offset_utils import (
+    deviation_timeline, offset_per_day)
+from custom_components.peaqhvac.service.hvac.offset.peakfinder import \
+    smooth_transitions
+from custom_components.peaqhvac.service.models.enums.hvac_presets import \
+    HvacPresets
+from custom_components.peaqhvac.service.models.enums.offset_strategy import \
+    OffsetStrategy
+from custom_components.peaqhvac.service.models.offset_timeline import OffsetTimeline
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class OffsetSnapshot:
+    """
+    The inputs of an offset calculation, copied on the event loop.
+    Nothing in here refers back to the hub, so the calculation can run in any thread. The weather-adjustment is a
+    WeatherAdjustment holding its own copy of the prognosis-rows it reads.
+    """
+    prices: tuple[float, ...]
+    prices_tomorrow: tuple[float, ...]
+    min_price: float
+    tolerance: int | None
+    indoors_preset: HvacPresets
+    now: datetime
+    weather_adjustment: Callable[[dict], dict] | None = None
+    strategy: OffsetStrategy = OffsetStrategy.Heuristic
+
+    @property
+    def all_prices(self) -> list[float]:
+        return [*self.prices, *self.prices_tomorrow]
+
+
+def clamp_and_smooth(offsets: OffsetTimeline | dict, tolerance: int | None) -> OffsetTimeline:
+    tolerance = tolerance if tolerance is not None else 3
+    ret = OffsetTimeline.from_mapping(offsets)
+    ret.clamp(-tolerance, tolerance)
+    return smooth_transitions(vals=ret, tolerance=tolerance)
+
+
+def calculate_raw_offsets(snapshot: OffsetSnapshot) -> OffsetTimeline | dict:
+    try:
+        all_prices = snapshot.all_prices
+        deviations = deviation_timeline(all_prices, snapshot.now, snapshot.min_price)
+        calculate = planned_offsets if snapshot.strategy is OffsetStrategy.Planner else offset_per_day
+        offsets = calculate(
+            all_prices=all_prices,
+            day_values=deviations,
+            tolerance=snapshot.tolerance,
+            indoors_preset=snapshot.indoors_preset,
+        )
+        return clamp_and_smooth(offsets, snapshot.tolerance)
+    except Exception as e:
+        _LOGGER.exception(f"Exception while trying to calculate offset: {e}")
+        return {}
+
+
+def calculate_offsets(snapshot: OffsetSnapshot, raw: OffsetTimeline | dict | None = None) -> tuple:
+    """Returns (raw, calculated) offsets. A cached raw result is reused and only the weather-stage is run."""
+    if raw is None:
+        raw = calculate_raw_offsets(snapshot)
+    calculated = raw
+    if snapshot.weather_adjustment is not None and raw:
+        try:
+            weather_dict = snapshot.weather_adjustment(raw)
+            if weather_dict:
+                calculated = clamp_and_smooth(weather_dict, snapshot.tolerance)
+        except Exception as e:
+            _LOGGER.warning(f"Unable to calculate prognosis-offsets. Setting normal calculation: {e}")
+    return raw, calculated
@@ -1,38 +1,52 @@
+import asyncio
 import logging
 from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from peaqevcore.common.models.observer_types import ObserverTypes
 from peaqevcore.services.hourselection.hoursselection import Hoursselection
-from custom_components.peaqhvac.service.hvac.offset.offset_utils import (
-    max_price_lower_internal, offset_per_day, set_offset_dict)
-from custom_components.peaqhvac.service.hvac.offset.peakfinder import (
-    identify_peaks, smooth_transitions)
+from custom_components.peaqhvac.service.hvac.offset.offset_cache import OffsetCache
+from custom_components.peaqhvac.service.hvac.offset.offset_calculation import (
+    OffsetSnapshot, calculate_offsets)
+from custom_components.peaqhvac.service.hvac.offset.offset_utils import \
+    max_price_lower_internal
+from custom_components.peaqhvac.service.hvac.offset.peakfinder import \
+    identify_peaks
+from custom_components.peaqhvac.service.hvac.offset.recalculation_scheduler import RecalculationScheduler
+from custom_components.peaqhvac.service.models.enums.offset_strategy import OffsetStrategy
 from custom_components.peaqhvac.service.models.offset_model import OffsetModel
+from custom_components.peaqhvac.service.models.offset_timeline import OffsetTimeline
 from custom_components.peaqhvac.service.observer.iobserver_coordinator import IObserver
 from homeassistant.helpers.event import async_track_time_interval
 
 _LOGGER = logging.getLogger(__name__)
 
+OFFSET_EXECUTOR_WORKERS = 1
+
 class OffsetCoordinator:
     """The class that provides the offsets for the hvac"""
-    def __init__(self, hub, observer: IObserver, hours_type: Hoursselection = None): #type: ignore
+    def __init__(self, hub, observer: IObserver, hours_type: Hoursselection = None, strategy: OffsetStrategy = OffsetStrategy.Heuristic): #type: ignore
         self._hub = hub
+        self.strategy = strategy
         self.observer = observer
         self.model = OffsetModel(hub)
         self.hours = hours_type
         self._current_raw_offset: int|None = None
         self.latest_raw_offset_update_hour: int = -1
+        self._offset_cache = OffsetCache()
+        self._recalculation = RecalculationScheduler(self._async_recalculate_offset)
+        self._executor: ThreadPoolExecutor | None = None
         self._initialize_observers()
-        async_track_time_interval(
+        self._unsub_interval = async_track_time_interval(
             self._hub.state_machine, self.async_create_current_raw_offset, timedelta(seconds=20)
         )
         #self.async_create_current_raw_offset()
 
     def _initialize_observers(self):
         self.observer.add(ObserverTypes.PrognosisChanged, self.async_update_prognosis)
-        self.observer.add(ObserverTypes.HvacPresetChanged, self.async_set_offset)
-        self.observer.add(ObserverTypes.SetTemperatureChanged, self.async_set_offset)
-        self.observer.add("ObserverTypes.OffsetPreRecalculation", self.async_set_offset)
+        self.observer.add(ObserverTypes.HvacPresetChanged, self.async_request_offset)
+        self.observer.add(ObserverTypes.SetTemperatureChanged, self.async_request_offset)
+        self.observer.add("ObserverTypes.OffsetPreRecalculation", self.async_request_offset)
 
     @property
     @abstractmethod
@@ -53,6 +67,14 @@ class OffsetCoordinator:
     def current_offset(self) -> int|None:
         return self._current_raw_offset
 
+    @property
+    def offset_cache_info(self) -> dict:
+        return self._offset_cache.info
+
+    @property
+    def recalculation_metrics(self) -> dict:
+        return self._recalculation.metrics
+
     async def async_update_raw_offset(self, val: int) -> None:
         if self._current_raw_offset != val:
             self._current_raw_offset = val
@@ -60,84 +82,97 @@ class OffsetCoordinator:
             await self.observer.async_broadcast(ObserverTypes.OffsetRecalculation, val)
 
     async def async_create_current_raw_offset(self, *args) -> None:
-        ret = 0
-        initialized = False
-        try:
-            if self.model.raw_offsets:
-                latest_key = max((key for key in self.model.raw_offsets if key <= datetime.now()), default=None)
-                if latest_key is not None:
-                    ret = self.model.raw_offsets[latest_key]
-                    initialized = True
-        except KeyError as e:
-            _LOGGER.error(f"Unable to get current offset: {e}. raw_offsets: {self.model.raw_offsets}")
-        finally:
-            if self.current_offset is not None or initialized:
-                if self.current_offset != ret:
-                   await self.async_set_offset()
-                await self.async_update_raw_offset(ret)
+        latest = self.model.raw_offset_at(datetime.now())
+        ret = latest if latest is not None else 0
+        if self.current_offset is not None or latest is not None:
+            if self.current_offset != ret:
+                await self.async_set_offset()
+            await self.async_update_raw_offset(ret)
 
     async def async_update_prognosis(self) -> None:
         self.model.prognosis = self._hub.prognosis.prognosis
-        await self.async_set_offset()
+        await self.async_request_offset()
 
     def max_price_lower(self, tempdiff: float) -> bool:
         return max_price_lower_internal(tempdiff, self.model.peaks_today)
 
-    async def async_update_offset(self, weather_adjusted_today: dict | None = None) -> dict:
-        try:
-            all_values = await set_offset_dict(self.prices + self.prices_tomorrow, datetime.now(), self.min_price, {})
-            offsets_per_day = await self.async_calculate_offset_per_day(all_values, weather_adjusted_today)
-            tolerance = self.model.tolerance if self.model.tolerance is not None else 3
-            for k, v in offsets_per_day.items():
-                if v > tolerance:
-                    offsets_per_day[k] = tolerance
-                elif v < -tolerance:
-                    offsets_per_day[k] = -tolerance
-            return smooth_transitions(vals=offsets_per_day, tolerance=tolerance)
-        except Exception as e:
-            _LOGGER.exception(f"Exception while trying to calculate offset: {e}")
-            return {}
-
-    async def async_calculate_offset_per_day(self, day_values: dict, weather_adjusted_today: dict | None = None) -> dict:
-        if weather_adjusted_today is None:
-            indoors_preset = self._hub.sensors.set_temp_indoors.preset
-            return offset_per_day(
-                all_prices=self.prices + self.prices_tomorrow,
-                day_values=day_values,
-                tolerance=self.model.tolerance,
-                indoors_preset=indoors_preset,
+    async def async_update_offset(self) -> OffsetTimeline | dict:
+        raw, _ = await self._async_calculate(self._create_snapshot(with_weather=False))
+        return raw
+
+    def _create_snapshot(self, with_weather: bool = True) -> OffsetSnapshot:
+        weather_adjustment = None
+        if with_weather and self._hub.prognosis.prognosis:
+            weather_adjustment = self._hub.prognosis.adjustment_snapshot()
+        return OffsetSnapshot(
+            prices=tuple(self.prices or ()),
+            prices_tomorrow=tuple(self.prices_tomorrow or ()),
+            min_price=self.min_price,
+            tolerance=self.model.tolerance,
+            indoors_preset=self._hub.sensors.set_temp_indoors.preset,
+            now=datetime.now(),
+            weather_adjustment=weather_adjustment,
+            strategy=self.strategy
+        )
+
+    async def _async_calculate(self, snapshot: OffsetSnapshot) -> tuple:
+        """Runs the calculation inline, or in the offset-executor if enabled. The cache is only touched on the loop."""
+        key = self._offset_cache.make_key(
+            snapshot.prices,
+            snapshot.prices_tomorrow,
+            snapshot.tolerance,
+            snapshot.indoors_preset,
+            snapshot.min_price,
+            snapshot.now
+        )
+        cached = self._offset_cache.get(key)
+        if self.use_executor:
+            raw, calculated = await asyncio.get_running_loop().run_in_executor(
+                self._get_executor(), calculate_offsets, snapshot, cached
             )
         else:
-            return weather_adjusted_today
+            raw, calculated = calculate_offsets(snapshot, cached)
+        if cached is None and raw:
+            self._offset_cache.put(key, raw)
+            _LOGGER.debug(f"Offsets recalculated. Cache: {self._offset_cache.info}")
+        return raw, calculated
+
+    @property
+    def use_executor(self) -> bool:
+        return self._hub.options.misc.offset_executor
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=OFFSET_EXECUTOR_WORKERS, thread_name_prefix="peaqhvac_offset")
+        return self._executor
+
+    def stop(self) -> None:
+        self._unsub_interval()
+        self._recalculation.stop()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def async_request_offset(self) -> None:
+        """Marks the offsets for recalculation without waiting for it. Used by observer-triggers."""
+        self._recalculation.trigger()
 
     async def async_set_offset(self) -> None:
+        """Recalculates the offsets, coalesced with any other pending requests, and waits for the result."""
+        await self._recalculation.async_trigger()
+
+    async def _async_recalculate_offset(self) -> None:
         if not self.prices:
             if self._hub.is_initialized:
                 _LOGGER.warning(f"Hub is ready but I'm unable to set offset. Prices num: {len(self.prices) if self.prices else 0}")
             return
-        self.model.raw_offsets = await self.async_update_offset()
-        self.model.calculated_offsets = self.model.raw_offsets
-        if self._hub.prognosis.prognosis:
-            await self.async_set_offset_weather()
-        else:
+        raw, calculated = await self._async_calculate(self._create_snapshot())
+        self.model.raw_offsets = raw
+        self.model.calculated_offsets = calculated
+        if not self._hub.prognosis.prognosis:
             _LOGGER.debug("No prognosis available, setting normal calculation.")
 
-    async def async_set_offset_weather(self) -> None:
-        try:
-            _weather_dict = self._hub.prognosis.get_weatherprognosis_adjustment(self.model.raw_offsets)
-            if _weather_dict:
-                self.model.calculated_offsets = await self.async_update_offset(_weather_dict)
-        except Exception as e:
-            _LOGGER.warning(f"Unable to calculate prognosis-offsets. Setting normal calculation: {e}")
-
     async def async_update_model(self) -> None:
         self.model.peaks_today = identify_peaks(self.prices)
         self.model.peaks_tomorrow = identify_peaks(self.prices_tomorrow)
         self.model.raw_offsets = await self.async_update_offset()
-
-
-
-
-
-
-
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import logging
 from typing import TYPE_CHECKING
 
 from peaqevcore.services.hourselection.hoursselection import Hoursselection
 
 from custom_components.peaqhvac.service.hvac.offset.offset_coordinator_peaqev import OffsetCoordinatorPeaqEv
 from custom_components.peaqhvac.service.hvac.offset.offset_coordinator_standalone import OffsetCoordinatorStandAlone
+from custom_components.peaqhvac.service.models.enums.offset_strategy import OffsetStrategy
 from custom_components.peaqhvac.service.observer.iobserver_coordinator import IObserver
 
 if TYPE_CHECKING:
@@ -13,11 +15,24 @@ if TYPE_CHECKING:
 from custom_components.peaqhvac.service.hvac.offset.offset_coordinator import OffsetCoordinator
 
 
+_LOGGER = logging.getLogger(__name__)
+
+
 class OffsetFactory:
 
+    @staticmethod
+    def get_strategy(value) -> OffsetStrategy:
+        """Parses the stored offset_strategy option. An unknown value falls back to the heuristic."""
+        try:
+            return OffsetStrategy(value)
+        except ValueError:
+            _LOGGER.warning(f"Unknown offset strategy {value}. Falling back to {OffsetStrategy.Heuristic.value}.")
+            return OffsetStrategy.Heuristic
+
     @staticmethod
     def create(hub: Hub, observer: IObserver) -> OffsetCoordinator:
+        strategy = hub.options.misc.offset_strategy
         if hub.peaqev_discovered:
-            return OffsetCoordinatorPeaqEv(hub, observer, None)
-        return OffsetCoordinatorStandAlone(hub, observer, Hoursselection())
+            return OffsetCoordinatorPeaqEv(hub, observer, None, strategy)
+        return OffsetCoordinatorStandAlone(hub, observer, Hoursselection(), strategy)
 
@@ -5,6 +5,7 @@ import logging
 from peaqevcore.common.models.observer_types import ObserverTypes
 from peaqevcore.services.hourselection.hoursselection import Hoursselection
 from custom_components.peaqhvac.service.hvac.offset.offset_coordinator import OffsetCoordinator
+from custom_components.peaqhvac.service.models.enums.offset_strategy import OffsetStrategy
 from custom_components.peaqhvac.service.observer.iobserver_coordinator import IObserver
 
 _LOGGER = logging.getLogger(__name__)
@@ -12,9 +13,9 @@ _LOGGER = logging.getLogger(__name__)
 class OffsetCoordinatorPeaqEv(OffsetCoordinator):
     """The class that provides the offsets for the hvac with peaqev installed"""
 
-    def __init__(self, hub, observer: IObserver, hours_type: Hoursselection = None): #type: ignore
+    def __init__(self, hub, observer: IObserver, hours_type: Hoursselection = None, strategy: OffsetStrategy = OffsetStrategy.Heuristic): #type: ignore
         _LOGGER.debug("found peaqev and will not init hourselection")
-        super().__init__(hub, observer, hours_type)
+        super().__init__(hub, observer, hours_type, strategy)
         self._prices = None
         self._prices_tomorrow = None
         self.async_update_prices([hub.sensors.peaqev_facade.hours.prices, hub.sensors.peaqev_facade.hours.prices_tomorrow])
@@ -45,5 +46,5 @@ class OffsetCoordinatorPeaqEv(OffsetCoordinator):
             self._prices = prices[0]
         if self._prices_tomorrow != prices[1]:
             self._prices_tomorrow = prices[1]
-        await self.async_set_offset()
+        await self.async_request_offset()
         await self.async_update_model()
@@ -6,6 +6,7 @@ from peaqevcore.common.models.observer_types import ObserverTypes
 from peaqevcore.services.hourselection.hoursselection import Hoursselection
 
 from custom_components.peaqhvac.service.hvac.offset.offset_coordinator import OffsetCoordinator
+from custom_components.peaqhvac.service.models.enums.offset_strategy import OffsetStrategy
 from custom_components.peaqhvac.service.observer.iobserver_coordinator import IObserver
 
 
@@ -14,11 +15,11 @@ _LOGGER = logging.getLogger(__name__)
 class OffsetCoordinatorStandAlone(OffsetCoordinator):
     """The class that provides the offsets for the hvac with peaqev installed"""
 
-    def __init__(self, hub, observer: IObserver, hours_type: Hoursselection = None):  # type: ignore
+    def __init__(self, hub, observer: IObserver, hours_type: Hoursselection = None, strategy: OffsetStrategy = OffsetStrategy.Heuristic):  # type: ignore
         _LOGGER.debug("initializing an hourselection-instance")
         observer.add(ObserverTypes.PricesChanged, self.async_update_prices)
         observer.add(ObserverTypes.SpotpriceInitialized, self.async_update_prices)
-        super().__init__(hub, observer, hours_type)
+        super().__init__(hub, observer, hours_type, strategy)
 
     @property
     def prices(self) -> list:
@@ -35,5 +36,5 @@ class OffsetCoordinatorStandAlone(OffsetCoordinator):
     async def async_update_prices(self, prices) -> None:
         await self.hours.async_update_prices(prices[0], prices[1])
         _LOGGER.debug(f"Updated prices to {self.hours.prices, self.hours.prices_tomorrow}")
-        await self.async_set_offset()
+        await self.async_request_offset()
         await self.async_update_model()
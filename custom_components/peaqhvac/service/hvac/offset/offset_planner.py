@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import logging
+from array import array
+from typing import Sequence
+
+from custom_components.peaqhvac.service.hvac.offset.offset_utils import \
+    flat_day_lower_tolerance
+from custom_components.peaqhvac.service.models.enums.hvac_presets import \
+    HvacPresets
+from custom_components.peaqhvac.service.models.offset_timeline import OffsetTimeline
+
+_LOGGER = logging.getLogger(__name__)
+
+MAX_STEP = 1
+COMFORT_WEIGHT = 0.5
+
+
+def plan_offsets(
+        deviations: Sequence[float],
+        tolerance: int,
+        max_step: int = MAX_STEP,
+        comfort: float = COMFORT_WEIGHT,
+        shift: int = 0,
+) -> list[int]:
+    """
+    Picks the offset for every slot of the horizon at once, by dynamic programming over the integer offsets in the
+    tolerance band. The heating energy of a slot is taken as linear in its offset, so the price-cost of an offset o is
+    tolerance * deviation * o, and comfort * (o - shift)^2 keeps the house close to its setpoint.
+    Adjacent slots may not differ by more than max_step.
+    With comfort 0.5 and no step-limit the result is the same as the per-slot heuristic, apart from exact ties.
+    """
+    if not len(deviations) or tolerance is None or tolerance < 0:
+        return []
+    states = range(-tolerance, tolerance + 1)
+    width = len(states)
+    penalty = [comfort * (o - shift) ** 2 for o in states]
+    cost = [tolerance * deviations[0] * o + penalty[i] for i, o in enumerate(states)]
+    windows = [(max(0, i - max_step), min(width, i + max_step + 1)) for i in range(width)]
+    back = []
+    for dev in deviations[1:]:
+        price = tolerance * dev
+        slot_back = array("b", bytes(width))
+        slot_cost = [0.0] * width
+        for i, (lo, hi) in enumerate(windows):
+            best, best_cost = lo, cost[lo]
+            for j in range(lo + 1, hi):
+                if cost[j] < best_cost:
+                    best, best_cost = j, cost[j]
+            slot_back[i] = best - i
+            slot_cost[i] = best_cost + price * states[i] + penalty[i]
+        back.append(slot_back)
+        cost = slot_cost
+    idx = min(range(width), key=cost.__getitem__)
+    ret = [0] * len(deviations)
+    ret[-1] = states[idx]
+    for t in range(len(back) - 1, -1, -1):
+        idx += back[t][idx]
+        ret[t] = states[idx]
+    return ret
+
+
+def planned_offsets(
+        day_values: OffsetTimeline,
+        all_prices: list[float],
+        tolerance: int | None,
+        indoors_preset: HvacPresets = HvacPresets.Normal,
+) -> OffsetTimeline | dict:
+    """The planner-counterpart of offset_per_day, taking a timeline of deviations."""
+    if tolerance is None:
+        return {}
+    tolerance = max(0, tolerance - flat_day_lower_tolerance(all_prices))
+    shift = -1 if indoors_preset is HvacPresets.Away else 0
+    offsets = plan_offsets(day_values.values(), tolerance, shift=shift)
+    return OffsetTimeline(day_values.start, day_values.resolution, offsets)
@@ -1,10 +1,12 @@
 import logging
+from array import array
 from datetime import datetime, timedelta
 from statistics import mean, stdev
 
 from custom_components.peaqhvac.service.hvac.house_heater.models.calculated_offset import CalculatedOffsetModel
 from custom_components.peaqhvac.service.models.enums.hvac_presets import \
     HvacPresets
+from custom_components.peaqhvac.service.models.offset_timeline import OffsetTimeline
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -33,17 +35,23 @@ def offset_per_day(
         tolerance: int | None,
         indoors_preset: HvacPresets = HvacPresets.Normal,
 ) -> dict:
-    ret = {}
-    if tolerance is not None:
-        tolerance -= flat_day_lower_tolerance(all_prices)
-        print(f"Flat day lower tolerance: {flat_day_lower_tolerance(all_prices)}")
-        for k, v in day_values.items():
-            ret[k] = int(round((day_values[k] * tolerance) * -1, 0))
-            if indoors_preset is HvacPresets.Away:
-                ret[k] -= 1
-            if abs(ret[k]) > tolerance:
-                ret[k] = tolerance if ret[k] > 0 else tolerance * -1
-    return ret
+    """Converts deviations to offsets. A timeline of deviations gives a timeline of offsets back."""
+    if tolerance is None:
+        return {}
+    tolerance -= flat_day_lower_tolerance(all_prices)
+    away = indoors_preset is HvacPresets.Away
+
+    def _offset(deviation: float) -> int:
+        ret = int(round((deviation * tolerance) * -1, 0))
+        if away:
+            ret -= 1
+        if abs(ret) > tolerance:
+            ret = tolerance if ret > 0 else tolerance * -1
+        return ret
+
+    if isinstance(day_values, OffsetTimeline):
+        return day_values.map(_offset)
+    return {k: _offset(v) for k, v in day_values.items()}
 
 
 def get_offset_dict(offset_dict, dt_now) -> dict:
@@ -59,6 +67,13 @@ async def set_offset_dict(prices: list[float], dt: datetime, min_price: float, e
     return all_offsets
 
 
+def deviation_timeline(prices: list[float], dt: datetime, min_price: float) -> OffsetTimeline:
+    if not len(prices):
+        return OffsetTimeline.empty("d")
+    dt = dt.replace(minute=0, second=0, microsecond=0)
+    return OffsetTimeline(dt.replace(hour=0), _get_timedelta(prices), deviation_from_mean_array(prices, min_price, dt))
+
+
 def _get_timedelta(prices: list[float]) -> int:
     _len = len(prices)
     match _len:
@@ -71,11 +86,21 @@ def _get_timedelta(prices: list[float]) -> int:
 def _deviation_from_mean(prices: list[float], min_price: float, dt: datetime) -> dict[datetime, float]:
     if not len(prices):
         return {}
-    delta = _get_timedelta(prices)
+    step = timedelta(minutes=_get_timedelta(prices))
     dt_lister = dt.replace(hour=0)
-    min_list_price = min(min(prices),0)
+    values = deviation_from_mean_array(prices, min_price, dt)
+    return {dt_lister + step * i: val for i, val in enumerate(values)}
+
+
+def deviation_from_mean_array(prices: list[float], min_price: float, dt: datetime) -> array:
+    """Same calculation as _deviation_from_mean but returns the values as an array, index by slot."""
+    if not len(prices):
+        return array("d")
+    min_list_price = min(min(prices), 0)
     shifted_prices = [p - min_list_price for p in prices]
-    standardized_prices = [(p - mean(shifted_prices)) / stdev(shifted_prices) for p in shifted_prices]
+    shifted_mean = mean(shifted_prices)
+    shifted_stdev = stdev(shifted_prices)
+    standardized_prices = [(p - shifted_mean) / shifted_stdev for p in shifted_prices]
     avg = mean(standardized_prices)
     devi = stdev(standardized_prices)
     avg2 = avg
@@ -85,8 +110,7 @@ def _deviation_from_mean(prices: list[float], min_price: float, dt: datetime) ->
         avg2 = mean(standardized_prices[13:])
         devi2 = stdev(standardized_prices[13:])
 
-    deviation_dict = {}
-
+    ret = array("d", bytes(8 * len(standardized_prices)))
     for i, num in enumerate(standardized_prices):
         _devi = devi if i < 13 else devi2
         _avg = avg if i < 13 else avg2
@@ -101,17 +125,21 @@ def _deviation_from_mean(prices: list[float], min_price: float, dt: datetime) ->
             setval = round(setval, 2)
         else:
             setval = round(deviation, 2)
-        deviation_dict[dt_lister + timedelta(minutes=delta * i)] = setval
-    return deviation_dict
+        ret[i] = setval
+    return ret
 
 
 def max_price_lower_internal(tempdiff: float, peaks_today: list) -> bool:
-    """Temporarily lower to -10 if this hour is a peak for today and temp > set-temp + 0.5C"""
+    """Temporarily lower to -10 if this slot is a peak for today and temp > set-temp + 0.5C"""
     if tempdiff >= 0.5:
-        if datetime.now().hour in peaks_today:
+        resolution = getattr(peaks_today, "resolution", 60)
+        now = datetime.now()
+        minute_of_day = now.hour * 60 + now.minute
+        current_slot = minute_of_day // resolution
+        if current_slot in peaks_today:
             return True
-        elif datetime.now().hour < 23 and datetime.now().minute > 50:
-            if datetime.now().hour + 1 in peaks_today:
+        elif current_slot < (1440 // resolution) - 1 and minute_of_day % resolution > resolution - 10:
+            if current_slot + 1 in peaks_today:
                 return True
     return False
 
@@ -2,44 +2,65 @@ import statistics
 from datetime import timedelta
 import logging
 
+from custom_components.peaqhvac.service.hvac.offset.offset_utils import _get_timedelta
+
 _LOGGER = logging.getLogger(__name__)
 
 
-def identify_peaks(prices: list) -> list[int]:
-    ret = []
+class PeakSlots(list):
+    """Slot-indexes of peaks or valleys. Resolution is the number of minutes per slot."""
+    def __init__(self, slots=(), resolution: int = 60):
+        super().__init__(slots)
+        self.resolution = resolution
+
+    @property
+    def slots_per_day(self) -> int:
+        return 1440 // self.resolution
+
+
+DEFAULT_RESOLUTION = 60
+
+
+def get_resolution(prices: list) -> int:
+    """Minutes per slot. Hourly when there are no prices, or the number of prices does not match a resolution."""
+    if not prices:
+        return DEFAULT_RESOLUTION
+    return _get_timedelta(prices) or DEFAULT_RESOLUTION
+
+
+def identify_peaks(prices: list) -> PeakSlots:
+    ret = PeakSlots(resolution=get_resolution(prices))
+    if not len(prices):
+        return ret
+    avg = statistics.mean(prices)
+    top = max(prices)
+    last = len(prices) - 1
     for idx, p in enumerate(prices):
-        if p < statistics.mean(prices):
+        if p < avg:
             continue
-        if idx == 0 or idx == len(prices) - 1:
-            if p == max(prices):
-                ret.append(idx)
-        else:
-            if all(
-                    [
-                        _check_deviation_peaks(p, prices[idx - 1]),
-                        _check_deviation_peaks(p, prices[idx + 1]),
-                    ]
-            ):
+        if idx == 0 or idx == last:
+            if p == top:
                 ret.append(idx)
+        elif _check_deviation_peaks(p, prices[idx - 1]) and _check_deviation_peaks(p, prices[idx + 1]):
+            ret.append(idx)
     return ret
 
 
-def identify_valleys(prices: list) -> list[int]:
-    ret = []
+def identify_valleys(prices: list) -> PeakSlots:
+    ret = PeakSlots(resolution=get_resolution(prices))
+    if not len(prices):
+        return ret
+    avg = statistics.mean(prices)
+    bottom = min(prices)
+    last = len(prices) - 1
     for idx, p in enumerate(prices):
-        if p > statistics.mean(prices):
+        if p > avg:
             continue
-        if idx == 0 or idx == len(prices) - 1:
-            if p == min(prices):
-                ret.append(idx)
-        else:
-            if all(
-                    [
-                        _check_deviation_valleys(p, prices[idx - 1]),
-                        _check_deviation_valleys(p, prices[idx + 1]),
-                    ]
-            ):
+        if idx == 0 or idx == last:
+            if p == bottom:
                 ret.append(idx)
+        elif _check_deviation_valleys(p, prices[idx - 1]) and _check_deviation_valleys(p, prices[idx + 1]):
+            ret.append(idx)
     return ret
 
 
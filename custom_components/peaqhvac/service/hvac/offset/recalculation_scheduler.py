@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+_LOGGER = logging.getLogger(__name__)
+
+RECALCULATION_WINDOW = 1
+
+
+class RecalculationScheduler:
+    """
+    Debounced, single-flight runner for a recalculation.
+    Triggers within the window share one run. Triggers arriving while a run is in flight get that run's result,
+    and mark the scheduler dirty so that one more run follows with the latest inputs.
+    """
+    def __init__(self, func: Callable[[], Awaitable], window: float = RECALCULATION_WINDOW):
+        self._func = func
+        self._window = window
+        self._scheduled: asyncio.Future | None = None
+        self._running: asyncio.Future | None = None
+        self._task: asyncio.Task | None = None
+        self._handle: asyncio.TimerHandle | None = None
+        self._dirty: bool = False
+        self.trigger_count: int = 0
+        self.recompute_count: int = 0
+
+    @property
+    def metrics(self) -> dict:
+        return {
+            "triggers":   self.trigger_count,
+            "recomputes": self.recompute_count,
+            "coalesced":  max(0, self.trigger_count - self.recompute_count),
+        }
+
+    def trigger(self) -> asyncio.Future:
+        """Marks the recalculation as needed without waiting for it. Returns the future of the run that will serve it."""
+        self.trigger_count += 1
+        if self._running is not None:
+            self._dirty = True
+            return self._running
+        return self._schedule()
+
+    async def async_trigger(self):
+        """Triggers and waits for the result of the run that serves this trigger."""
+        return await asyncio.shield(self.trigger())
+
+    def stop(self) -> None:
+        """Drops the pending run and cancels the one in flight."""
+        self._dirty = False
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if self._scheduled is not None:
+            self._scheduled.cancel()
+            self._scheduled = None
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _schedule(self) -> asyncio.Future:
+        if self._scheduled is None:
+            loop = asyncio.get_running_loop()
+            self._scheduled = loop.create_future()
+            self._handle = loop.call_later(self._window, self._start)
+        return self._scheduled
+
+    def _start(self) -> None:
+        self._handle = None
+        future, self._scheduled = self._scheduled, None
+        self._running = future
+        self._task = asyncio.get_running_loop().create_task(self._async_run(future))
+
+    async def _async_run(self, future: asyncio.Future) -> None:
+        ret = None
+        try:
+            self.recompute_count += 1
+            ret = await self._func()
+        except Exception as e:
+            _LOGGER.exception(f"Recalculation failed: {e}")
+        finally:
+            if not future.done():
+                future.set_result(ret)
+            self._running = None
+            self._task = None
+            if self._dirty:
+                self._dirty = False
+                self._schedule()
@@ -41,9 +41,9 @@ class UpdateSystem:
         self._set_operation_call_parameters: callable = operation_params_func
         self.observer = observer
         self._hass = hass
-        self.observer.add(ObserverTypes.UpdateOperation, self.async_receive_request)
-        self.observer.add("water_boost_start", self.async_boost_water)
-        self.observer.add("control_module_changed", self.async_control_module_changed)
+        self.observer.add(ObserverTypes.UpdateOperation, self.async_receive_request, ordered=True, priority=True)
+        self.observer.add("water_boost_start", self.async_boost_water, ordered=True, priority=True)
+        self.observer.add("control_module_changed", self.async_control_module_changed, ordered=True)
 
     async def async_control_module_changed(self, data: Tuple[str, bool]) -> None:
         self.control_modules[data[0]] = data[1]
@@ -8,6 +8,9 @@ from custom_components.peaqhvac.const import (HVACBRAND_IVT, HVACBRAND_NIBE,
                                               HVACBRAND_THERMIA)
 from custom_components.peaqhvac.service.models.enums.hvacbrands import \
     HvacBrand
+from custom_components.peaqhvac.service.models.enums.offset_strategy import \
+    OffsetStrategy
+from custom_components.peaqhvac.service.observer.const import HANDLER_TIMEOUT
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -15,6 +18,11 @@ _LOGGER = logging.getLogger(__name__)
 @dataclass
 class MiscOptions:
     enabled_on_boot: bool = True
+    offset_executor: bool = False
+    offset_strategy: OffsetStrategy = OffsetStrategy.Heuristic
+    observer_fan_out: bool = False
+    observer_handler_timeout: int = HANDLER_TIMEOUT
+    observer_metrics: bool = False
 
 
 @dataclass
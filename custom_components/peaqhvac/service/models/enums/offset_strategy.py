@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class OffsetStrategy(Enum):
+    Heuristic = "heuristic"
+    Planner = "planner"
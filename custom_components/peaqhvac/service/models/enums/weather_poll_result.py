@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class WeatherPollResult(Enum):
+    Changed = "changed"
+    Unchanged = "unchanged"
+    Failed = "failed"
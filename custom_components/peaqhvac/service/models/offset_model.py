@@ -1,17 +1,21 @@
 import logging
+from homeassistant.core import callback
 from homeassistant.helpers.event import async_track_time_interval
 from datetime import timedelta, datetime
 
 from peaqevcore.common.models.observer_types import ObserverTypes
 
+from custom_components.peaqhvac.service.hvac.offset.peakfinder import PeakSlots
+from custom_components.peaqhvac.service.models.offset_timeline import OffsetTimeline
+
 _LOGGER = logging.getLogger(__name__)
 
 
 class OffsetModel:
     _peaks_today: list = []
     _peaks_tomorrow: list = []
-    calculated_offsets = {}
-    raw_offsets = {}
+    _calculated_offsets: OffsetTimeline = OffsetTimeline.empty()
+    _raw_offsets: OffsetTimeline = OffsetTimeline.empty()
     _tolerance = None
     tolerance_raw = None
     prognosis = None
@@ -24,17 +28,41 @@ class OffsetModel:
         self.hub.observer.add(ObserverTypes.HvacToleranceChanged, self.recalculate_tolerance)
         self.hub.observer.add(ObserverTypes.TemperatureOutdoorsChanged, self._set_outdoor_temp)
 
+    @callback
     def _set_outdoor_temp(self, val):
         self._outdoor_temp = val
         self.recalculate_tolerance()
 
+    @property
+    def raw_offsets(self) -> OffsetTimeline:
+        return self._raw_offsets
+
+    @raw_offsets.setter
+    def raw_offsets(self, val: dict):
+        self._raw_offsets = OffsetTimeline.from_mapping(val)
+
+    @property
+    def calculated_offsets(self) -> OffsetTimeline:
+        return self._calculated_offsets
+
+    @calculated_offsets.setter
+    def calculated_offsets(self, val: dict):
+        self._calculated_offsets = OffsetTimeline.from_mapping(val)
+
+    def raw_offset_at(self, dt: datetime) -> float | None:
+        """
+        Returns the raw offset for the slot that dt falls within, or None if dt is before the first slot.
+        The slot is computed from the timeline's start and resolution, so this does not depend on the number of slots.
+        """
+        return self._raw_offsets.value_at(dt)
+
     @property
     def peaks_today(self) -> list:
         return self._peaks_today
 
     @peaks_today.setter
     def peaks_today(self, val: list):
-        self._peaks_today = [v for v in val if 0 <= v < 24]
+        self._peaks_today = self._peaks_within_day(val)
 
     @property
     def peaks_tomorrow(self) -> list:
@@ -42,7 +70,14 @@ class OffsetModel:
 
     @peaks_tomorrow.setter
     def peaks_tomorrow(self, val: list):
-        self._peaks_tomorrow = [v for v in val if 0 <= v < 24]
+        self._peaks_tomorrow = self._peaks_within_day(val)
+
+    @staticmethod
+    def _peaks_within_day(val: list) -> PeakSlots:
+        resolution = getattr(val, "resolution", 60)
+        ret = PeakSlots(resolution=resolution)
+        ret.extend(v for v in val if 0 <= v < ret.slots_per_day)
+        return ret
 
     @property
     def tolerance(self) -> int:
@@ -55,14 +90,14 @@ class OffsetModel:
         self._tolerance = val
 
     @property
-    def current_offset_dict(self) -> dict:
-        return {k: v for k, v in self.calculated_offsets.items() if k.date() == datetime.now().date()}
+    def current_offset_dict(self) -> OffsetTimeline:
+        return self._calculated_offsets.day(datetime.now().date())
 
     @property
-    def current_offset_dict_tomorrow(self) -> dict:
-        return {k: v for k, v in self.calculated_offsets.items() if
-                k.date() == datetime.now().date() + timedelta(days=1)}
+    def current_offset_dict_tomorrow(self) -> OffsetTimeline:
+        return self._calculated_offsets.day(datetime.now().date() + timedelta(days=1))
 
+    @callback
     def recalculate_tolerance(self):
         if self.hub.options.hvac_tolerance is not None:
             old_tolerance = self._tolerance
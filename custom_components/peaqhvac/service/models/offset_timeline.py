@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import ItemsView, Mapping
+from datetime import date, datetime, timedelta
+from typing import Callable, Iterator
+
+
+class OffsetTimeline(Mapping):
+    """
+    Per-slot values (offsets, deviations) stored as a start datetime, a resolution in minutes and an array of values.
+    Reads like a dict[datetime, float] so existing callers keep working, but slicing a day out of it shares the
+    underlying array instead of copying it.
+    """
+    __slots__ = ("start", "resolution", "_step", "_values", "_offset", "_length")
+
+    def __init__(self, start: datetime, resolution: int, values=(), typecode: str = "f"):
+        self.start = start
+        self.resolution = resolution
+        self._step = timedelta(minutes=resolution)
+        self._values = values if isinstance(values, array) else array(typecode, values)
+        self._offset = 0
+        self._length = len(self._values)
+
+    @classmethod
+    def empty(cls, typecode: str = "f") -> OffsetTimeline:
+        return cls(datetime.min, 60, typecode=typecode)
+
+    @classmethod
+    def from_mapping(cls, data: Mapping, typecode: str = "f") -> OffsetTimeline:
+        """
+        Converts a dict with evenly spaced datetime-keys. Returns data as-is if it already is a timeline.
+        Raises ValueError if the keys are not evenly spaced in whole minutes.
+        """
+        if isinstance(data, OffsetTimeline):
+            return data
+        if not data:
+            return cls.empty(typecode)
+        keys = sorted(data)
+        step = keys[1] - keys[0] if len(keys) > 1 else timedelta(minutes=60)
+        if step % timedelta(minutes=1):
+            raise ValueError(f"Offset keys must be whole minutes apart, got {step} between {keys[0]} and {keys[1]}.")
+        for i, k in enumerate(keys):
+            if k != keys[0] + step * i:
+                raise ValueError(f"Offset keys are not evenly spaced: expected {keys[0] + step * i}, got {k}.")
+        return cls(keys[0], step // timedelta(minutes=1), array(typecode, (data[k] for k in keys)))
+
+    @property
+    def end(self) -> datetime:
+        return self.start + self._step * self._length
+
+    @property
+    def typecode(self) -> str:
+        return self._values.typecode
+
+    def _index(self, dt: datetime) -> int | None:
+        delta = dt - self.start
+        if delta % self._step:
+            return None
+        idx = delta // self._step
+        return idx if 0 <= idx < self._length else None
+
+    def _view(self, lo: int, hi: int) -> OffsetTimeline:
+        ret = object.__new__(OffsetTimeline)
+        ret.start = self.start + self._step * lo
+        ret.resolution = self.resolution
+        ret._step = self._step
+        ret._values = self._values
+        ret._offset = self._offset + lo
+        ret._length = max(0, hi - lo)
+        return ret
+
+    def __getitem__(self, dt: datetime) -> float:
+        idx = self._index(dt)
+        if idx is None:
+            raise KeyError(dt)
+        return self._values[self._offset + idx]
+
+    def __setitem__(self, dt: datetime, value: float) -> None:
+        idx = self._index(dt)
+        if idx is None:
+            raise KeyError(dt)
+        self._values[self._offset + idx] = value
+
+    def __contains__(self, dt) -> bool:
+        return isinstance(dt, datetime) and self._index(dt) is not None
+
+    def __iter__(self) -> Iterator[datetime]:
+        start, step = self.start, self._step
+        return (start + step * i for i in range(self._length))
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, OffsetTimeline) and (self.start, self._step) == (other.start, other._step):
+            return self.values() == other.values()
+        return super().__eq__(other)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"OffsetTimeline(start={self.start}, resolution={self.resolution}, values={self.values()})"
+
+    def values(self) -> list[float]:
+        return self._values[self._offset:self._offset + self._length].tolist()
+
+    def items(self) -> _TimelineItemsView:
+        return _TimelineItemsView(self)
+
+    def value_at(self, dt: datetime) -> float | None:
+        """Value of the slot that dt falls within. Past the end the last value is returned, before start None."""
+        if not self._length or dt < self.start:
+            return None
+        idx = min((dt - self.start) // self._step, self._length - 1)
+        return self._values[self._offset + idx]
+
+    def day(self, day: date) -> OffsetTimeline:
+        """The slots of a single day, sharing the values of this timeline."""
+        midnight = datetime.combine(day, datetime.min.time())
+        lo = (midnight - self.start) // self._step
+        hi = lo + timedelta(days=1) // self._step
+        return self._view(max(lo, 0), min(hi, self._length))
+
+    def clamp(self, low: float, high: float) -> OffsetTimeline:
+        """Clamps the values in place and returns the timeline."""
+        vals = self._values
+        for i in range(self._offset, self._offset + self._length):
+            if vals[i] > high:
+                vals[i] = high
+            elif vals[i] < low:
+                vals[i] = low
+        return self
+
+    def map(self, func: Callable[[float], float], typecode: str = "f") -> OffsetTimeline:
+        return OffsetTimeline(self.start, self.resolution, array(typecode, map(func, self.values())))
+
+    def add(self, other: Mapping) -> OffsetTimeline:
+        """Element-wise addition. Slots missing in other are treated as 0."""
+        if isinstance(other, OffsetTimeline) and (self.start, self._step) == (other.start, other._step):
+            vals = [a + b for a, b in zip(self.values(), other.values())]
+            vals.extend(self.values()[len(vals):])
+        else:
+            vals = [v + other.get(k, 0) for k, v in self.items()]
+        return OffsetTimeline(self.start, self.resolution, array(self.typecode, vals))
+
+    def copy(self) -> OffsetTimeline:
+        return OffsetTimeline(self.start, self.resolution, array(self.typecode, self.values()))
+
+
+class _TimelineItemsView(ItemsView):
+    __slots__ = ()
+
+    def __contains__(self, item) -> bool:
+        if not isinstance(item, tuple) or len(item) != 2:
+            return False
+        return super().__contains__(item)
+
+    def __iter__(self):
+        return zip(iter(self._mapping), self._mapping.values())
@@ -8,6 +8,7 @@ class OffsetsExportModel:
     _raw_offsets: List[int] = field(default_factory=list)
     _current_offset: List[int] = field(default_factory=list)
     _current_offset_tomorrow: List[int] = field(default_factory=list)
+    _resolution: int = 60
 
     @property
     def raw_offsets(self) -> List[int]:
@@ -18,13 +19,15 @@ class OffsetsExportModel:
     def raw_offsets(self, val: Dict) -> None:
         """Sets the raw offsets list from a dictionary."""
         self._raw_offsets = self._offset_dict_to_list(val)
+        self._resolution = getattr(val, "resolution", 60)
 
     @property
     def current_raw_offset(self) -> int:
-        """Returns the current raw offset based on the current hour."""
+        """Returns the current raw offset based on the current slot."""
         if not self._raw_offsets:
             return 0
-        return self._raw_offsets[datetime.now().hour]
+        now = datetime.now()
+        return self._raw_offsets[(now.hour * 60 + now.minute) // self._resolution]
 
     @property
     def current_offset(self) -> List[int]:
@@ -48,5 +51,5 @@ class OffsetsExportModel:
 
     @staticmethod
     def _offset_dict_to_list(input: Dict) -> List[int]:
-        """Converts a dictionary of offsets to a list."""
-        return list(input.values())
\ No newline at end of file
+        """Converts a dictionary of offsets to a list, rounding each offset to the nearest step."""
+        return [round(v) for v in input.values()]
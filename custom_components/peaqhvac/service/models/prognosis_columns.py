@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import datetime
+
+from custom_components.peaqhvac.service.models.prognosis_export_model import \
+    PrognosisExportModel
+
+
+class PrognosisColumns(Sequence):
+    """
+    The hvac-prognosis over the forecast horizon, stored as one list per value. Reads like a list of
+    PrognosisExportModel, but a row is only built when it is read, and then kept.
+    """
+    __slots__ = (
+        "DT", "prognosis_temp", "corrected_temp", "windchill_temp", "delta_temp_from_now", "TimeDelta", "base_temp",
+        "_rows"
+    )
+
+    def __init__(
+            self,
+            DT: list[datetime],
+            prognosis_temp: list[float],
+            corrected_temp: list[float],
+            windchill_temp: list[float],
+            TimeDelta: list[int],
+            base_temp: float
+    ):
+        self.DT = DT
+        self.prognosis_temp = prognosis_temp
+        self.corrected_temp = corrected_temp
+        self.windchill_temp = windchill_temp
+        self.delta_temp_from_now = [round(w - base_temp, 1) for w in windchill_temp]
+        self.TimeDelta = TimeDelta
+        self.base_temp = base_temp
+        self._rows: list[PrognosisExportModel | None] = [None] * len(DT)
+
+    def __len__(self) -> int:
+        return len(self.DT)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        row = self._rows[idx]
+        if row is None:
+            row = self._rows[idx] = PrognosisExportModel(
+                prognosis_temp=self.prognosis_temp[idx],
+                corrected_temp=self.corrected_temp[idx],
+                windchill_temp=self.windchill_temp[idx],
+                DT=self.DT[idx],
+                TimeDelta=self.TimeDelta[idx],
+                _base_temp=self.base_temp
+            )
+        return row
+
+    def __eq__(self, other) -> bool:
+        if other is self:
+            return True
+        if isinstance(other, PrognosisColumns):
+            return (
+                self.DT == other.DT
+                and self.prognosis_temp == other.prognosis_temp
+                and self.corrected_temp == other.corrected_temp
+                and self.windchill_temp == other.windchill_temp
+                and self.TimeDelta == other.TimeDelta
+                and self.base_temp == other.base_temp
+            )
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"PrognosisColumns(hours={len(self)}, start={self.DT[0] if self.DT else None})"
+
+    @property
+    def materialized(self) -> int:
+        """The number of rows built so far."""
+        return sum(1 for r in self._rows if r is not None)
@@ -5,9 +5,9 @@ from custom_components.peaqhvac.service.models.enums.weather_type import \
     WeatherType
 
 
-@dataclass
+@dataclass(slots=True)
 class WeatherObject:
-    _DTstr: str
+    _DTstr: str = field(compare=False)
     WeatherCondition: WeatherType
     Temperature: float
     Wind_Speed: float
@@ -17,9 +17,12 @@ class WeatherObject:
     DT: datetime = field(init=False)
 
     def __post_init__(self):
-        self.DT = self._parse_datetime()
+        self.DT = parse_datetime(self._DTstr)
 
-    def _parse_datetime(self) -> datetime:
-        time_obj = datetime.strptime(self._DTstr, "%Y-%m-%dT%H:%M:%S+00:00")
-        utc_time = time_obj.replace(tzinfo=timezone.utc)
-        return utc_time
+
+def parse_datetime(value: str) -> datetime:
+    """Parses an ISO-8601 timestamp with any UTC-offset, or Z, into UTC. A timestamp without offset is taken as UTC."""
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
@@ -1,2 +1,3 @@
 COMMAND_WAIT = 3
 TIMEOUT = 10
+HANDLER_TIMEOUT = 10
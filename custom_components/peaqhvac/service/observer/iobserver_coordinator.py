@@ -4,33 +4,86 @@ import logging
 import time
 from abc import abstractmethod
 import asyncio
-from typing import Callable
+from typing import Awaitable
 
 from peaqevcore.common.models.observer_types import ObserverTypes
 
 from custom_components.peaqhvac.service.observer.const import (
-    COMMAND_WAIT)
+    COMMAND_WAIT, HANDLER_TIMEOUT)
 from custom_components.peaqhvac.service.observer.models.command import \
     Command
+from custom_components.peaqhvac.service.observer.models.dispatch_latency import \
+    DispatchLatency
+from custom_components.peaqhvac.service.observer.models.observer_metrics import \
+    ObserverMetrics
 from custom_components.peaqhvac.service.observer.models.observer_model import \
     ObserverModel
+from custom_components.peaqhvac.service.observer.models.subscriber import \
+    Subscriber
 
 _LOGGER = logging.getLogger(__name__)
 
 
 DISPATCH_DELAY_TIMEOUT = 5
 COMMAND_VALIDITY = 10
+PRIORITY_BURST = 4
 
 class IObserver:
     """
     Observer class handles updates throughout peaq.
     Attach to hub class and subscribe to updates (string matches) in other classes connected to the hub.
     When broadcasting, you may use one argument that the of-course needs to correspond to your receiving function.
+    With fan_out, commands and their subscribers are dispatched concurrently, each handler limited to handler_timeout.
+    Topics added with ordered=True are still dispatched one command and one subscriber at a time.
+    Topics added with priority=True are queued in a lane of their own that is dispatched first. After PRIORITY_BURST
+    priority commands in a row, one waiting command from the normal lane goes in between.
     """
-    def __init__(self):
+    def __init__(self, fan_out: bool = False, handler_timeout: float | None = HANDLER_TIMEOUT, metrics: bool = False):
         self.model = ObserverModel()
+        self.latency = DispatchLatency()
+        self.metrics = ObserverMetrics(enabled=metrics, topic_name=self.model.topics.name)
+        self.fan_out = fan_out
+        self.handler_timeout = handler_timeout
+        self.overruns: int = 0
+        self._ordered_topics: set[int] = set()
+        self._priority_topics: set[int] = set()
+        self._topic_locks: dict[int, asyncio.Lock] = {}
+        self._in_flight: set[Command] = set()
+        self._fan_out_tasks: set[asyncio.Task] = set()
         self._dequeue_lock = asyncio.Lock()
-        self._dispatch_lock = asyncio.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._dispatcher: asyncio.Task | None = None
+        self._enqueued_at: dict[Command, float] = {}
+
+    def start(self, loop: asyncio.AbstractEventLoop | None = None) -> None:
+        """Starts dispatching. Broadcasts wake the dispatcher right away instead of waiting for a poll."""
+        if self._dispatcher is not None:
+            return
+        self._loop = loop or asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._dispatcher = self._create_dispatcher(self._async_run_dispatcher())
+        if self.queue_depth:
+            self._wakeup.set()
+
+    def stop(self) -> None:
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+        for task in list(self._fan_out_tasks):
+            task.cancel()
+
+    def _create_dispatcher(self, coro) -> asyncio.Task:
+        return self._loop.create_task(coro)
+
+    async def _async_run_dispatcher(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            try:
+                await self.async_dispatch()
+            except Exception as e:
+                _LOGGER.exception(f"Observer dispatch failed: {e}")
 
     def activate(self, init_broadcast: ObserverTypes = None) -> None:
         self.model.active = True
@@ -40,106 +93,188 @@ class IObserver:
     def deactivate(self) -> None:
         self.model.active = False
 
-    @staticmethod
-    def _check_and_convert_enum_type(command) -> ObserverTypes | str:
-        if isinstance(command, str):
-            try:
-                command = ObserverTypes(command)
-                _LOGGER.debug(f"Observer.add: command {command} was not of type ObserverTypes but was converted.")
-            except ValueError:
-                pass
-                #return ObserverTypes.Test
-        return command
-
-    def add(self, command: ObserverTypes|str, func):
-        command = self._check_and_convert_enum_type(command)
-        if command in self.model.subscribers.keys():
-            self.model.subscribers[command].append(func)
-        else:
-            self.model.subscribers[command] = [func]
-
-    async def async_broadcast(self, command: ObserverTypes|str, argument=None):
+    def topic(self, command: ObserverTypes|str) -> int:
+        """The id of a topic. Broadcasting the id instead of the topic skips the lookup."""
+        return self.model.topics.resolve(command)
+
+    def add(self, command: ObserverTypes|str, func, ordered: bool = False, loop_safe: bool = False, priority: bool = False):
+        topic_id = self.model.topics.resolve(command)
+        if ordered:
+            self._ordered_topics.add(topic_id)
+        if priority:
+            self._priority_topics.add(topic_id)
+        while len(self.model.subscribers) <= topic_id:
+            self.model.subscribers.append([])
+        self.model.subscribers[topic_id].append(Subscriber.create(func, loop_safe))
+
+    async def async_broadcast(self, command: ObserverTypes|str|int, argument=None):
         self.broadcast(command, argument)
 
-    def broadcast(self, command: ObserverTypes|str, argument=None):
-        command = self._check_and_convert_enum_type(command)
-        _expiration = time.time() + COMMAND_VALIDITY
-        cc = Command(command, _expiration, argument)
-        if cc not in self.model.broadcast_queue:
-            if cc not in self.model.dispatch_delay_queue.keys():
-                self.model.dispatch_delay_queue[cc] = time.time()
-                _LOGGER.debug(f"received broadcast: {command} - {argument}")
-                self.model.broadcast_queue.append(cc)
-        #     else:
-        #         _LOGGER.debug(f"Command {command} with argument {argument} is already in dispatch_delay_queue: {self.model.dispatch_delay_queue[cc]}")
-        # else:
-        #     _LOGGER.debug(
-        #         f"Command {command} with argument {argument} is already in broadcast_queue: {[q for q in self.model.broadcast_queue if q == cc]}")
+    def broadcast(self, command: ObserverTypes|str|int, argument=None):
+        topic_id = self.model.topics.resolve(command)
+        if self._loop is not None and not self._is_on_loop():
+            # handlers run in the executor broadcast too, the queue is only touched from the loop
+            self._loop.call_soon_threadsafe(self._enqueue, topic_id, argument)
+            return
+        self._enqueue(topic_id, argument)
+
+    def _subscribers_of(self, topic_id: int) -> list[Subscriber]:
+        return self.model.subscribers[topic_id] if topic_id < len(self.model.subscribers) else []
+
+    def _is_on_loop(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def _enqueue(self, topic_id: int, argument=None) -> None:
+        now = time.time()
+        cc = Command(topic_id, now + COMMAND_VALIDITY, argument)
+        lane = self.model.priority_queue if topic_id in self._priority_topics else self.model.broadcast_queue
+        queued = False
+        if cc not in lane:
+            self.model.dispatch_delay_queue.expire(now - DISPATCH_DELAY_TIMEOUT)
+            if cc not in self.model.dispatch_delay_queue:
+                self.model.dispatch_delay_queue.add(cc, now)
+                _LOGGER.debug(f"received broadcast: {self.model.topics.name(topic_id)} - {argument}")
+                lane[cc] = None
+                self._enqueued_at[cc] = time.monotonic()
+                queued = True
+                if self._wakeup is not None:
+                    self._wakeup.set()
+        if self.metrics.enabled:
+            self.metrics.on_broadcast(topic_id, not queued, self.queue_depth)
 
     async def async_dispatch(self, *args):
-        q: Command
-        for q in self.model.broadcast_queue:
-            if q.command in self.model.subscribers.keys():
+        normal = iter(list(self.model.broadcast_queue))
+        seen: set[Command] = set()
+        burst = 0
+        while True:
+            q = self._next_priority(seen) if burst < PRIORITY_BURST else None
+            if q is None:
+                q = next((c for c in normal if c in self.model.broadcast_queue and c not in self._in_flight), None)
+            if q is None and burst >= PRIORITY_BURST:
+                q = self._next_priority(seen)
+            if q is None:
+                return
+            burst = burst + 1 if q.command in self._priority_topics else 0
+            seen.add(q)
+            await self._async_dispatch_command(q)
+
+    def _next_priority(self, seen: set[Command]) -> Command | None:
+        if not self.model.priority_queue:
+            return None
+        return next((c for c in self.model.priority_queue if c not in seen and c not in self._in_flight), None)
+
+    async def _async_dispatch_command(self, q: Command) -> None:
+        if q.expiration is not None and q.expiration < time.time():
+            _LOGGER.debug(f"dropping expired command {self.model.topics.name(q.command)} with {q.argument}")
+            if self.metrics.enabled:
+                self.metrics.on_expired(q.command)
+            self._dequeue(q)
+        elif self._subscribers_of(q.command):
+            if self.fan_out:
+                self._start_fan_out(q)
+            else:
                 await self.async_dequeue_and_broadcast(q)
 
     async def async_dequeue_and_broadcast(self, command: Command):
-        #if await self.async_ok_to_broadcast(command):
         async with self._dequeue_lock:
-            await self.async_update_dispatch_delay(command)
-            for func in self.model.subscribers.get(command.command, []):
-                _LOGGER.debug(f"broadcasting {command.command} with {command.argument}")
-                await self.async_broadcast_separator(func, command)
-            if command in self.model.broadcast_queue:
-                self.model.broadcast_queue.remove(command)
-
-    async def async_update_dispatch_delay(self, command: Command):
-        async with self._dispatch_lock:
-            q: Command
-            old_items = [k for k, v in self.model.dispatch_delay_queue.items() if time.time() - v > DISPATCH_DELAY_TIMEOUT]
-            for old in old_items:
-                self.model.dispatch_delay_queue.pop(old)
-                #_LOGGER.debug(f"removed {old} from dispatch_delay_queue")
-            # if command not in self.model.dispatch_delay_queue.keys():
-            #     self.model.dispatch_delay_queue[command] = time.time()
+            for subscriber in self._subscribers_of(command.command):
+                await self._invoke(subscriber, command)
+            self._dequeue(command)
+
+    def _start_fan_out(self, command: Command) -> None:
+        self._in_flight.add(command)
+        task = asyncio.get_running_loop().create_task(self._async_fan_out(command))
+        self._fan_out_tasks.add(task)
+        task.add_done_callback(self._fan_out_tasks.discard)
+
+    async def _async_fan_out(self, command: Command) -> None:
+        subscribers = self._subscribers_of(command.command)
+        try:
+            if command.command in self._ordered_topics:
+                async with self._topic_locks.setdefault(command.command, asyncio.Lock()):
+                    for subscriber in subscribers:
+                        await self._async_call_with_timeout(subscriber, command)
+            else:
+                await asyncio.gather(*(self._async_call_with_timeout(s, command) for s in subscribers))
+        finally:
+            self._in_flight.discard(command)
+            self._dequeue(command)
+
+    async def _async_call_with_timeout(self, subscriber: Subscriber, command: Command) -> None:
+        try:
+            await asyncio.wait_for(self._invoke(subscriber, command), self.handler_timeout)
+        except asyncio.TimeoutError:
+            self.overruns += 1
+            if self.metrics.enabled:
+                self.metrics.on_overrun(subscriber.name)
+            _LOGGER.warning(f"{subscriber.func} did not handle {self.model.topics.name(command.command)} within {self.handler_timeout}s and was cancelled.")
+
+    def _invoke(self, subscriber: Subscriber, command: Command) -> Awaitable:
+        _LOGGER.debug(f"broadcasting {self.model.topics.name(command.command)} with {command.argument}")
+        waited = self._record_latency(command)
+        if not self.metrics.enabled:
+            return self.async_broadcast_separator(subscriber, command)
+        return self._async_invoke_measured(subscriber, command, waited)
+
+    async def _async_invoke_measured(self, subscriber: Subscriber, command: Command, waited: float | None) -> None:
+        start = time.monotonic()
+        try:
+            await self.async_broadcast_separator(subscriber, command)
+        finally:
+            self.metrics.on_handled(command.command, subscriber.name, waited, time.monotonic() - start)
+
+    def _record_latency(self, command: Command) -> float | None:
+        enqueued_at = self._enqueued_at.get(command)
+        if enqueued_at is None:
+            return None
+        waited = time.monotonic() - enqueued_at
+        self.latency.add(waited)
+        return waited
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self.model.broadcast_queue) + len(self.model.priority_queue)
+
+    def diagnostics(self) -> dict:
+        ret = {
+            "queue_depth":     self.queue_depth,
+            "priority_queue_depth": len(self.model.priority_queue),
+            "in_flight":       len(self._in_flight),
+            "fan_out":         self.fan_out,
+            "overruns":        self.overruns,
+            "latency":         self.latency.metrics,
+            "metrics_enabled": self.metrics.enabled,
+        }
+        if self.metrics.enabled:
+            ret.update(self.metrics.as_dict())
+        return ret
+
+    def _dequeue(self, command: Command) -> None:
+        # both lanes, a topic may have been made priority after it was queued
+        self.model.priority_queue.pop(command, None)
+        self.model.broadcast_queue.pop(command, None)
+        self._enqueued_at.pop(command, None)
 
     @abstractmethod
-    async def async_broadcast_separator(self, func, command):
+    async def async_broadcast_separator(self, subscriber: Subscriber, command: Command):
         pass
 
     @staticmethod
-    def _call_func(func: Callable, command: Command) -> None:
-        if command.argument is not None:
-            if isinstance(command.argument, dict):
-                try:
-                    func(**command.argument)
-                except TypeError:
-                    func()
-            else:
-                try:
-                    func(command.argument)
-                except TypeError:
-                    func()
-        else:
-            func()
+    def _call_func(subscriber: Subscriber, command: Command) -> None:
+        try:
+            subscriber(command.argument)
+        except Exception as e:
+            _LOGGER.error(f"_call_func for {subscriber.func} with command {command}: {e}")
 
     @staticmethod
-    async def async_call_func(func: Callable, command: Command) -> None:
+    async def async_call_func(subscriber: Subscriber, command: Command) -> None:
         try:
-            if command.argument is not None:
-                if isinstance(command.argument, dict):
-                    try:
-                        await func(**command.argument)
-                    except TypeError:
-                        await func()
-                else:
-                    try:
-                        await func(command.argument)
-                    except TypeError:
-                        await func()
-            else:
-                await func()
+            await subscriber(command.argument)
         except Exception as e:
-            _LOGGER.error(f"async_call_func for {func} with command {command}: {e}")
+            _LOGGER.error(f"async_call_func for {subscriber.func} with command {command}: {e}")
 
     # async def async_ok_to_broadcast(self, command: Command) -> bool:
     #     if command not in self.model.wait_queue.keys():
@@ -1,28 +1,43 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from peaqevcore.common.models.observer_types import ObserverTypes
 
 
-@dataclass
+def _make_hashable(obj):
+    if isinstance(obj, (tuple, list)):
+        flat = tuple(obj)
+        try:
+            hash(flat)
+            return flat
+        except TypeError:
+            return tuple(_make_hashable(e) for e in obj)
+    if isinstance(obj, dict):
+        return tuple(sorted((k, _make_hashable(v)) for k, v in obj.items()))
+    if isinstance(obj, set):
+        return tuple(sorted(_make_hashable(e) for e in obj))
+    return obj
+
+
+@dataclass(frozen=True, slots=True, eq=False)
 class Command:
-    command: ObserverTypes
+    """
+    Immutable, so the hash of command and argument is computed once instead of on every queue-lookup.
+    The observer puts the topic-id from its TopicRegistry in command.
+    """
+    command: int | ObserverTypes | str
     expiration: float = None
     argument: any = None
+    _hash: int = field(init=False, repr=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "_hash", hash((self.command, _make_hashable(self.argument))))
 
     def __eq__(self, other):
-        if all([self.command == other.command, self.argument == other.argument]):
+        if self is other:
             return True
-        return False
+        if not isinstance(other, Command):
+            return NotImplemented
+        return self._hash == other._hash and self.command == other.command and self.argument == other.argument
 
     def __hash__(self):
-        def make_hashable(obj):
-            if isinstance(obj, (tuple, list)):
-                return tuple(make_hashable(e) for e in obj)
-            if isinstance(obj, dict):
-                return tuple(sorted((k, make_hashable(v)) for k, v in obj.items()))
-            if isinstance(obj, set):
-                return tuple(sorted(make_hashable(e) for e in obj))
-            return obj
-
-        return hash((self.command, make_hashable(self.argument)))
-
+        return self._hash
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import heapq
+from itertools import count
+
+from custom_components.peaqhvac.service.observer.models.command import Command
+
+
+class DispatchDelayQueue:
+    """
+    Commands that were broadcast recently, with the time they were received.
+    Membership is a dict-lookup and expiry pops a heap, so neither scans the whole queue.
+    """
+    def __init__(self):
+        self._received: dict[Command, float] = {}
+        self._heap: list[tuple[float, int, Command]] = []
+        self._counter = count()
+
+    def __contains__(self, command: Command) -> bool:
+        return command in self._received
+
+    def __len__(self) -> int:
+        return len(self._received)
+
+    def add(self, command: Command, received: float) -> None:
+        self._received[command] = received
+        heapq.heappush(self._heap, (received, next(self._counter), command))
+
+    def expire(self, older_than: float) -> int:
+        removed = 0
+        while self._heap and self._heap[0][0] < older_than:
+            received, _, command = heapq.heappop(self._heap)
+            if self._received.get(command) == received:
+                del self._received[command]
+                removed += 1
+        return removed
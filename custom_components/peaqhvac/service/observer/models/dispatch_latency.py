@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from collections import deque
+
+DISPATCH_LATENCY_SAMPLES = 1000
+
+
+class DispatchLatency:
+    """Broadcast-to-handler latencies, in seconds, of the most recent handler calls."""
+    def __init__(self, size: int = DISPATCH_LATENCY_SAMPLES):
+        self._samples: deque[float] = deque(maxlen=size)
+        self.count: int = 0
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        self.count += 1
+
+    def reset(self) -> None:
+        self._samples.clear()
+        self.count = 0
+
+    def percentile(self, p: float) -> float:
+        if not self._samples:
+            return 0
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+    @property
+    def p50(self) -> float:
+        return self.percentile(50)
+
+    @property
+    def p99(self) -> float:
+        return self.percentile(99)
+
+    @property
+    def metrics(self) -> dict:
+        return {
+            "count":  self.count,
+            "p50_ms": round(self.p50 * 1000, 2),
+            "p99_ms": round(self.p99 * 1000, 2),
+        }
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Callable
+
+HISTOGRAM_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000, 10000)
+
+
+class Histogram:
+    """Counts of observations in fixed millisecond buckets, the last bucket holds everything above the highest bound."""
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts: list[int] = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        self.count: int = 0
+        self.total: float = 0
+        self.max: float = 0
+
+    def observe(self, seconds: float) -> None:
+        ms = seconds * 1000
+        self.counts[bisect_left(HISTOGRAM_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def as_dict(self) -> dict:
+        labels = [f"<={b}ms" for b in HISTOGRAM_BUCKETS_MS] + [f">{HISTOGRAM_BUCKETS_MS[-1]}ms"]
+        return {
+            "count":   self.count,
+            "mean_ms": round(self.total / self.count, 2) if self.count else 0,
+            "max_ms":  round(self.max, 2),
+            "buckets": {label: c for label, c in zip(labels, self.counts) if c},
+        }
+
+
+class TopicMetrics:
+    __slots__ = ("broadcasts", "duplicates", "expired", "wait")
+
+    def __init__(self):
+        self.broadcasts: int = 0
+        self.duplicates: int = 0
+        self.expired: int = 0
+        self.wait = Histogram()
+
+    def as_dict(self) -> dict:
+        return {
+            "broadcasts": self.broadcasts,
+            "duplicates": self.duplicates,
+            "expired":    self.expired,
+            "wait":       self.wait.as_dict(),
+        }
+
+
+class SubscriberMetrics:
+    __slots__ = ("calls", "overruns", "cost")
+
+    def __init__(self):
+        self.calls: int = 0
+        self.overruns: int = 0
+        self.cost = Histogram()
+
+    def as_dict(self) -> dict:
+        return {"calls": self.calls, "overruns": self.overruns, "cost": self.cost.as_dict()}
+
+
+class ObserverMetrics:
+    """
+    Per-topic and per-subscriber counters of the observer. The observer only calls into this when enabled,
+    so a disabled instance costs one attribute-check per broadcast and handler call.
+    """
+    def __init__(self, enabled: bool = False, topic_name: Callable[[int], str] = str):
+        self.enabled = enabled
+        self._topic_name = topic_name
+        self.max_queue_depth: int = 0
+        self.topics: dict = defaultdict(TopicMetrics)
+        self.subscribers: dict[str, SubscriberMetrics] = defaultdict(SubscriberMetrics)
+
+    def on_broadcast(self, topic, duplicate: bool, queue_depth: int) -> None:
+        metrics = self.topics[topic]
+        metrics.broadcasts += 1
+        if duplicate:
+            metrics.duplicates += 1
+        if queue_depth > self.max_queue_depth:
+            self.max_queue_depth = queue_depth
+
+    def on_expired(self, topic) -> None:
+        self.topics[topic].expired += 1
+
+    def on_handled(self, topic, subscriber: str, waited: float | None, cost: float) -> None:
+        if waited is not None:
+            self.topics[topic].wait.observe(waited)
+        metrics = self.subscribers[subscriber]
+        metrics.calls += 1
+        metrics.cost.observe(cost)
+
+    def on_overrun(self, subscriber: str) -> None:
+        self.subscribers[subscriber].overruns += 1
+
+    def reset(self) -> None:
+        self.max_queue_depth = 0
+        self.topics.clear()
+        self.subscribers.clear()
+
+    def summary(self) -> dict:
+        slowest = max(self.subscribers.items(), key=lambda kv: kv[1].cost.max, default=None)
+        return {
+            "max_queue_depth": self.max_queue_depth,
+            "broadcasts":      sum(t.broadcasts for t in self.topics.values()),
+            "duplicates":      sum(t.duplicates for t in self.topics.values()),
+            "expired":         sum(t.expired for t in self.topics.values()),
+            "slowest_subscriber": slowest[0] if slowest else None,
+            "slowest_subscriber_max_ms": round(slowest[1].cost.max, 2) if slowest else 0,
+        }
+
+    def as_dict(self) -> dict:
+        return {
+            "max_queue_depth": self.max_queue_depth,
+            "topics":          {self._topic_name(k): v.as_dict() for k, v in self.topics.items()},
+            "subscribers":     {k: v.as_dict() for k, v in self.subscribers.items()},
+        }
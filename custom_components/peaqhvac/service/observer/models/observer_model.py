@@ -1,10 +1,16 @@
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from custom_components.peaqhvac.service.observer.models.command import Command
+from custom_components.peaqhvac.service.observer.models.dispatch_delay_queue import DispatchDelayQueue
+from custom_components.peaqhvac.service.observer.models.subscriber import Subscriber
+from custom_components.peaqhvac.service.observer.models.topic_registry import TopicRegistry
 
 @dataclass
 class ObserverModel:
-    subscribers: dict = field(default_factory=lambda: {})
-    broadcast_queue: list[Command] = field(default_factory=lambda: [])
+    topics: TopicRegistry = field(default_factory=TopicRegistry)
+    subscribers: list[list[Subscriber]] = field(default_factory=lambda: [])
+    broadcast_queue: OrderedDict[Command, None] = field(default_factory=OrderedDict)
+    priority_queue: OrderedDict[Command, None] = field(default_factory=OrderedDict)
     wait_queue: dict[Command, float] = field(default_factory=lambda: {})
-    dispatch_delay_queue: dict[Command,float] = field(default_factory=lambda: {})
+    dispatch_delay_queue: DispatchDelayQueue = field(default_factory=DispatchDelayQueue)
     active: bool = False
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import inspect
+from dataclasses import dataclass
+from functools import partial
+from typing import Callable
+
+from homeassistant.core import is_callback
+
+_POSITIONAL = (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD, inspect.Parameter.VAR_POSITIONAL)
+_KEYWORD = (inspect.Parameter.POSITIONAL_OR_KEYWORD, inspect.Parameter.KEYWORD_ONLY, inspect.Parameter.VAR_KEYWORD)
+
+
+@dataclass(frozen=True, slots=True)
+class Subscriber:
+    """
+    A handler with its signature inspected once, when it is added to the observer.
+    Handlers that take no arguments are called without the broadcast argument, dict-arguments are passed as kwargs.
+    Sync handlers decorated with @callback, or added with loop_safe, run on the loop instead of in the executor.
+    """
+    func: Callable
+    is_coroutine: bool
+    takes_args: bool
+    takes_kwargs: bool
+    loop_safe: bool = False
+    name: str = ""
+
+    @classmethod
+    def create(cls, func: Callable, loop_safe: bool = False) -> Subscriber:
+        inner = func
+        while isinstance(inner, partial):
+            inner = inner.func
+        is_coroutine = inspect.iscoroutinefunction(inner)
+        loop_safe = not is_coroutine and (loop_safe or is_callback(inner))
+        name = getattr(inner, "__qualname__", repr(inner))
+        try:
+            params = inspect.signature(func).parameters.values()
+        except (TypeError, ValueError):
+            # builtins without a signature, assume they take what they are given
+            return cls(func, is_coroutine, True, True, loop_safe, name)
+        return cls(
+            func,
+            is_coroutine,
+            any(p.kind in _POSITIONAL for p in params),
+            any(p.kind in _KEYWORD for p in params),
+            loop_safe,
+            name,
+        )
+
+    def __call__(self, argument=None):
+        if argument is None:
+            return self.func()
+        if isinstance(argument, dict):
+            return self.func(**argument) if self.takes_kwargs else self.func()
+        return self.func(argument) if self.takes_args else self.func()
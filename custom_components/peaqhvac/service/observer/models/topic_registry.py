@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import logging
+
+from peaqevcore.common.models.observer_types import ObserverTypes
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class TopicRegistry:
+    """
+    Interns observer topics to small integer ids. A topic is resolved the first time it is seen, string topics that
+    match an ObserverTypes-value become that member, so "prices changed" and ObserverTypes.PricesChanged share an id.
+    After that a topic, or its id, resolves with a single dict-lookup.
+    """
+    def __init__(self):
+        self._ids: dict[ObserverTypes | str, int] = {}
+        self.topics: list[ObserverTypes | str] = []
+
+    def __len__(self) -> int:
+        return len(self.topics)
+
+    def resolve(self, topic: ObserverTypes | str | int) -> int:
+        if type(topic) is int:
+            return topic
+        topic_id = self._ids.get(topic)
+        if topic_id is None:
+            topic_id = self._register(topic)
+        return topic_id
+
+    def name(self, topic_id: int) -> str:
+        return str(self.topics[topic_id])
+
+    def _register(self, topic: ObserverTypes | str) -> int:
+        canonical = self._convert(topic)
+        topic_id = self._ids.get(canonical)
+        if topic_id is None:
+            topic_id = len(self.topics)
+            self.topics.append(canonical)
+            self._ids[canonical] = topic_id
+        self._ids[topic] = topic_id
+        return topic_id
+
+    @staticmethod
+    def _convert(topic: ObserverTypes | str) -> ObserverTypes | str:
+        if isinstance(topic, str):
+            try:
+                topic = ObserverTypes(topic)
+                _LOGGER.debug(f"Observer: topic {topic} was not of type ObserverTypes but was converted.")
+            except ValueError:
+                pass
+        return topic
@@ -1,28 +1,30 @@
 from __future__ import annotations
 
 import logging
-from datetime import timedelta
 
-from homeassistant.helpers.event import async_track_time_interval
+from custom_components.peaqhvac.service.observer.const import HANDLER_TIMEOUT
 from custom_components.peaqhvac.service.observer.iobserver_coordinator import IObserver
 from custom_components.peaqhvac.service.observer.models.command import Command
-from custom_components.peaqhvac.extensionmethods import async_iscoroutine
+from custom_components.peaqhvac.service.observer.models.subscriber import Subscriber
 
 _LOGGER = logging.getLogger(__name__)
 
 
 class Observer(IObserver):
-    def __init__(self, hass):
-        super().__init__()
+    def __init__(self, hass, fan_out: bool = False, handler_timeout: float | None = HANDLER_TIMEOUT, metrics: bool = False):
+        super().__init__(fan_out=fan_out, handler_timeout=handler_timeout, metrics=metrics)
         self.hass = hass
-        async_track_time_interval(
-            self.hass, self.async_dispatch, timedelta(seconds=1)
-        )
+        self.start(hass.loop)
 
-    async def async_broadcast_separator(self, func, command: Command):
-        if await async_iscoroutine(func):
-            await self.async_call_func(func=func, command=command),
+    def _create_dispatcher(self, coro):
+        return self.hass.async_create_background_task(coro, "peaqhvac_observer_dispatch")
+
+    async def async_broadcast_separator(self, subscriber: Subscriber, command: Command):
+        if subscriber.is_coroutine:
+            await self.async_call_func(subscriber=subscriber, command=command)
+        elif subscriber.loop_safe:
+            self._call_func(subscriber, command)
         else:
             await self.hass.async_add_executor_job(
-                self._call_func, func, command
+                self._call_func, subscriber, command
             )
@@ -0,0 +1,90 @@
+"""
+Small timing/allocation harness for the benchmark tests. Results are printed in the pytest summary.
+
+The price data the benchmarks run on is synthetic, see price_corpus.py: the "year" is the 18 recorded hourly days
+repeated and scaled by season, and the quarter-hour corpus is those hourly prices repeated four times per hour.
+The numbers measure the cost of the hot paths on days of that size, not their behaviour on real 96-slot price shapes,
+and should not be quoted as more than that.
+"""
+import gc
+import time
+import tracemalloc
+from dataclasses import dataclass
+from statistics import mean
+from typing import Callable, Iterable
+
+
+@dataclass(frozen=True)
+class Budget:
+    mean_ms: float
+    max_ms: float
+    peak_kib: float
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    name: str
+    calls: int
+    mean_ms: float
+    max_ms: float
+    peak_kib: float
+
+    def exceeds(self, budget: Budget) -> list[str]:
+        ret = []
+        if self.mean_ms > budget.mean_ms:
+            ret.append(f"mean {self.mean_ms:.3f} ms > {budget.mean_ms} ms")
+        if self.max_ms > budget.max_ms:
+            ret.append(f"max {self.max_ms:.3f} ms > {budget.max_ms} ms")
+        if self.peak_kib > budget.peak_kib:
+            ret.append(f"peak {self.peak_kib:.1f} KiB > {budget.peak_kib} KiB")
+        return ret
+
+
+RESULTS: list[BenchmarkResult] = []
+
+
+ALLOCATION_SAMPLES = 25
+
+
+def run_benchmark(name: str, func: Callable, cases: Iterable[tuple], budget: Budget) -> BenchmarkResult:
+    """
+    Calls func(*case) for every case untraced for timings, then for an even sample of the cases under tracemalloc for
+    the peak allocation of a single call. Fails the calling test if the budget is exceeded.
+    Like timeit, the garbage collector is off while timing, so a collection of the whole test session's heap
+    does not land in a single call.
+    """
+    cases = list(cases)
+    timings = []
+    gc.collect()
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for case in cases:
+            start = time.perf_counter()
+            func(*case)
+            timings.append((time.perf_counter() - start) * 1000)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    peak = 0
+    tracemalloc.start()
+    try:
+        for case in cases[::max(1, len(cases) // ALLOCATION_SAMPLES)]:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            func(*case)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+    result = BenchmarkResult(name, len(cases), mean(timings), max(timings), peak / 1024)
+    RESULTS.append(result)
+    exceeded = result.exceeds(budget)
+    assert not exceeded, f"{name} over budget: {', '.join(exceeded)}"
+    return result
+
+
+def report() -> list[str]:
+    ret = [f"{'benchmark':<40}{'calls':>7}{'mean ms':>10}{'max ms':>10}{'peak KiB':>10}"]
+    for r in RESULTS:
+        ret.append(f"{r.name:<40}{r.calls:>7}{r.mean_ms:>10.3f}{r.max_ms:>10.3f}{r.peak_kib:>10.1f}")
+    return ret
@@ -0,0 +1,12 @@
+from .benchmark import RESULTS, report
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: timing and allocation budgets for the hot paths")
+
+
+def pytest_terminal_summary(terminalreporter):
+    if RESULTS:
+        terminalreporter.section("benchmarks")
+        for line in report():
+            terminalreporter.write_line(line)
@@ -0,0 +1,54 @@
+"""Recorded spot price days (hourly) used as shared test data."""
+import math
+import random
+from datetime import date, timedelta
+
+RECORDED_DAYS = {
+    "231213": [1.17, 1.14, 1.14, 1.11, 1.11, 1.14, 1.25, 1.59, 2.09, 2.09, 2.13, 2.14, 2.14, 1.61, 1.59, 1.62, 1.61, 1.68, 1.61, 1.52, 1.44, 1.36, 1.38, 1.27],
+    "231214": [1.17, 1.15, 1.16, 1.16, 1.19, 1.24, 1.47, 1.81, 1.97, 2.19, 2.19, 1.92, 1.81, 1.99, 2.19, 2.73, 2.73, 2.63, 2.11, 1.81, 1.62, 1.43, 1.41, 1.28],
+    "231215": [1.28, 1.24, 1.2, 1.15, 1.13, 1.2, 1.42, 1.57, 1.78, 1.72, 1.61, 1.51, 1.39, 1.31, 1.28, 1.3, 1.42, 1.37, 1.26, 1.19, 1.15, 1.14, 0.93, 1.05],
+    "231216": [0.69, 0.62, 0.56, 0.45, 0.38, 0.32, 0.31, 0.31, 0.31, 0.3, 0.3, 0.27, 0.26, 0.25, 0.26, 0.27, 0.28, 0.27, 0.24, 0.23, 0.15, 0.11, 0.08, 0.08],
+    "231217": [0.06, 0.06, 0.06, 0.06, 0.07, 0.08, 0.08, 0.08, 0.1, 0.11, 0.11, 0.13, 0.11, 0.13, 0.11, 0.14, 0.16, 0.24, 0.27, 0.27, 0.25, 0.24, 0.17, 0.16],
+    "231218": [0.22, 0.2, 0.17, 0.15, 0.16, 0.22, 0.3, 0.38, 0.43, 0.4, 0.38, 0.36, 0.32, 0.32, 0.32, 0.33, 0.36, 0.4, 0.39, 0.35, 0.32, 0.29, 0.26, 0.22],
+    "231219": [0.19, 0.15, 0.11, 0.1, 0.14, 0.2, 0.28, 0.41, 0.51, 0.52, 0.54, 0.51, 0.45, 0.41, 0.41, 0.4, 0.37, 0.36, 0.37, 0.32, 0.3, 0.27, 0.25, 0.24],
+    "240126": [0.97, 0.94, 0.91, 0.87, 0.86, 0.82, 0.9, 0.97, 1, 0.98, 0.95, 0.91, 0.82, 0.74, 0.78, 0.77, 0.81, 0.89, 0.85, 0.55, 0.47, 0.44, 0.42, 0.39],
+    "240129": [0.07, 0.05, 0.05, 0.05, 0.06, 0.08, 0.16, 0.35, 0.37, 0.43, 0.65, 0.76, 0.97, 0.97, 0.98, 1.34, 1.57, 1.83, 1.69, 1.55, 1.34, 1.24, 0.99, 0.96],
+    "240130": [0.93, 0.79, 0.76, 0.76, 0.76, 0.93, 0.96, 1.08, 1.26, 1.24, 1.14, 1, 0.98, 0.98, 0.99, 0.97, 0.98, 1.07, 0.95, 0.91, 0.88, 0.84, 0.4, 0.42],
+    "240131": [0.34, 0.34, 0.34, 0.34, 0.35, 0.35, 0.44, 0.87, 0.9, 0.53, 0.37, 0.35, 0.34, 0.33, 0.32, 0.31, 0.32, 0.31, 0.22, 0.13, 0.08, 0.08, 0.07, 0.05],
+    "240201": [0.05, 0.05, 0.04, 0.04, 0.05, 0.05, 0.08, 0.12, 0.13, 0.14, 0.13, 0.12, 0.13, 0.12, 0.13, 0.15, 0.25, 0.57, 0.65, 0.28, 0.31, 0.3, 0.25, 0.18],
+    "240202": [0.19, 0.21, 0.21, 0.23, 0.24, 0.26, 0.37, 0.9, 0.93, 0.9, 0.88, 0.69, 0.43, 0.41, 0.4, 0.4, 0.38, 0.37, 0.34, 0.28, 0.24, 0.18, 0.09, 0.08],
+    "240203": [0.06, 0.06, 0.05, 0.05, 0.05, 0.05, 0.07, 0.08, 0.08, 0.11, 0.11, 0.08, 0.08, 0.08, 0.08, 0.09, 0.13, 0.22, 0.22, 0.13, 0.08, 0.1, 0.08, 0.08],
+    "240314": [0.45, 0.37, 0.34, 0.26, 0.28, 0.36, 0.45, 0.5, 0.5, 0.5, 0.5, 0.51, 0.5, 0.48, 0.46, 0.43, 0.39, 0.37, 0.4, 0.35, 0.28, 0.13, 0.08, 0.08],
+    "240315": [0.08, 0.08, 0.08, 0.08, 0.08, 0.27, 0.46, 0.57, 0.63, 0.67, 0.71, 0.63, 0.62, 0.61, 0.69, 0.78, 0.8, 0.86, 0.87, 0.81, 0.76, 0.69, 0.64, 0.61],
+    "240910": [0.07, 0.07, 0.06, 0.06, 0.07, 0.07, 0.08, 0.11, 0.11, 0.11, 0.11, 0.1, 0.08, 0.08, 0.08, 0.08, 0.08, 0.12, 0.12, 0.12, 0.11, 0.1, 0.08, 0.08],
+    "240911": [0.08, 0.08, 0.08, 0.08, 0.09, 0.11, 0.13, 0.21, 0.6, 0.6, 0.6, 0.59, 0.4, 0.37, 0.32, 0.15, 0.22, 0.35, 0.3, 0.21, 0.14, 0.12, 0.12, 0.11],
+}
+
+
+def to_quarters(prices: list[float]) -> list[float]:
+    """Spreads hourly prices over four quarter-hour slots. There is no variation within the hour."""
+    return [p for p in prices for _ in range(4)]
+
+
+def consecutive_days() -> list[tuple[list[float], list[float]]]:
+    """Pairs of (today, tomorrow) from the recorded days."""
+    days = list(RECORDED_DAYS.values())
+    return list(zip(days, days[1:]))
+
+
+def year_of_days(start: date = date(2023, 1, 1), days: int = 365, quarters: bool = False) -> list[tuple[date, list[float]]]:
+    """
+    A deterministic year of (day, prices) built from the recorded days.
+    Each day is a recorded day scaled by season with a few percent of noise per slot.
+    Only the 18 recorded days are real, so the year has no more distinct price shapes than those.
+    With quarters=True the days are hourly prices repeated four times, not recorded quarter-hour prices.
+    """
+    rng = random.Random(1338)
+    recorded = list(RECORDED_DAYS.values())
+    ret = []
+    for i in range(days):
+        day = start + timedelta(days=i)
+        season = 1 + 0.5 * math.cos(2 * math.pi * day.timetuple().tm_yday / 365)
+        prices = to_quarters(recorded[i % len(recorded)]) if quarters else recorded[i % len(recorded)]
+        ret.append((day, [round(p * season * rng.uniform(0.95, 1.05), 3) for p in prices]))
+    return ret
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+
+from custom_components.peaqhvac.service.hub.hub import Hub
+from custom_components.peaqhvac.service.models.config_model import (
+    ConfigModel, HeatingOptions, MiscOptions)
+from custom_components.peaqhvac.service.models.enums.hvacbrands import \
+    HvacBrand
+from custom_components.peaqhvac.service.models.enums.offset_strategy import \
+    OffsetStrategy
+from custom_components.peaqhvac.service.models.enums.sensortypes import \
+    SensorType
+from custom_components.peaqhvac.test.replay.replay_hass import (
+    ReplayHass, ServiceCall)
+from custom_components.peaqhvac.test.replay.replay_spotprice import (
+    REPLAY_SPOTPRICE_ENTITY, ReplaySpotPrice)
+from custom_components.peaqhvac.test.replay.simulated_clock import (
+    SimulatedClock, VirtualTimeEventLoop, simulated_wallclock)
+from custom_components.peaqhvac.test.replay.trace import Trace, TraceRecord
+
+_LOGGER = logging.getLogger(__name__)
+
+REPLAY_SYSTEMID = "replay"
+REPLAY_INDOOR_ENTITY = "sensor.replay_indoors"
+REPLAY_OUTDOOR_ENTITY = "sensor.replay_outdoors"
+
+
+@dataclass(frozen=True)
+class CostModel:
+    """
+    A rough model of the electricity the heat pump uses, good enough to compare settings against each other.
+    Heat demand is linear in the indoor-outdoor difference and every offset-step changes it by offset_gain.
+    """
+    heat_loss_kw_per_degree: float = 0.15
+    cop: float = 3.0
+    offset_gain: float = 0.05
+    water_boost_kwh: float = 2.0
+
+    def heating_kwh(self, record: TraceRecord, offset: int, hours: float) -> float:
+        demand = max(0.0, record.indoor_temp - record.outdoor_temp) * self.heat_loss_kw_per_degree
+        return max(0.0, demand * (1 + self.offset_gain * offset)) / self.cop * hours
+
+
+@dataclass
+class ReplayResult:
+    service_calls: list[ServiceCall] = field(default_factory=list)
+    events: list[tuple[str, dict]] = field(default_factory=list)
+    offsets: list[int] = field(default_factory=list)
+    energy_kwh: float = 0
+    cost: float = 0
+    water_boosts: int = 0
+
+
+class ReplayHub(Hub):
+    """The real hub, with the prices served from a trace instead of a spotprice-integration."""
+    def __init__(self, hass, hub_options: ConfigModel, trace: Trace):
+        self._trace = trace
+        super().__init__(hass, hub_options)
+        # class-level state in these would otherwise leak between replays in the same process
+        self.update_system.update_list = {}
+        self.update_system.control_modules = {}
+        self.update_system.periodic_update_timers = {k: 0 for k in self.update_system.periodic_update_timers}
+        self.hvac.water_heater.model._event_log = []
+
+    def _create_spotprice(self):
+        return ReplaySpotPrice(self, self._trace)
+
+
+class ReplayEngine:
+    """
+    Replays a trace through Hub -> StateChanges -> OffsetCoordinator -> HouseHeaterCoordinator -> WaterHeater ->
+    UpdateSystem on a simulated clock, and collects the service calls that would have been made and their cost.
+    The timers of the hub run at most once per trace-slot, which is what makes a year replay in minutes.
+    """
+    def __init__(
+            self,
+            trace: Trace,
+            tolerance: int = 3,
+            strategy: OffsetStrategy = OffsetStrategy.Heuristic,
+            set_temperature: float = 21,
+            cost_model: CostModel = CostModel(),
+            heating: HeatingOptions | None = None,
+    ):
+        self.trace = trace
+        self.tolerance = tolerance
+        self.strategy = strategy
+        self.set_temperature = set_temperature
+        self.cost_model = cost_model
+        self.heating = heating or HeatingOptions(
+            outdoor_temp_stop_heating=15,
+            non_hours_water_boost=[7, 11, 12, 15, 16, 17, 23],
+            demand_hours_water_boost=[],
+            low_dm=-600,
+            very_cold_temp=-12,
+        )
+        self._hass: ReplayHass | None = None
+        self._result = ReplayResult()
+        self._current_price: float = 0
+
+    def run(self) -> ReplayResult:
+        clock = SimulatedClock(self.trace.records[0].dt)
+        loop = VirtualTimeEventLoop(clock, quantum=self.trace.resolution * 60)
+        try:
+            with simulated_wallclock(clock):
+                loop.run_until_complete(self._async_run(loop, clock))
+                self._cancel_pending(loop)
+        finally:
+            loop.close()
+        return self._result
+
+    def _create_options(self) -> ConfigModel:
+        options = ConfigModel()
+        options.misc = MiscOptions(offset_strategy=self.strategy)
+        options.heating = self.heating
+        options.indoor_temp = [REPLAY_INDOOR_ENTITY]
+        options.outdoor_temp = [REPLAY_OUTDOOR_ENTITY]
+        options.systemid = REPLAY_SYSTEMID
+        options.hvacbrand = HvacBrand.Nibe
+        options.weather_entity = None
+        options.hvac_tolerance = self.tolerance
+        return options
+
+    async def _async_run(self, loop: asyncio.AbstractEventLoop, clock: SimulatedClock) -> None:
+        self._hass = ReplayHass(loop, clock, self._on_service_call)
+        self._result = ReplayResult(service_calls=self._hass.services.calls, events=self._hass.bus.fired)
+        self._publish(self.trace.records[0])
+        hub = ReplayHub(self._hass, self._create_options(), self.trace)
+        self._offset_entity = hub.hvac.get_sensor(SensorType.Offset)
+        self._water_boost_entity = hub.hvac.get_sensor(SensorType.HotWaterBoost)
+        self._hass.states.async_set(self._offset_entity, 0)
+        hub.sensors.set_temp_indoors.value = self.set_temperature
+        # what the switch- and sensor-platforms would do on setup
+        hub.hvac.house_heater.control_module = True
+        hub.hvac.water_heater.control_module = True
+        hub.hvac.house_ventilation.control_module = True
+        hub.hvac.water_heater.is_initialized = True
+        await hub.async_setup()
+        hours = self.trace.resolution / 60
+        for record in self.trace:
+            delay = (record.dt - clock.now()).total_seconds()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._publish(record)
+            await hub.states.batcher.async_flush()
+            await hub.hvac.async_hvac_watertemp()
+            self._account(record, hours)
+
+    def _publish(self, record: TraceRecord) -> None:
+        states = self._hass.states
+        self._current_price = record.price
+        states.async_set(REPLAY_INDOOR_ENTITY, record.indoor_temp)
+        states.async_set(REPLAY_OUTDOOR_ENTITY, record.outdoor_temp)
+        states.async_set(f"number.{REPLAY_SYSTEMID}_current_value", record.degree_minutes)
+        states.async_set(f"sensor.{REPLAY_SYSTEMID}_hot_water_charging_bt6", record.water_temp)
+        states.async_set(f"sensor.{REPLAY_SYSTEMID}_priority", "Heating")
+        states.async_set(f"sensor.{REPLAY_SYSTEMID}_int_elec_add_heat", "Off")
+        states.async_set(f"sensor.{REPLAY_SYSTEMID}_current_fan_mode", 1)
+        states.async_set(REPLAY_SPOTPRICE_ENTITY, record.price)
+
+    def _account(self, record: TraceRecord, hours: float) -> None:
+        offset = int(float(self._hass.states.get(self._offset_entity).state))
+        kwh = self.cost_model.heating_kwh(record, offset, hours)
+        self._result.offsets.append(offset)
+        self._result.energy_kwh += kwh
+        self._result.cost += kwh * record.price
+
+    def _on_service_call(self, call: ServiceCall) -> None:
+        entity = call.data.get("entity_id")
+        if entity == self._offset_entity and call.service == "set_value":
+            self._hass.states.async_set(entity, call.data["value"])
+        elif entity == self._water_boost_entity and call.service == "turn_on":
+            kwh = self.cost_model.water_boost_kwh
+            self._result.water_boosts += 1
+            self._result.energy_kwh += kwh
+            self._result.cost += kwh * self._current_price
+
+    @staticmethod
+    def _cancel_pending(loop: asyncio.AbstractEventLoop) -> None:
+        pending = asyncio.all_tasks(loop)
+        for task in pending:
+            task.cancel()
+        if pending:
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+
+
+def replay(trace: Trace, **kwargs) -> ReplayResult:
+    return ReplayEngine(trace, **kwargs).run()
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable
+
+from homeassistant.const import EVENT_STATE_CHANGED, MAJOR_VERSION, MINOR_VERSION
+from homeassistant.core import Event, State
+
+_LOGGER = logging.getLogger(__name__)
+
+# Home Assistant 2024.4 changed bus event-filters from taking the event to taking its data.
+EVENT_FILTER_TAKES_DATA = (MAJOR_VERSION, MINOR_VERSION) >= (2024, 4)
+
+
+@dataclass(frozen=True)
+class ServiceCall:
+    dt: datetime
+    domain: str
+    service: str
+    data: dict
+
+
+class ReplayStates:
+    def __init__(self, hass: ReplayHass):
+        self._hass = hass
+        self._states: dict[str, State] = {}
+
+    def get(self, entity_id: str) -> State | None:
+        return self._states.get(entity_id)
+
+    def async_set(self, entity_id: str, new_state, attributes: dict | None = None) -> None:
+        old = self._states.get(entity_id)
+        new = State(entity_id, str(new_state), attributes or {})
+        if old is not None and old.state == new.state and old.attributes == new.attributes:
+            return
+        self._states[entity_id] = new
+        self._hass.bus.async_fire(EVENT_STATE_CHANGED, {"entity_id": entity_id, "old_state": old, "new_state": new})
+
+
+class ReplayBus:
+    def __init__(self):
+        self._listeners: dict[str, list[tuple[Callable, Callable | None]]] = defaultdict(list)
+        self.fired: list[tuple[str, dict]] = []
+
+    def async_listen(self, event_type: str, listener: Callable, event_filter: Callable | None = None, **kwargs) -> Callable:
+        entry = (listener, event_filter)
+        self._listeners[event_type].append(entry)
+        return lambda: self._listeners[event_type].remove(entry)
+
+    def async_fire(self, event_type: str, event_data: dict | None = None, *args, **kwargs) -> None:
+        event_data = event_data or {}
+        if event_type != EVENT_STATE_CHANGED:
+            self.fired.append((event_type, event_data))
+        listeners = self._listeners.get(event_type)
+        if not listeners:
+            return
+        event = Event(event_type, event_data)
+        filter_arg = event_data if EVENT_FILTER_TAKES_DATA else event
+        for listener, event_filter in list(listeners):
+            if event_filter is None or event_filter(filter_arg):
+                listener(event)
+
+    fire = async_fire
+
+
+class ReplayServices:
+    def __init__(self, hass: ReplayHass, on_call: Callable[[ServiceCall], None] | None = None):
+        self._hass = hass
+        self._on_call = on_call
+        self.calls: list[ServiceCall] = []
+
+    async def async_call(self, domain: str, service: str, service_data: dict | None = None, blocking: bool = False, return_response: bool = False, **kwargs):
+        call = ServiceCall(self._hass.clock.now(), domain, service, dict(service_data or {}))
+        self.calls.append(call)
+        if self._on_call is not None:
+            self._on_call(call)
+        return None
+
+
+class ReplayHass:
+    """
+    The parts of HomeAssistant that peaqhvac uses, backed by dicts and running on the replay loop.
+    Executor jobs are run inline so that a replay is deterministic.
+    """
+    def __init__(self, loop: asyncio.AbstractEventLoop, clock, on_service_call: Callable[[ServiceCall], None] | None = None):
+        self.loop = loop
+        self.clock = clock
+        self.data: dict = {}
+        self.bus = ReplayBus()
+        self.states = ReplayStates(self)
+        self.services = ReplayServices(self, on_service_call)
+
+    def async_add_executor_job(self, target: Callable, *args) -> asyncio.Future:
+        future = self.loop.create_future()
+        try:
+            future.set_result(target(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def async_create_task(self, target, *args, **kwargs) -> asyncio.Task:
+        return self.loop.create_task(target)
+
+    def async_create_background_task(self, target, name: str, *args, **kwargs) -> asyncio.Task:
+        return self.loop.create_task(target, name=name)
+
+    def async_run_hass_job(self, hassjob, *args, **kwargs):
+        ret = hassjob.target(*args)
+        if asyncio.iscoroutine(ret):
+            return self.loop.create_task(ret)
+        return ret
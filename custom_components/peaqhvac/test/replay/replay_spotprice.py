@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+
+from peaqevcore.common.models.observer_types import ObserverTypes
+from peaqevcore.common.spotprice.models.spotprice_model import SpotPriceModel
+
+from custom_components.peaqhvac.test.replay.trace import Trace
+
+_LOGGER = logging.getLogger(__name__)
+
+REPLAY_SPOTPRICE_ENTITY = "sensor.nordpool_replay"
+TOMORROW_PUBLISHED_HOUR = 13
+
+
+class ReplaySpotPrice:
+    """Serves the prices of a trace the way the spotprice-updater serves Nordpool, with tomorrow published at 13."""
+    def __init__(self, hub, trace: Trace):
+        self.hub = hub
+        self._trace = trace
+        self.model = SpotPriceModel(source="replay")
+        self.model.entity = REPLAY_SPOTPRICE_ENTITY
+        self._is_initialized: bool = False
+
+    @property
+    def entity(self) -> str:
+        return self.model.entity
+
+    @property
+    def is_initialized(self) -> bool:
+        return self._is_initialized
+
+    @property
+    def state(self) -> float:
+        return self.model.state
+
+    @property
+    def tomorrow_valid(self) -> bool:
+        return self.model.tomorrow_valid
+
+    async def async_update_spotprice(self, initial: bool = False) -> None:
+        now = datetime.now()
+        today = self._trace.prices(now.date())
+        tomorrow = []
+        if now.hour >= TOMORROW_PUBLISHED_HOUR:
+            tomorrow = self._trace.prices(now.date() + timedelta(days=1))
+        state = self.hub.state_machine.states.get(self.entity)
+        if state is not None:
+            self.model.state = float(state.state)
+        self.model.tomorrow_valid = len(tomorrow) > 0
+        if today != self.model.prices or tomorrow != self.model.prices_tomorrow:
+            self.model.prices = today
+            self.model.prices_tomorrow = tomorrow
+            self._is_initialized = True
+            await self.hub.observer.async_broadcast(ObserverTypes.PricesChanged, [today, tomorrow])
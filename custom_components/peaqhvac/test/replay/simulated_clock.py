@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import datetime as _dt
+import math
+import sys
+import time as _time
+
+_REAL_DATETIME = _dt.datetime
+_REAL_DATE = _dt.date
+
+
+class SimulatedClock:
+    """Wall-clock and monotonic time for a replay. Only moves when advanced."""
+    def __init__(self, start: _dt.datetime):
+        self._start = start
+        self.monotonic: float = 0.0
+
+    def now(self, tz=None) -> _dt.datetime:
+        ret = _REAL_DATETIME.combine(self._start.date(), self._start.time()) + _dt.timedelta(seconds=self.monotonic)
+        return ret.astimezone(tz) if tz is not None else ret
+
+    def time(self) -> float:
+        return self.now().timestamp()
+
+    def advance(self, seconds: float) -> None:
+        self.monotonic += max(0.0, seconds)
+
+
+class VirtualTimeEventLoop(asyncio.SelectorEventLoop):
+    """
+    An event loop running on a SimulatedClock. Instead of waiting for its next timer it jumps the clock forward.
+    Jumps are rounded up to the quantum, so periodic timers shorter than the quantum run once per quantum.
+    """
+    def __init__(self, clock: SimulatedClock, quantum: float = 0):
+        super().__init__()
+        self.clock = clock
+        self._quantum = quantum
+        self._real_select = self._selector.select
+        self._selector.select = self._select
+
+    def time(self) -> float:
+        return self.clock.monotonic
+
+    def _select(self, timeout=None):
+        if timeout is not None and timeout > 0:
+            target = self.clock.monotonic + timeout
+            if self._quantum:
+                target = math.ceil(round(target / self._quantum, 9)) * self._quantum
+            self.clock.advance(target - self.clock.monotonic)
+            timeout = 0
+        return self._real_select(timeout)
+
+
+class _SimulatedDatetimeMeta(type):
+    def __instancecheck__(cls, obj):
+        return isinstance(obj, _REAL_DATETIME)
+
+    def __subclasscheck__(cls, subclass):
+        return issubclass(subclass, _REAL_DATETIME)
+
+
+class _SimulatedDateMeta(type):
+    def __instancecheck__(cls, obj):
+        return isinstance(obj, _REAL_DATE)
+
+    def __subclasscheck__(cls, subclass):
+        return issubclass(subclass, _REAL_DATE)
+
+
+class _SimulatedTime:
+    """Stands in for the time-module, delegating everything but time() to it."""
+    def __init__(self, clock: SimulatedClock):
+        self._clock = clock
+
+    def time(self) -> float:
+        return self._clock.time()
+
+    def localtime(self, secs: float | None = None):
+        return _time.localtime(self._clock.time() if secs is None else secs)
+
+    def __getattr__(self, item):
+        return getattr(_time, item)
+
+
+def _simulated_classes(clock: SimulatedClock) -> tuple[type, type]:
+    class SimulatedDatetime(_REAL_DATETIME, metaclass=_SimulatedDatetimeMeta):
+        @classmethod
+        def now(cls, tz=None):
+            return clock.now(tz)
+
+        @classmethod
+        def today(cls):
+            return clock.now()
+
+        @classmethod
+        def utcnow(cls):
+            return clock.now(_dt.timezone.utc).replace(tzinfo=None)
+
+    class SimulatedDate(_REAL_DATE, metaclass=_SimulatedDateMeta):
+        @classmethod
+        def today(cls):
+            return clock.now().date()
+
+    return SimulatedDatetime, SimulatedDate
+
+
+@contextlib.contextmanager
+def simulated_wallclock(clock: SimulatedClock, packages: tuple[str, ...] = ("custom_components.peaqhvac", "peaqevcore")):
+    """Points datetime.now(), date.today() and time.time() in the given, already imported, packages to the clock."""
+    sim_datetime, sim_date = _simulated_classes(clock)
+    sim_time = _SimulatedTime(clock)
+    replacements = {_REAL_DATETIME: sim_datetime, _REAL_DATE: sim_date, _time: sim_time}
+    patched = []
+    for name, module in list(sys.modules.items()):
+        if module is None or not name.startswith(packages) or name.startswith(__name__):
+            continue
+        for attr, value in list(vars(module).items()):
+            for real, fake in replacements.items():
+                if value is real:
+                    setattr(module, attr, fake)
+                    patched.append((module, attr, real))
+    try:
+        yield clock
+    finally:
+        for module, attr, real in patched:
+            setattr(module, attr, real)
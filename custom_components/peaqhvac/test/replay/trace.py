@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from itertools import groupby
+
+TRACE_COLUMNS = ("dt", "price", "indoor_temp", "outdoor_temp", "degree_minutes", "water_temp")
+
+
+@dataclass(frozen=True)
+class TraceRecord:
+    dt: datetime
+    price: float
+    indoor_temp: float
+    outdoor_temp: float
+    degree_minutes: int
+    water_temp: float
+
+
+class Trace:
+    """Evenly spaced, recorded readings of a house. Prices are the spot prices of each slot."""
+    def __init__(self, records: list[TraceRecord]):
+        self.records = sorted(records, key=lambda r: r.dt)
+        self.resolution = int((self.records[1].dt - self.records[0].dt).total_seconds() // 60) if len(self.records) > 1 else 60
+        self._prices: dict[date, list[float]] = {
+            day: [r.price for r in recs] for day, recs in groupby(self.records, key=lambda r: r.dt.date())
+        }
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    @property
+    def step(self) -> timedelta:
+        return timedelta(minutes=self.resolution)
+
+    def prices(self, day: date) -> list[float]:
+        return self._prices.get(day, [])
+
+    @classmethod
+    def from_csv(cls, path: str) -> Trace:
+        """Reads a csv with the TRACE_COLUMNS as header and ISO-formatted datetimes."""
+        with open(path, newline="") as f:
+            return cls([
+                TraceRecord(
+                    dt=datetime.fromisoformat(row["dt"]),
+                    price=float(row["price"]),
+                    indoor_temp=float(row["indoor_temp"]),
+                    outdoor_temp=float(row["outdoor_temp"]),
+                    degree_minutes=int(float(row["degree_minutes"])),
+                    water_temp=float(row["water_temp"]),
+                )
+                for row in csv.DictReader(f)
+            ])
+
+    def to_csv(self, path: str) -> None:
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(TRACE_COLUMNS)
+            for r in self.records:
+                writer.writerow([r.dt.isoformat(), r.price, r.indoor_temp, r.outdoor_temp, r.degree_minutes, r.water_temp])
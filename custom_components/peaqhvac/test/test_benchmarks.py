@@ -0,0 +1,332 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from statistics import mean
+from types import SimpleNamespace
+from typing import Callable
+
+import pytest
+
+from ..service.hub.weather_prognosis import WeatherPrognosis
+from ..service.hvac.offset.offset_utils import set_offset_dict
+from ..service.hvac.offset.peakfinder import identify_peaks
+from peaqevcore.common.models.observer_types import ObserverTypes
+
+from ..service.hvac.water_heater.water_heater_next_start import (
+    NextStartPostModel, NextWaterBoost)
+from ..service.models.enums.hvacoperations import HvacOperations
+from ..service.models.offset_timeline import OffsetTimeline
+from ..service.models.prognosis_export_model import PrognosisExportModel
+from ..service.models.weather_object import WeatherObject
+from ..service.observer.iobserver_coordinator import IObserver
+from ..service.observer.observer_coordinator import Observer
+from .benchmark import RESULTS, Budget, BenchmarkResult, run_benchmark
+from .price_corpus import year_of_days
+
+pytestmark = pytest.mark.benchmark
+
+HOURLY = year_of_days()
+QUARTERLY = year_of_days(quarters=True)
+
+
+@dataclass(frozen=True)
+class Run:
+    func: Callable
+    cases: list[tuple]
+    check: Callable[[], None] | None = None
+
+
+@dataclass(frozen=True)
+class HotPath:
+    """A hot path to time. setup gets the event loop of the run and returns what to call and with which cases."""
+    name: str
+    budget: Budget
+    setup: Callable[[asyncio.AbstractEventLoop], Run]
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class _Observer(IObserver):
+    async def async_broadcast_separator(self, subscriber, command):
+        if subscriber.is_coroutine:
+            await self.async_call_func(subscriber, command)
+        else:
+            self._call_func(subscriber, command)
+
+
+def _midnight(day) -> datetime:
+    return datetime.combine(day, datetime.min.time())
+
+
+def _set_offset_dict(corpus) -> Callable[[asyncio.AbstractEventLoop], Run]:
+    def setup(loop):
+        return Run(
+            lambda prices, dt: loop.run_until_complete(set_offset_dict(prices, dt, 0, {})),
+            [
+                (today + tomorrow, _midnight(day) + timedelta(hours=13))
+                for (day, today), (_, tomorrow) in zip(corpus, corpus[1:])
+            ]
+        )
+    return setup
+
+
+def _identify_peaks(corpus) -> Callable[[asyncio.AbstractEventLoop], Run]:
+    return lambda loop: Run(identify_peaks, [(prices,) for _, prices in corpus])
+
+
+def _get_next_start(loop) -> Run:
+    return Run(NextWaterBoost().get_next_start, [
+        (NextStartPostModel(
+            prices=today + tomorrow,
+            demand_hours=[20, 21],
+            non_hours=[11, 12, 16, 17],
+            current_temp=38,
+            temp_trend=-0.8,
+            latest_boost=_midnight(day) + timedelta(hours=6),
+            dt=_midnight(day) + timedelta(hours=13, minutes=5)),)
+        for (day, today), (_, tomorrow) in zip(HOURLY, HOURLY[1:])
+    ])
+
+
+def _prognosis_240h() -> WeatherPrognosis:
+    prognosis = WeatherPrognosis(None, None, None, None)
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    prognosis.prognosis_list = [
+        WeatherObject((now + timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M:%S+00:00"), "cloudy", -3 + i % 7, 4.2, 180, 10, 0)
+        for i in range(240)
+    ]
+    return prognosis
+
+
+def _get_hvac_prognosis(loop) -> Run:
+    prognosis = _prognosis_240h()
+    return Run(prognosis.get_hvac_prognosis, [(-1.5 + i / 10,) for i in range(50)])
+
+
+def _get_hvac_prognosis_cached(loop) -> Run:
+    """Sensor updates that do not move the outdoor temperature by 0.1 or more, as between most polls."""
+    prognosis = _prognosis_240h()
+
+    def check():
+        assert prognosis.cache.hit_ratio > 0.9
+
+    return Run(prognosis.get_hvac_prognosis, [(-1.5 + (i % 3) / 100,) for i in range(200)], check)
+
+
+def _forecast_payload(hours: int, base: float) -> list[dict]:
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    return [
+        {
+            "datetime": (now + timedelta(hours=i)).isoformat(),
+            "condition": "cloudy",
+            "temperature": base + i % 7,
+            "wind_speed": 4.2,
+            "wind_bearing": 180,
+            "precipitation_probability": 10,
+            "precipitation": 0,
+        }
+        for i in range(hours)
+    ]
+
+
+def _set_prognosis(changed: bool) -> Callable[[asyncio.AbstractEventLoop], Run]:
+    """A poll of weather.get_forecasts, with a new forecast every time or the same one as last time."""
+    def setup(loop):
+        prognosis = WeatherPrognosis(None, None, SimpleNamespace(async_broadcast=lambda *args: asyncio.sleep(0)), None)
+        payloads = [_forecast_payload(240, base) for base in ((-3, -2) if changed else (-3,))]
+        return Run(
+            lambda payload: loop.run_until_complete(prognosis.async_set_prognosis(payload)),
+            [(payloads[i % len(payloads)],) for i in range(50)]
+        )
+    return setup
+
+
+def _weatherprognosis_adjustment(loop) -> Run:
+    """A quarterly offset-timeline for today and tomorrow against a ten day forecast."""
+    midnight = _midnight(datetime.now().date())
+    prognosis = WeatherPrognosis(None, None, None, None)
+    prognosis.set_export_model([
+        PrognosisExportModel(-3 + i % 7, -3 + i % 7, -5 + i % 7, midnight.astimezone(timezone.utc) + timedelta(hours=i), i % 12, 0)
+        for i in range(240)
+    ])
+    return Run(prognosis.get_weatherprognosis_adjustment, [
+        (OffsetTimeline(midnight, 15, [(i // (4 + d % 5)) % 7 - 3 for i in range(192)]),)
+        for d in range(50)
+    ])
+
+
+def _broadcast_batch(day: int) -> list[tuple]:
+    """What the hub broadcasts in a busy stretch: offsets, control modules, prices, and plenty of repeats."""
+    _, today = QUARTERLY[day]
+    _, tomorrow = QUARTERLY[day + 1]
+    ret = []
+    for i in range(500):
+        match i % 5:
+            case 0:
+                ret.append((ObserverTypes.UpdateOperation, (HvacOperations.Offset, i % 7 - 3)))
+            case 1:
+                ret.append(("control_module_changed", ("WaterHeater", i % 2 == 0)))
+            case 2:
+                ret.append((ObserverTypes.PricesChanged, [today, tomorrow if i % 10 else today]))
+            case 3:
+                ret.append((ObserverTypes.OffsetRecalculation, i % 24))
+            case _:
+                ret.append((ObserverTypes.PrognosisChanged, None))
+    return ret
+
+
+def _observer_broadcast(metrics: bool) -> Callable[[asyncio.AbstractEventLoop], Run]:
+    def setup(loop):
+        def broadcast_and_dispatch(batch):
+            observer = _Observer(metrics=metrics)
+            for command in {c for c, _ in batch}:
+                observer.add(command, lambda *args, **kwargs: None)
+            for command, argument in batch:
+                observer.broadcast(command, argument)
+            loop.run_until_complete(observer.async_dispatch())
+
+        return Run(broadcast_and_dispatch, [(_broadcast_batch(day),) for day in range(0, 360, 4)])
+    return setup
+
+
+def _subscriber_mix(loop_safe: bool) -> dict:
+    """Like the hub: coroutines for the heavy topics, cheap sync setters on tolerance and outdoor temperature."""
+    state = {}
+
+    async def async_handler(val=None):
+        state["async"] = val
+
+    def setter(val=None):
+        state["sync"] = val
+
+    return {
+        ObserverTypes.UpdateOperation: [(async_handler, False)],
+        ObserverTypes.OffsetRecalculation: [(async_handler, False)],
+        ObserverTypes.PrognosisChanged: [(async_handler, False)],
+        ObserverTypes.HvacToleranceChanged: [(setter, loop_safe)],
+        ObserverTypes.TemperatureOutdoorsChanged: [(setter, loop_safe), (setter, loop_safe)],
+    }
+
+
+def _mix_batch(day: int) -> list[tuple]:
+    ret = []
+    for i in range(200):
+        match i % 4:
+            case 0:
+                ret.append((ObserverTypes.TemperatureOutdoorsChanged, round(-10 + (day + i) % 20 * 0.5, 1)))
+            case 1:
+                ret.append((ObserverTypes.HvacToleranceChanged, i))
+            case 2:
+                ret.append((ObserverTypes.UpdateOperation, (HvacOperations.Offset, i % 7 - 3)))
+            case _:
+                ret.append((ObserverTypes.OffsetRecalculation, i))
+    return ret
+
+
+def _observer_mix(lane: str) -> Callable[[asyncio.AbstractEventLoop], Run]:
+    def setup(loop):
+        hass = SimpleNamespace(
+            loop=loop,
+            async_add_executor_job=lambda target, *args: loop.run_in_executor(None, target, *args),
+            async_create_background_task=lambda coro, name: loop.create_task(coro),
+        )
+
+        async def broadcast_and_dispatch(batch):
+            observer = Observer(hass, metrics=lane == "metrics")
+            for command, subscribers in _subscriber_mix(loop_safe=lane != "executor").items():
+                for func, loop_safe in subscribers:
+                    observer.add(command, func, loop_safe=loop_safe)
+            for command, argument in batch:
+                observer.broadcast(command, argument)
+            await observer.async_dispatch()
+            observer.stop()
+
+        return Run(
+            lambda batch: loop.run_until_complete(broadcast_and_dispatch(batch)),
+            [(_mix_batch(day),) for day in range(0, 360, 6)]
+        )
+    return setup
+
+
+HOT_PATHS = [
+    HotPath("set_offset_dict[hourly]", Budget(mean_ms=4, max_ms=25, peak_kib=32), _set_offset_dict(HOURLY)),
+    HotPath("set_offset_dict[quarterly]", Budget(mean_ms=10, max_ms=50, peak_kib=96), _set_offset_dict(QUARTERLY)),
+    HotPath("identify_peaks[hourly]", Budget(mean_ms=0.5, max_ms=10, peak_kib=12), _identify_peaks(HOURLY)),
+    HotPath("identify_peaks[quarterly]", Budget(mean_ms=1, max_ms=10, peak_kib=12), _identify_peaks(QUARTERLY)),
+    HotPath("get_next_start[hourly]", Budget(mean_ms=20, max_ms=80, peak_kib=48), _get_next_start),
+    HotPath("get_hvac_prognosis[240h]", Budget(mean_ms=5, max_ms=25, peak_kib=160), _get_hvac_prognosis),
+    HotPath("get_hvac_prognosis[240h,cached]", Budget(mean_ms=0.5, max_ms=25, peak_kib=16), _get_hvac_prognosis_cached),
+    HotPath("set_prognosis[240h]", Budget(mean_ms=3, max_ms=20, peak_kib=128), _set_prognosis(changed=True)),
+    HotPath("set_prognosis[240h,unchanged]", Budget(mean_ms=0.5, max_ms=10, peak_kib=32), _set_prognosis(changed=False)),
+    HotPath("weatherprognosis_adjustment[192x240h]", Budget(mean_ms=2, max_ms=15, peak_kib=32), _weatherprognosis_adjustment),
+    HotPath("observer_broadcast[500]", Budget(mean_ms=10, max_ms=40, peak_kib=64), _observer_broadcast(metrics=False)),
+    HotPath("observer_broadcast[500,metrics]", Budget(mean_ms=12, max_ms=50, peak_kib=96), _observer_broadcast(metrics=True)),
+    HotPath("observer_mix[executor]", Budget(mean_ms=60, max_ms=200, peak_kib=128), _observer_mix("executor")),
+    HotPath("observer_mix[inline]", Budget(mean_ms=10, max_ms=40, peak_kib=96), _observer_mix("inline")),
+    HotPath("observer_mix[metrics]", Budget(mean_ms=12, max_ms=50, peak_kib=128), _observer_mix("metrics")),
+]
+
+
+@pytest.mark.parametrize("hot_path", HOT_PATHS, ids=str)
+def test_hot_path(hot_path):
+    loop = asyncio.new_event_loop()
+    try:
+        run = hot_path.setup(loop)
+        run_benchmark(hot_path.name, run.func, run.cases, hot_path.budget)
+        if run.check is not None:
+            run.check()
+    finally:
+        loop.run_until_complete(loop.shutdown_default_executor())
+        loop.close()
+
+
+ACTUATION_LATENCY_BUDGET_MS = 20
+
+
+@pytest.mark.parametrize("lanes", [True, False])
+def test_actuation_latency_under_load(lanes):
+    """
+    Floods the observer with slow recompute-commands while every tenth of them asks for an offset-write, and reports
+    the worst time an offset-write waited for its handler. With lanes a write goes ahead of the recomputes still
+    queued, without them it waits for the whole backlog.
+    """
+    async def flood() -> tuple[float, float, int, list[int]]:
+        observer = _Observer(metrics=True)
+        actuation = observer.topic(ObserverTypes.UpdateOperation)
+        recomputed = []
+        behind = []
+
+        async def recompute(val):
+            await asyncio.sleep(0.001)
+            recomputed.append(val)
+            if val % 10 == 0:
+                observer.broadcast(actuation, (HvacOperations.Offset, val))
+
+        async def write_offset(val):
+            behind.append(len(recomputed) - 1 - recomputed.index(val[1]))
+
+        observer.add(ObserverTypes.UpdateOperation, write_offset, ordered=True, priority=lanes)
+        observer.add(ObserverTypes.PrognosisChanged, recompute)
+        for val in range(60):
+            observer.broadcast(ObserverTypes.PrognosisChanged, val)
+        observer.start()
+        while observer.queue_depth:
+            await asyncio.sleep(0.005)
+        observer.stop()
+        wait = observer.metrics.topics[actuation].wait
+        return wait.max, wait.total / wait.count, wait.count, behind
+
+    loop = asyncio.new_event_loop()
+    try:
+        runs = [loop.run_until_complete(flood()) for _ in range(5)]
+    finally:
+        loop.close()
+    worst = max(r[0] for r in runs)
+    RESULTS.append(BenchmarkResult(
+        f"actuation_latency[{'lanes' if lanes else 'fifo'}]", sum(r[2] for r in runs), mean(r[1] for r in runs), worst, 0
+    ))
+    expected = [0] * 6 if lanes else [59 - val for val in range(0, 60, 10)]
+    assert all(r[3] == expected for r in runs)
+    if lanes:
+        assert worst < ACTUATION_LATENCY_BUDGET_MS, f"worst actuation latency {worst:.1f} ms"
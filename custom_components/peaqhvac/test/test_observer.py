@@ -0,0 +1,421 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from homeassistant.core import callback
+from peaqevcore.common.models.observer_types import ObserverTypes
+
+from ..service.hvac.const import HOUSE_HEATER_NAME
+from ..service.hvac.update_system import UpdateSystem
+from ..service.models.enums.hvacoperations import HvacOperations
+from ..service.observer import iobserver_coordinator
+from ..service.observer.iobserver_coordinator import IObserver
+from ..service.observer.models.command import Command
+from ..service.observer.models.dispatch_delay_queue import DispatchDelayQueue
+from ..service.observer.models.subscriber import Subscriber
+from ..service.observer.observer_coordinator import Observer
+
+
+class _Observer(IObserver):
+    async def async_broadcast_separator(self, subscriber, command):
+        if subscriber.is_coroutine:
+            await self.async_call_func(subscriber=subscriber, command=command)
+        else:
+            self._call_func(subscriber, command)
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_broadcast_dispatches_without_polling():
+    observer = _Observer()
+    received = asyncio.Event()
+
+    async def handler(val):
+        received.set()
+
+    observer.add(ObserverTypes.PrognosisChanged, handler)
+    observer.start()
+    start = time.monotonic()
+    observer.broadcast(ObserverTypes.PrognosisChanged, 1)
+    await asyncio.wait_for(received.wait(), timeout=0.5)
+    assert time.monotonic() - start < 0.1
+    assert not observer.model.broadcast_queue
+    observer.stop()
+
+
+@pytest.mark.asyncio
+async def test_duplicates_are_dropped_and_order_is_kept():
+    observer = _Observer()
+    received = []
+    observer.add(ObserverTypes.PrognosisChanged, lambda val: received.append(val))
+    for val in [1, 2, 2, 3, 1]:
+        observer.broadcast(ObserverTypes.PrognosisChanged, val)
+    observer.start()
+    await _settle()
+    assert received == [1, 2, 3]
+    observer.broadcast(ObserverTypes.PrognosisChanged, 1)
+    await _settle()
+    assert received == [1, 2, 3]
+    observer.stop()
+
+
+@pytest.mark.asyncio
+async def test_broadcast_during_dispatch_is_picked_up():
+    observer = _Observer()
+    received = []
+
+    async def first():
+        received.append("first")
+        observer.broadcast("second")
+
+    observer.add("first", first)
+    observer.add("second", lambda: received.append("second"))
+    observer.start()
+    observer.broadcast("first")
+    await _settle()
+    assert received == ["first", "second"]
+    observer.stop()
+
+
+@pytest.mark.asyncio
+async def test_broadcast_from_a_thread_wakes_the_dispatcher():
+    observer = _Observer()
+    received = asyncio.Event()
+    observer.add("from_thread", lambda: received.set())
+    observer.start()
+    thread = threading.Thread(target=observer.broadcast, args=("from_thread",))
+    thread.start()
+    thread.join()
+    await asyncio.wait_for(received.wait(), timeout=0.5)
+    observer.stop()
+
+
+@pytest.mark.asyncio
+async def test_latency_is_recorded():
+    observer = _Observer()
+    observer.add(ObserverTypes.PrognosisChanged, lambda val: None)
+    observer.start()
+    for val in range(100):
+        observer.broadcast(ObserverTypes.PrognosisChanged, val)
+    await _settle()
+    assert observer.latency.count == 100
+    assert 0 <= observer.latency.p50 <= observer.latency.p99 < 0.5
+    assert set(observer.latency.metrics) == {"count", "p50_ms", "p99_ms"}
+    observer.stop()
+
+
+@pytest.mark.asyncio
+async def test_expired_commands_are_dropped(monkeypatch):
+    observer = _Observer()
+    received = []
+    observer.add("late", lambda: received.append("late"))
+    monkeypatch.setattr(iobserver_coordinator, "COMMAND_VALIDITY", -1)
+    observer.broadcast("late")
+    observer.broadcast("unsubscribed")
+    observer.start()
+    await _settle()
+    assert received == []
+    assert not observer.model.broadcast_queue
+    observer.stop()
+
+
+def test_dispatch_delay_queue_expires_oldest_first():
+    queue = DispatchDelayQueue()
+    first, second = Command("a", argument=1), Command("a", argument=2)
+    queue.add(first, 10)
+    queue.add(second, 20)
+    assert first in queue and Command("a", argument=1) in queue
+    assert queue.expire(15) == 1
+    assert first not in queue and second in queue
+    queue.add(second, 30)
+    assert queue.expire(25) == 0
+    assert second in queue
+    assert queue.expire(35) == 1
+    assert len(queue) == 0
+
+
+def test_command_is_immutable_and_equal_regardless_of_expiration():
+    first = Command(ObserverTypes.PricesChanged, 1.0, [[1.0, 2.0], [3.0]])
+    second = Command(ObserverTypes.PricesChanged, 2.0, [[1.0, 2.0], [3.0]])
+    assert first == second and hash(first) == hash(second)
+    assert first != Command(ObserverTypes.PricesChanged, 1.0, [[1.0, 2.0], [4.0]])
+    assert Command("x", argument={"a": {1, 2}}) == Command("x", argument={"a": {2, 1}})
+    assert not hasattr(first, "__dict__")
+    with pytest.raises(AttributeError):
+        first.argument = None
+
+
+def test_subscriber_is_called_the_way_its_signature_allows():
+    calls = []
+
+    class Handler:
+        def no_args(self):
+            calls.append("no_args")
+
+        def one_arg(self, val):
+            calls.append(("one_arg", val))
+
+        def kwargs(self, a, b=None):
+            calls.append(("kwargs", a, b))
+
+        async def coro(self, val):
+            calls.append(("coro", val))
+
+    handler = Handler()
+    assert not Subscriber.create(handler.one_arg).is_coroutine
+    assert Subscriber.create(handler.coro).is_coroutine
+    Subscriber.create(handler.no_args)(5)
+    Subscriber.create(handler.one_arg)(5)
+    Subscriber.create(handler.kwargs)({"a": 1, "b": 2})
+    Subscriber.create(handler.no_args)({"a": 1})
+    assert calls == ["no_args", ("one_arg", 5), ("kwargs", 1, 2), "no_args"]
+
+
+@pytest.mark.asyncio
+async def test_type_errors_in_handlers_are_not_retried():
+    observer = _Observer()
+    calls = []
+
+    def broken(val):
+        calls.append(val)
+        raise TypeError("inside the handler")
+
+    observer.add("broken", broken)
+    observer.start()
+    observer.broadcast("broken", 1)
+    await _settle()
+    assert calls == [1]
+    assert not observer.model.broadcast_queue
+    observer.stop()
+
+
+@pytest.mark.asyncio
+async def test_fan_out_does_not_let_a_slow_handler_block_others():
+    observer = _Observer(fan_out=True, handler_timeout=1)
+    release = asyncio.Event()
+    received = []
+
+    async def slow():
+        await release.wait()
+        received.append("slow")
+
+    async def fast():
+        received.append("fast")
+
+    observer.add("slow", slow)
+    observer.add("fast", fast)
+    observer.start()
+    observer.broadcast("slow")
+    observer.broadcast("fast")
+    await _settle()
+    assert received == ["fast"]
+    assert Command(observer.topic("slow")) in observer.model.broadcast_queue
+    release.set()
+    await _settle()
+    assert received == ["fast", "slow"]
+    assert not observer.model.broadcast_queue
+    observer.stop()
+
+
+@pytest.mark.asyncio
+async def test_fan_out_counts_overruns():
+    observer = _Observer(fan_out=True, handler_timeout=0.01)
+    done = []
+
+    async def hangs():
+        await asyncio.sleep(10)
+
+    observer.add("hangs", hangs)
+    observer.add("hangs", lambda: done.append(True))
+    observer.start()
+    observer.broadcast("hangs")
+    await asyncio.sleep(0.05)
+    assert observer.overruns == 1
+    assert done == [True]
+    assert not observer.model.broadcast_queue
+    observer.stop()
+
+
+@pytest.mark.asyncio
+async def test_fan_out_keeps_order_on_ordered_topics():
+    observer = _Observer(fan_out=True)
+    received = []
+
+    async def handler(val):
+        await asyncio.sleep(0.01 * (3 - val))
+        received.append(val)
+
+    observer.add("ordered", handler, ordered=True)
+    observer.add("unordered", lambda val: None)
+    observer.start()
+    for val in range(3):
+        observer.broadcast("ordered", val)
+    await asyncio.sleep(0.1)
+    assert received == [0, 1, 2]
+    observer.stop()
+
+
+@pytest.mark.asyncio
+async def test_loop_safe_handlers_skip_the_executor():
+    loop = asyncio.get_running_loop()
+    executor_jobs = []
+
+    def add_executor_job(target, *args):
+        executor_jobs.append(target)
+        return loop.run_in_executor(None, target, *args)
+
+    hass = SimpleNamespace(
+        loop=loop,
+        async_add_executor_job=add_executor_job,
+        async_create_background_task=lambda coro, name: loop.create_task(coro),
+    )
+    threads = {}
+
+    @callback
+    def decorated(val):
+        threads["decorated"] = threading.current_thread()
+
+    def registered(val):
+        threads["registered"] = threading.current_thread()
+
+    def blocking(val):
+        threads["blocking"] = threading.current_thread()
+
+    observer = Observer(hass)
+    observer.add("topic", decorated)
+    observer.add("topic", registered, loop_safe=True)
+    observer.add("topic", blocking)
+    observer.broadcast("topic", 1)
+    for _ in range(20):
+        await asyncio.sleep(0.01)
+        if len(threads) == 3:
+            break
+    assert threads["decorated"] is threading.main_thread()
+    assert threads["registered"] is threading.main_thread()
+    assert threads["blocking"] is not threading.main_thread()
+    assert len(executor_jobs) == 1
+    observer.stop()
+
+
+@pytest.mark.asyncio
+async def test_metrics_count_per_topic_and_subscriber():
+    observer = _Observer(metrics=True)
+
+    async def handler(val):
+        await asyncio.sleep(0)
+
+    observer.add(ObserverTypes.PrognosisChanged, handler)
+    for val in [1, 1, 2]:
+        observer.broadcast(ObserverTypes.PrognosisChanged, val)
+    observer.start()
+    await _settle()
+    topic = observer.metrics.topics[observer.topic(ObserverTypes.PrognosisChanged)]
+    assert (topic.broadcasts, topic.duplicates, topic.wait.count) == (3, 1, 2)
+    subscriber = observer.metrics.subscribers[handler.__qualname__]
+    assert subscriber.calls == 2 and sum(subscriber.cost.counts) == 2
+    diagnostics = observer.diagnostics()
+    assert diagnostics["max_queue_depth"] == 2
+    assert diagnostics["topics"][str(ObserverTypes.PrognosisChanged)]["duplicates"] == 1
+    assert observer.metrics.summary()["slowest_subscriber"] == handler.__qualname__
+    observer.stop()
+
+
+@pytest.mark.asyncio
+async def test_disabled_metrics_stay_empty():
+    observer = _Observer()
+    observer.add("topic", lambda: None)
+    observer.broadcast("topic")
+    observer.start()
+    await _settle()
+    assert not observer.metrics.topics and not observer.metrics.subscribers
+    assert "topics" not in observer.diagnostics()
+    observer.stop()
+
+
+def test_topics_are_interned_once():
+    observer = _Observer()
+    prices = observer.topic(ObserverTypes.PricesChanged)
+    assert observer.topic("prices changed") == prices
+    assert observer.topic(prices) == prices
+    custom = observer.topic("water_boost_start")
+    assert custom != prices
+    assert observer.model.topics.topics[prices] is ObserverTypes.PricesChanged
+    assert observer.model.topics.name(custom) == "water_boost_start"
+
+
+@pytest.mark.asyncio
+async def test_broadcasting_by_id_or_by_converted_string_reaches_the_same_subscribers():
+    observer = _Observer()
+    received = []
+    observer.add("prices changed", lambda val: received.append(val))
+    observer.start()
+    observer.broadcast(ObserverTypes.PricesChanged, 1)
+    observer.broadcast(observer.topic(ObserverTypes.PricesChanged), 2)
+    await _settle()
+    assert received == [1, 2]
+    observer.stop()
+
+
+@pytest.mark.asyncio
+async def test_priority_lane_goes_first_but_does_not_starve_the_rest():
+    observer = _Observer()
+    received = []
+    observer.add("actuate", lambda val: received.append(f"P{val}"), priority=True)
+    observer.add("recompute", lambda val: received.append(f"N{val}"))
+    for val in range(3):
+        observer.broadcast("recompute", val)
+    for val in range(10):
+        observer.broadcast("actuate", val)
+    observer.start()
+    await _settle()
+    assert received == [
+        "P0", "P1", "P2", "P3", "N0", "P4", "P5", "P6", "P7", "N1", "P8", "P9", "N2"
+    ]
+    assert observer.queue_depth == 0
+    observer.stop()
+
+
+@pytest.mark.asyncio
+async def test_priority_command_broadcast_during_dispatch_jumps_the_queue():
+    observer = _Observer()
+    received = []
+
+    async def recompute(val):
+        received.append(f"N{val}")
+        if val == 0:
+            observer.broadcast("actuate", 1)
+
+    observer.add("actuate", lambda val: received.append(f"P{val}"), priority=True)
+    observer.add("recompute", recompute)
+    for val in range(3):
+        observer.broadcast("recompute", val)
+    observer.start()
+    await _settle()
+    assert received == ["N0", "P1", "N1", "N2"]
+    observer.stop()
+
+
+@pytest.mark.asyncio
+async def test_control_module_toggle_does_not_take_a_priority_slot():
+    observer = _Observer()
+    system = UpdateSystem(None, None, observer, None)
+    system.control_modules = {}
+    system.update_list = {}
+    system.periodic_update_timers = {HvacOperations.Offset: time.time(), HvacOperations.VentBoost: time.time()}
+    received = []
+    observer.add("control_module_changed", lambda val: received.append("toggle"))
+    observer.add(ObserverTypes.UpdateOperation, lambda val: received.append(val[1]))
+    observer.broadcast("control_module_changed", (HOUSE_HEATER_NAME, True))
+    for val in range(iobserver_coordinator.PRIORITY_BURST):
+        observer.broadcast(ObserverTypes.UpdateOperation, (HvacOperations.Offset, val))
+    observer.start()
+    await _settle()
+    assert received == [*range(iobserver_coordinator.PRIORITY_BURST), "toggle"]
+    assert system.control_modules == {HOUSE_HEATER_NAME: True}
+    observer.stop()
@@ -0,0 +1,44 @@
+from datetime import datetime
+
+from ..service.hvac.offset.offset_cache import OffsetCache
+from ..service.models.enums.hvac_presets import HvacPresets
+from .price_corpus import RECORDED_DAYS
+
+P231213 = RECORDED_DAYS["231213"]
+P231214 = RECORDED_DAYS["231214"]
+
+
+def test_same_inputs_within_hour_hits():
+    cache = OffsetCache()
+    key1 = cache.make_key(P231213, P231214, 3, HvacPresets.Normal, 0, datetime(2023, 12, 13, 20, 1))
+    key2 = cache.make_key(list(P231213), list(P231214), 3, HvacPresets.Normal, 0, datetime(2023, 12, 13, 20, 59))
+    assert cache.get(key1) is None
+    cache.put(key1, {"a": 1})
+    assert cache.get(key2) == {"a": 1}
+    assert cache.info["hits"] == 1
+    assert cache.info["misses"] == 1
+
+
+def test_changed_inputs_miss():
+    cache = OffsetCache()
+    dt = datetime(2023, 12, 13, 20, 1)
+    cache.put(cache.make_key(P231213, P231214, 3, HvacPresets.Normal, 0, dt), {"a": 1})
+    assert cache.get(cache.make_key(P231213, [], 3, HvacPresets.Normal, 0, dt)) is None
+    assert cache.get(cache.make_key(P231213, P231214, 2, HvacPresets.Normal, 0, dt)) is None
+    assert cache.get(cache.make_key(P231213, P231214, 3, HvacPresets.Away, 0, dt)) is None
+    assert cache.get(cache.make_key(P231213, P231214, 3, HvacPresets.Normal, 0.1, dt)) is None
+    assert cache.get(cache.make_key(P231213, P231214, 3, HvacPresets.Normal, 0, dt.replace(hour=21))) is None
+    assert cache.info["misses"] == 5
+
+
+def test_least_recently_used_is_evicted():
+    cache = OffsetCache(maxsize=2)
+    dt = datetime(2023, 12, 13, 20, 1)
+    keys = [cache.make_key(P231213, None, tol, HvacPresets.Normal, 0, dt) for tol in range(3)]
+    cache.put(keys[0], {"a": 0})
+    cache.put(keys[1], {"a": 1})
+    cache.get(keys[0])
+    cache.put(keys[2], {"a": 2})
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == {"a": 0}
+    assert cache.info["size"] == 2
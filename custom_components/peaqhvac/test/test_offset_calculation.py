@@ -0,0 +1,117 @@
+import asyncio
+import dataclasses
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from peaqevcore.services.hourselection.hoursselection import Hoursselection
+
+from ..service.hub.loop_latency import LoopLatencyMonitor
+from ..service.hvac.offset.offset_calculation import (OffsetSnapshot,
+                                                      calculate_offsets,
+                                                      calculate_raw_offsets)
+from ..service.hvac.offset.offset_coordinator_standalone import \
+    OffsetCoordinatorStandAlone
+from ..service.models.enums.hvac_presets import HvacPresets
+from .price_corpus import consecutive_days
+
+
+def _snapshot(weather_adjustment=None) -> OffsetSnapshot:
+    today, tomorrow = consecutive_days()[0]
+    return OffsetSnapshot(
+        prices=tuple(today),
+        prices_tomorrow=tuple(tomorrow),
+        min_price=0,
+        tolerance=3,
+        indoors_preset=HvacPresets.Normal,
+        now=datetime(2023, 12, 13, 14, 10),
+        weather_adjustment=weather_adjustment
+    )
+
+
+def test_snapshot_is_immutable():
+    snapshot = _snapshot()
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        snapshot.tolerance = 5
+
+
+def test_weather_adjustment_is_clamped_and_raw_kept():
+    snapshot = _snapshot(lambda raw: {k: v + 10 for k, v in raw.items()})
+    raw, calculated = calculate_offsets(snapshot)
+    assert raw == calculate_raw_offsets(snapshot)
+    assert len(calculated) == len(raw)
+    assert max(calculated.values()) <= 3
+
+
+def test_cached_raw_is_reused():
+    snapshot = _snapshot()
+    cached = calculate_raw_offsets(snapshot)
+    raw, calculated = calculate_offsets(snapshot, cached)
+    assert raw is cached
+    assert calculated is cached
+
+
+async def _max_lag(run) -> float:
+    monitor = LoopLatencyMonitor(interval=0.01)
+    monitor.start()
+    await asyncio.sleep(0.05)
+    await run()
+    await asyncio.sleep(0.05)
+    monitor.stop()
+    return monitor.max_lag
+
+
+def _coordinator(offset_executor: bool) -> OffsetCoordinatorStandAlone:
+    observer = SimpleNamespace(add=lambda *args: None, broadcast=lambda *args: None)
+    hub = SimpleNamespace(
+        state_machine=SimpleNamespace(loop=asyncio.get_running_loop()),
+        observer=observer,
+        options=SimpleNamespace(hvac_tolerance=3, misc=SimpleNamespace(offset_executor=offset_executor))
+    )
+    return OffsetCoordinatorStandAlone(hub, observer, Hoursselection())
+
+
+@pytest.mark.asyncio
+async def test_executor_keeps_loop_responsive():
+    def slow_weather(raw):
+        time.sleep(0.2)
+        return raw
+
+    snapshot = _snapshot(slow_weather)
+    inline = _coordinator(offset_executor=False)
+    offloaded = _coordinator(offset_executor=True)
+
+    inline_lag = await _max_lag(lambda: inline._async_calculate(snapshot))
+    executor_lag = await _max_lag(lambda: offloaded._async_calculate(snapshot))
+    inline.stop()
+    offloaded.stop()
+    assert inline_lag >= 0.15
+    assert executor_lag < inline_lag / 2
+
+
+@pytest.mark.asyncio
+async def test_stop_shuts_the_executor_down():
+    coordinator = _coordinator(offset_executor=True)
+    await coordinator._async_calculate(_snapshot())
+    executor = coordinator._executor
+    coordinator.stop()
+    assert coordinator._executor is None
+    with pytest.raises(RuntimeError):
+        executor.submit(print)
+
+
+@pytest.mark.asyncio
+async def test_price_update_does_not_wait_for_the_recalculation_window():
+    coordinator = _coordinator(offset_executor=False)
+    coordinator._hub.is_initialized = True
+    coordinator._hub.prognosis = SimpleNamespace(prognosis=[])
+    coordinator._hub.sensors = SimpleNamespace(set_temp_indoors=SimpleNamespace(preset=HvacPresets.Normal))
+    today, tomorrow = consecutive_days()[0]
+    start = time.monotonic()
+    await coordinator.async_update_prices([today, tomorrow])
+    assert time.monotonic() - start < 0.5
+    assert coordinator.recalculation_metrics["triggers"] == 1
+    assert coordinator.recalculation_metrics["recomputes"] == 0
+    assert len(coordinator.model.raw_offsets) > 0
+    coordinator.stop()
@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from ..service.models.offset_model import OffsetModel
+
+
+def _model() -> OffsetModel:
+    hub = SimpleNamespace(
+        observer=SimpleNamespace(add=lambda *args: None, broadcast=lambda *args: None),
+        options=SimpleNamespace(hvac_tolerance=3)
+    )
+    return OffsetModel(hub)
+
+
+def _offsets(start: datetime, count: int, minutes: int) -> dict:
+    return {start + timedelta(minutes=minutes * i): i % 7 - 3 for i in range(count)}
+
+
+def test_raw_offset_at_hourly():
+    model = _model()
+    start = datetime(2023, 12, 13)
+    model.raw_offsets = _offsets(start, 48, 60)
+    assert model.raw_offset_at(start - timedelta(seconds=1)) is None
+    assert model.raw_offset_at(start) == model.raw_offsets[start]
+    assert model.raw_offset_at(datetime(2023, 12, 13, 5, 59)) == model.raw_offsets[datetime(2023, 12, 13, 5)]
+    assert model.raw_offset_at(datetime(2023, 12, 20)) == model.raw_offsets[datetime(2023, 12, 14, 23)]
+
+
+def test_raw_offset_at_quarters():
+    model = _model()
+    start = datetime(2023, 12, 13)
+    model.raw_offsets = _offsets(start, 192, 15)
+    assert model.raw_offset_at(datetime(2023, 12, 13, 5, 44)) == model.raw_offsets[datetime(2023, 12, 13, 5, 30)]
+
+
+def test_day_slices_follow_recalculation():
+    model = _model()
+    today = datetime.combine(datetime.now().date(), datetime.min.time())
+    model.calculated_offsets = _offsets(today, 192, 15)
+    assert list(model.current_offset_dict) == [k for k in model.calculated_offsets if k.date() == today.date()]
+    assert len(model.current_offset_dict_tomorrow) == 96
+    assert model.current_offset_dict.values() == model.calculated_offsets.values()[:96]
+    model.calculated_offsets = _offsets(today, 24, 60)
+    assert len(model.current_offset_dict) == 24
+    assert model.current_offset_dict_tomorrow == {}
+
+
+def test_day_slices_follow_the_date():
+    model = _model()
+    yesterday = datetime.combine(datetime.now().date() - timedelta(days=1), datetime.min.time())
+    model.calculated_offsets = _offsets(yesterday, 72, 60)
+    assert model.current_offset_dict.start == yesterday + timedelta(days=1)
+    assert model.current_offset_dict.values() == model.calculated_offsets.values()[24:48]
+    assert model.current_offset_dict_tomorrow.values() == model.calculated_offsets.values()[48:]
+
+
+def test_raw_offset_at_is_none_without_offsets():
+    assert _model().raw_offset_at(datetime.now()) is None
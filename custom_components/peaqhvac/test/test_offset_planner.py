@@ -0,0 +1,83 @@
+import time
+from datetime import datetime
+
+import pytest
+
+from ..service.hvac.offset.offset_calculation import (OffsetSnapshot,
+                                                      calculate_raw_offsets,
+                                                      clamp_and_smooth)
+from ..service.hvac.offset.offset_coordinator_factory import OffsetFactory
+from ..service.hvac.offset.offset_planner import plan_offsets, planned_offsets
+from ..service.hvac.offset.offset_utils import (deviation_timeline,
+                                               flat_day_lower_tolerance,
+                                               offset_per_day)
+from ..service.models.enums.hvac_presets import HvacPresets
+from ..service.models.enums.offset_strategy import OffsetStrategy
+from .price_corpus import consecutive_days, to_quarters
+
+
+def _horizons():
+    for today, tomorrow in consecutive_days():
+        yield today + tomorrow
+        yield to_quarters(today) + to_quarters(tomorrow)
+
+
+@pytest.mark.parametrize("tolerance", [3, 10])
+def test_plan_respects_band_and_step(tolerance):
+    for prices in _horizons():
+        deviations = deviation_timeline(prices, datetime(2023, 12, 13, 3), 0).values()
+        plan = plan_offsets(deviations, tolerance)
+        assert len(plan) == len(prices)
+        assert all(abs(o) <= tolerance for o in plan)
+        assert all(abs(a - b) <= 1 for a, b in zip(plan, plan[1:]))
+
+
+@pytest.mark.parametrize("preset", [HvacPresets.Normal, HvacPresets.Away])
+def test_unconstrained_plan_matches_heuristic(preset):
+    for prices in _horizons():
+        deviations = deviation_timeline(prices, datetime(2023, 12, 13, 3), 0)
+        heuristic = offset_per_day(deviations, prices, 3, preset).values()
+        tolerance = 3 - flat_day_lower_tolerance(prices)
+        shift = -1 if preset is HvacPresets.Away else 0
+        plan = plan_offsets(deviations.values(), tolerance, max_step=2 * tolerance, shift=shift)
+        for h, p, d in zip(heuristic, plan, deviations.values()):
+            if abs(abs(d * tolerance) % 1 - 0.5) > 1e-9:
+                assert h == p
+
+
+def test_planned_offsets_is_timeline():
+    prices = consecutive_days()[0][0]
+    deviations = deviation_timeline(prices, datetime(2023, 12, 13, 3), 0)
+    ret = planned_offsets(deviations, prices, 3)
+    assert ret.start == deviations.start
+    assert len(ret) == len(prices)
+    assert planned_offsets(deviations, prices, None) == {}
+    assert plan_offsets([], 3) == []
+
+
+def test_planner_strategy_is_smoothed():
+    today, tomorrow = consecutive_days()[0]
+    now = datetime(2023, 12, 13, 3)
+    snapshot = OffsetSnapshot(tuple(today), tuple(tomorrow), 0, 3, HvacPresets.Normal, now, strategy=OffsetStrategy.Planner)
+    planned = planned_offsets(deviation_timeline(today + tomorrow, now, 0), today + tomorrow, 3)
+    assert calculate_raw_offsets(snapshot) == clamp_and_smooth(planned, 3)
+
+
+@pytest.mark.parametrize("value,expected", [
+    ("planner", OffsetStrategy.Planner),
+    ("heuristic", OffsetStrategy.Heuristic),
+    ("genetic", OffsetStrategy.Heuristic),
+    (None, OffsetStrategy.Heuristic),
+])
+def test_unknown_strategy_falls_back_to_heuristic(value, expected):
+    assert OffsetFactory.get_strategy(value) is expected
+
+
+def test_plan_192_slots_is_fast():
+    today, tomorrow = consecutive_days()[0]
+    deviations = deviation_timeline(to_quarters(today) + to_quarters(tomorrow), datetime(2023, 12, 13), 0).values()
+    assert len(deviations) == 192
+    start = time.perf_counter()
+    for _ in range(10):
+        plan_offsets(deviations, 10)
+    assert (time.perf_counter() - start) / 10 < 0.02
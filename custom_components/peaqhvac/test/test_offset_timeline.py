@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from ..service.hvac.offset.offset_utils import deviation_timeline, offset_per_day, set_offset_dict
+from ..service.hvac.offset.peakfinder import smooth_transitions
+from ..service.models.offset_timeline import OffsetTimeline
+from ..service.models.offsets_exportmodel import OffsetsExportModel
+from .price_corpus import RECORDED_DAYS, to_quarters
+
+START = datetime(2023, 12, 13)
+
+
+def _timeline(count: int = 48, resolution: int = 60) -> OffsetTimeline:
+    return OffsetTimeline(START, resolution, [i % 7 - 3 for i in range(count)])
+
+
+def test_reads_like_a_dict():
+    timeline = _timeline()
+    as_dict = {START + timedelta(hours=i): float(i % 7 - 3) for i in range(48)}
+    assert timeline == as_dict
+    assert dict(timeline.items()) == as_dict
+    assert list(timeline) == list(as_dict)
+    assert timeline[START + timedelta(hours=5)] == as_dict[START + timedelta(hours=5)]
+    assert START + timedelta(minutes=30) not in timeline
+    assert timeline.get(START - timedelta(hours=1)) is None
+    with pytest.raises(KeyError):
+        timeline[START + timedelta(days=2)]
+
+
+def test_day_is_a_view():
+    timeline = _timeline(192, 15)
+    tomorrow = timeline.day(START.date() + timedelta(days=1))
+    assert len(tomorrow) == 96
+    assert tomorrow.start == START + timedelta(days=1)
+    tomorrow[START + timedelta(days=1)] = 9
+    assert timeline[START + timedelta(days=1)] == 9
+    assert len(timeline.day(START.date() + timedelta(days=2))) == 0
+    assert len(timeline.day(START.date() - timedelta(days=1))) == 0
+
+
+def test_value_at():
+    timeline = _timeline(192, 15)
+    assert timeline.value_at(START - timedelta(minutes=1)) is None
+    assert timeline.value_at(START + timedelta(minutes=44)) == timeline[START + timedelta(minutes=30)]
+    assert timeline.value_at(START + timedelta(days=5)) == timeline.values()[-1]
+    assert OffsetTimeline.empty().value_at(START) is None
+
+
+def test_clamp_and_add():
+    timeline = _timeline().clamp(-2, 2)
+    assert max(timeline.values()) == 2
+    assert min(timeline.values()) == -2
+    added = timeline.add(timeline)
+    assert added.values() == [v * 2 for v in timeline.values()]
+    partial = timeline.add({START: 1})
+    assert partial[START] == timeline[START] + 1
+    assert partial.values()[1:] == timeline.values()[1:]
+
+
+def test_from_mapping_roundtrip():
+    timeline = _timeline(96, 15)
+    assert OffsetTimeline.from_mapping(dict(timeline.items())) == timeline
+    assert OffsetTimeline.from_mapping(timeline) is timeline
+    assert len(OffsetTimeline.from_mapping({})) == 0
+
+
+@pytest.mark.parametrize("keys", [
+    [START, START + timedelta(minutes=15), START + timedelta(minutes=45)],
+    [START, START + timedelta(seconds=90), START + timedelta(seconds=180)],
+])
+def test_from_mapping_rejects_uneven_keys(keys):
+    with pytest.raises(ValueError):
+        OffsetTimeline.from_mapping({k: 0 for k in keys})
+
+
+def test_exported_offsets_are_rounded():
+    model = OffsetsExportModel(peaks=([], []))
+    model.current_offset = OffsetTimeline(START, 60, [-1.6, -1.4, 0.6, 2.2])
+    assert model.current_offset == [-2, -1, 1, 2]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("quarters", [False, True])
+async def test_offset_pipeline_matches_dicts(quarters):
+    prices = RECORDED_DAYS["231213"] + RECORDED_DAYS["231214"]
+    if quarters:
+        prices = to_quarters(prices)
+    now_dt = datetime(2023, 12, 13, 20, 43, 0)
+    as_dict = offset_per_day(
+        day_values=await set_offset_dict(prices, now_dt, 0, {}), all_prices=prices, tolerance=3
+    )
+    as_timeline = offset_per_day(
+        day_values=deviation_timeline(prices, now_dt, 0), all_prices=prices, tolerance=3
+    )
+    assert isinstance(as_timeline, OffsetTimeline)
+    assert as_timeline == as_dict
+    assert smooth_transitions(as_timeline, 3) == smooth_transitions(as_dict, 3)
@@ -2,9 +2,11 @@ from datetime import datetime
 import random
 import pytest
 from ..service.hvac.house_heater.models.calculated_offset import CalculatedOffsetModel
-from ..service.hvac.offset.offset_utils import (offset_per_day, set_offset_dict, adjust_to_threshold)
+from ..service.hvac.offset.offset_utils import (offset_per_day, set_offset_dict, adjust_to_threshold,
+                                                 deviation_from_mean_array)
 from ..service.hvac.offset.peakfinder import smooth_transitions
 from ..service.models.enums.hvac_presets import HvacPresets
+from .price_corpus import consecutive_days, to_quarters
 
 P231213 = [1.17, 1.14, 1.14, 1.11, 1.11, 1.14, 1.25, 1.59, 2.09, 2.09, 2.13, 2.14,2.14, 1.61, 1.59, 1.62, 1.61, 1.68, 1.61, 1.52, 1.44, 1.36, 1.38, 1.27]
 P231214 = [1.17, 1.15, 1.16, 1.16, 1.19, 1.24, 1.47, 1.81, 1.97, 2.19, 2.19, 1.92,1.81, 1.99, 2.19, 2.73, 2.73, 2.63, 2.11, 1.81, 1.62, 1.43, 1.41, 1.28]
@@ -97,4 +99,56 @@ async def test_adjust_to_treshold_no_exceeding_values():
     for k,v in smooth.items():
         model = CalculatedOffsetModel(current_offset=v, current_tempdiff=random.uniform(-1, 1), current_temp_trend_offset=random.uniform(-1, 1))
         adj = adjust_to_threshold(model, 0, _tolerance)
-        assert abs(adj) <= _tolerance
\ No newline at end of file
+        assert abs(adj) <= _tolerance
+
+def _reference_deviation_from_mean(prices, min_price, dt):
+    """The original per-element implementation, kept to verify the single-pass one."""
+    from datetime import timedelta
+    from statistics import mean, stdev
+    delta = 60 if len(prices) in (23, 24, 25, 47, 48, 49) else 15
+    dt_lister = dt.replace(hour=0)
+    min_list_price = min(min(prices), 0)
+    shifted_prices = [p - min_list_price for p in prices]
+    standardized_prices = [(p - mean(shifted_prices)) / stdev(shifted_prices) for p in shifted_prices]
+    avg = mean(standardized_prices)
+    devi = stdev(standardized_prices)
+    avg2 = avg
+    devi2 = devi
+    if dt.hour >= 13:
+        avg2 = mean(standardized_prices[13:])
+        devi2 = stdev(standardized_prices[13:])
+    ret = {}
+    for i, num in enumerate(standardized_prices):
+        _devi = devi if i < 13 else devi2
+        _avg = avg if i < 13 else avg2
+        deviation = (num - _avg) / _devi
+        if _devi < 1:
+            deviation *= 0.5
+        if num <= min_price:
+            setval = min(round(deviation, 2), 0)
+        elif num <= min_price * 2:
+            setval = deviation - 1 if deviation > 1 else deviation
+            setval = round(setval, 2)
+        else:
+            setval = round(deviation, 2)
+        ret[dt_lister + timedelta(minutes=delta * i)] = setval
+    return ret
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("quarters", [False, True])
+@pytest.mark.parametrize("hour", [3, 20])
+@pytest.mark.parametrize("min_price", [0, 0.1])
+async def test_deviation_matches_reference_over_corpus(quarters, hour, min_price):
+    for today, tomorrow in consecutive_days():
+        prices = today + tomorrow
+        if quarters:
+            prices = to_quarters(prices)
+        now_dt = datetime(2023, 12, 13, hour, 43, 0)
+        expected = _reference_deviation_from_mean(prices, min_price, now_dt.replace(minute=0))
+        assert await set_offset_dict(prices, now_dt, min_price, {}) == expected
+        assert list(deviation_from_mean_array(prices, min_price, now_dt)) == list(expected.values())
+
+
+def test_deviation_array_empty():
+    assert len(deviation_from_mean_array([], 0, datetime(2023, 12, 13, 20, 43, 0))) == 0
@@ -1,5 +1,7 @@
 import pytest
-from ..service.hvac.offset.peakfinder import identify_peaks
+from ..service.hvac.offset.peakfinder import (get_resolution, identify_peaks,
+                                             identify_valleys)
+from .price_corpus import to_quarters
 
 P240910 = [0.07,0.07,0.06,0.06,0.07,0.07,0.08,0.11,0.11,0.11,0.11,0.1,0.08,0.08,0.08,0.08,0.08,0.12,0.12,0.12,0.11,0.1,0.08,0.08]
 P240911 = [0.08,0.08,0.08,0.08,0.09,0.11,0.13,0.21,0.6,0.6,0.6,0.59,0.4,0.37,0.32,0.15,0.22,0.35,0.3,0.21,0.14,0.12,0.12,0.11]
@@ -13,5 +15,34 @@ def test_single_peak():
     assert peaks == [17]
 
 
+def test_single_peak_quarters():
+    prices = to_quarters(P240911)
+    prices[68:72] = [0.30, 0.35, 0.42, 0.31]
+    peaks = identify_peaks(prices)
+    assert peaks.resolution == 15
+    assert peaks.slots_per_day == 96
+    assert peaks == [70]
 
 
+def test_peaks_beyond_first_day_are_kept():
+    peaks = identify_peaks(P240910 + P240911)
+    assert peaks.resolution == 60
+    assert 24 + 17 in peaks
+
+
+def test_valleys_resolution():
+    valleys = identify_valleys(to_quarters(P240911 + P240910))
+    assert valleys.resolution == 15
+    assert all(0 <= v < 192 for v in valleys)
+
+
+def test_empty_prices():
+    assert identify_peaks([]) == []
+    assert identify_valleys([]) == []
+
+
+def test_empty_prices_are_hourly():
+    assert identify_peaks([]).resolution == 60
+    assert identify_valleys([]).resolution == 60
+    assert get_resolution([]) == 60
+
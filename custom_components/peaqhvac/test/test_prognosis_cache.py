@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta, timezone
+
+from ..service.hub.prognosis_cache import PrognosisCache
+from ..service.hub.weather_prognosis import WeatherPrognosis
+from ..service.models.weather_object import WeatherObject
+
+
+def _forecast(hours: int = 24, base: float = -3) -> list[WeatherObject]:
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    return [
+        WeatherObject((now + timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M:%S+00:00"), "cloudy", base + i % 5, 4.2, 180, 10, 0)
+        for i in range(hours)
+    ]
+
+
+def _prognosis() -> WeatherPrognosis:
+    prognosis = WeatherPrognosis(None, None, None, None)
+    prognosis.prognosis_list = _forecast()
+    return prognosis
+
+
+def test_same_rounded_temperature_is_a_hit():
+    prognosis = _prognosis()
+    first = prognosis.get_hvac_prognosis(-1.51)
+    second = prognosis.get_hvac_prognosis(-1.49)
+    assert second is first
+    assert prognosis.cache.hits == 1
+    assert prognosis.cache.misses == 1
+
+
+def test_computation_uses_the_unrounded_temperature():
+    prognosis = _prognosis()
+    first = prognosis.get_hvac_prognosis(2.04)
+    assert first.base_temp == 2.04
+    assert first == _prognosis()._compute_hvac_prognosis(2.04, first.DT[0] - timedelta(hours=1))
+    assert prognosis.get_hvac_prognosis(2.0) is first
+
+
+def test_other_temperature_is_a_miss():
+    prognosis = _prognosis()
+    first = prognosis.get_hvac_prognosis(-1.5)
+    second = prognosis.get_hvac_prognosis(-1.3)
+    assert second is not first
+    assert prognosis.cache.misses == 2
+
+
+def test_new_forecast_invalidates():
+    prognosis = _prognosis()
+    version = prognosis.forecast_version
+    first = prognosis.get_hvac_prognosis(0)
+    prognosis.prognosis_list = _forecast(base=5)
+    assert prognosis.forecast_version == version + 1
+    second = prognosis.get_hvac_prognosis(0)
+    assert second is not first
+    assert second[0].prognosis_temp != first[0].prognosis_temp
+
+
+def test_empty_prognosis_is_not_cached():
+    prognosis = WeatherPrognosis(None, None, None, None)
+    assert prognosis.get_hvac_prognosis(0) == []
+    assert prognosis.cache.computes == 0
+    assert prognosis.get_hvac_prognosis("unknown") == []
+
+
+def test_oldest_entry_is_evicted():
+    cache = PrognosisCache(maxsize=2)
+    hour = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+    for i in range(3):
+        cache.put(cache.key(1, i, hour), [i], 0.001)
+    assert cache.get(cache.key(1, 0, hour)) is None
+    assert cache.get(cache.key(1, 2, hour)) == [2]
+    assert cache.metrics["size"] == 2
+
+
+def test_metrics():
+    prognosis = _prognosis()
+    for t in (1.0, 1.01, 1.02, 1.5):
+        prognosis.get_hvac_prognosis(t)
+    metrics = prognosis.cache.metrics
+    assert metrics["hits"] == 2
+    assert metrics["misses"] == 2
+    assert metrics["computes"] == 2
+    assert metrics["hit_ratio"] == 0.5
+    assert metrics["compute_ms_total"] >= 0
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from ..service.hvac.offset.recalculation_scheduler import RecalculationScheduler
+
+
+class _Recalculation:
+    def __init__(self, duration: float = 0):
+        self.calls = 0
+        self.duration = duration
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.duration)
+        return self.calls
+
+
+@pytest.mark.asyncio
+async def test_triggers_within_window_coalesce():
+    func = _Recalculation()
+    scheduler = RecalculationScheduler(func, window=0.01)
+    for _ in range(4):
+        scheduler.trigger()
+    assert await scheduler.async_trigger() == 1
+    assert func.calls == 1
+    assert scheduler.metrics == {"triggers": 5, "recomputes": 1, "coalesced": 4}
+
+
+@pytest.mark.asyncio
+async def test_trigger_while_running_shares_result_and_reruns():
+    func = _Recalculation(duration=0.05)
+    scheduler = RecalculationScheduler(func, window=0.01)
+    first = scheduler.trigger()
+    await asyncio.sleep(0.03)
+    assert await scheduler.async_trigger() == 1
+    assert first.result() == 1
+    await asyncio.sleep(0.1)
+    assert func.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_failing_recalculation_resolves_waiters():
+    async def _fail():
+        raise ValueError("boom")
+    scheduler = RecalculationScheduler(_fail, window=0.01)
+    assert await scheduler.async_trigger() is None
+    assert await scheduler.async_trigger() is None
+    assert scheduler.recompute_count == 2
+
+
+@pytest.mark.asyncio
+async def test_stop_cancels_pending_run():
+    func = _Recalculation()
+    scheduler = RecalculationScheduler(func, window=0.02)
+    pending = scheduler.trigger()
+    scheduler.stop()
+    await asyncio.sleep(0.05)
+    assert func.calls == 0
+    assert pending.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_stop_cancels_run_in_flight_without_rerun():
+    func = _Recalculation(duration=0.1)
+    scheduler = RecalculationScheduler(func, window=0.01)
+    scheduler.trigger()
+    await asyncio.sleep(0.03)
+    scheduler.trigger()
+    scheduler.stop()
+    await asyncio.sleep(0.05)
+    assert func.calls == 1
+    assert scheduler._task is None
+    assert scheduler._scheduled is None
@@ -0,0 +1,78 @@
+import math
+from datetime import datetime, timedelta
+
+import pytest
+
+from ..service.models.enums.offset_strategy import OffsetStrategy
+from .replay.replay_engine import replay
+from .replay.replay_hass import EVENT_FILTER_TAKES_DATA, ReplayBus
+from .replay.trace import Trace, TraceRecord
+from .price_corpus import year_of_days
+
+
+def _trace(days: int = 2, quarters: bool = True) -> Trace:
+    records = []
+    for day, prices in year_of_days(days=days, quarters=quarters):
+        step = 24 * 60 // len(prices)
+        for i, p in enumerate(prices):
+            dt = datetime.combine(day, datetime.min.time()) + timedelta(minutes=step * i)
+            outdoor = -4 + 3 * math.sin(2 * math.pi * (i * step / 1440 - 0.3))
+            records.append(TraceRecord(dt, p, 21 + 0.3 * math.sin(i / 7), round(outdoor, 1), -100 - (i % 20) * 10, 45 - (i % 48) * 0.4))
+    return Trace(records)
+
+
+@pytest.fixture(scope="module")
+def trace():
+    return _trace()
+
+
+@pytest.fixture(scope="module")
+def heuristic_result(trace):
+    return replay(trace)
+
+
+def test_replay_sets_offsets_within_tolerance(trace, heuristic_result):
+    offset_calls = [c for c in heuristic_result.service_calls if c.service == "set_value"]
+    assert len(offset_calls) > 0
+    assert all(abs(c.data["value"]) <= 3 for c in offset_calls)
+    assert len(heuristic_result.offsets) == len(trace)
+    assert heuristic_result.cost > 0
+    assert heuristic_result.energy_kwh > 0
+
+
+def test_replay_is_deterministic(trace, heuristic_result):
+    again = replay(trace)
+    assert again.service_calls == heuristic_result.service_calls
+    assert again.offsets == heuristic_result.offsets
+    assert again.cost == heuristic_result.cost
+
+
+def test_replay_compares_strategies(trace, heuristic_result):
+    planned = replay(trace, strategy=OffsetStrategy.Planner)
+    assert len(planned.offsets) == len(heuristic_result.offsets)
+    assert all(abs(o) <= 3 for o in planned.offsets)
+    assert planned.cost > 0
+
+
+def test_trace_csv_roundtrip(tmp_path):
+    trace = _trace(days=1, quarters=False)
+    path = tmp_path / "trace.csv"
+    trace.to_csv(str(path))
+    loaded = Trace.from_csv(str(path))
+    assert loaded.records == trace.records
+    assert loaded.resolution == 60
+    assert loaded.prices(trace.records[0].dt.date()) == [r.price for r in trace.records]
+
+
+def test_bus_filters_with_the_installed_signature():
+    bus = ReplayBus()
+    received = []
+
+    def event_filter(arg):
+        data = arg if EVENT_FILTER_TAKES_DATA else arg.data
+        return data["entity_id"] == "sensor.a"
+
+    bus.async_listen("custom", received.append, event_filter=event_filter)
+    bus.async_fire("custom", {"entity_id": "sensor.a"})
+    bus.async_fire("custom", {"entity_id": "sensor.b"})
+    assert [e.data["entity_id"] for e in received] == ["sensor.a"]
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from ..service.hub.state_batcher import StateChangeBatcher
+
+
+class _Pipeline:
+    def __init__(self):
+        self.batches = []
+
+    async def async_process(self, changes: dict):
+        self.batches.append(dict(changes))
+
+
+@pytest.mark.asyncio
+async def test_burst_runs_pipeline_once():
+    pipeline = _Pipeline()
+    batcher = StateChangeBatcher(pipeline.async_process, window=0.01)
+    for i in range(10):
+        batcher.add(f"sensor.temp_{i}", str(i))
+    assert pipeline.batches == []
+    await asyncio.sleep(0.05)
+    assert len(pipeline.batches) == 1
+    assert len(pipeline.batches[0]) == 10
+    assert batcher.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_latest_value_per_entity_wins():
+    pipeline = _Pipeline()
+    batcher = StateChangeBatcher(pipeline.async_process, window=0.01)
+    batcher.add("sensor.outdoor", "1.0")
+    batcher.add("sensor.indoor", "21.0")
+    batcher.add("sensor.outdoor", "2.0")
+    await batcher.async_flush()
+    assert pipeline.batches == [{"sensor.outdoor": "2.0", "sensor.indoor": "21.0"}]
+    await asyncio.sleep(0.03)
+    assert len(pipeline.batches) == 1
+
+
+@pytest.mark.asyncio
+async def test_changes_during_processing_go_to_next_batch():
+    processed = []
+    batcher = None
+
+    async def async_process(changes: dict):
+        processed.append(dict(changes))
+        if len(processed) == 1:
+            batcher.add("sensor.late", "x")
+
+    batcher = StateChangeBatcher(async_process, window=0.01)
+    batcher.add("sensor.early", "y")
+    await asyncio.sleep(0.05)
+    assert processed == [{"sensor.early": "y"}, {"sensor.late": "x"}]
+
+
+@pytest.mark.asyncio
+async def test_failing_pipeline_is_logged_and_counted():
+    async def async_process(changes: dict):
+        raise ValueError("boom")
+
+    batcher = StateChangeBatcher(async_process, window=0.01)
+    batcher.add("sensor.a", "1")
+    await batcher.async_flush()
+    assert batcher.batches == 1
+    assert batcher.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_metrics():
+    pipeline = _Pipeline()
+    batcher = StateChangeBatcher(pipeline.async_process, window=0.01)
+    batcher.add("sensor.a", "1")
+    batcher.add("sensor.a", "2")
+    batcher.add("sensor.b", "1")
+    await batcher.async_flush()
+    batcher.add("sensor.c", "1")
+    await batcher.async_flush()
+    metrics = batcher.metrics
+    assert metrics["batches"] == 2
+    assert metrics["changes"] == 4
+    assert metrics["coalesced"] == 1
+    assert metrics["last_batch_size"] == 1
+    assert metrics["max_batch_size"] == 2
+    assert metrics["mean_batch_size"] == 1.5
+    assert metrics["count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_cancel_drops_pending():
+    pipeline = _Pipeline()
+    batcher = StateChangeBatcher(pipeline.async_process, window=0.01)
+    batcher.add("sensor.a", "1")
+    batcher.cancel()
+    await asyncio.sleep(0.03)
+    assert pipeline.batches == []
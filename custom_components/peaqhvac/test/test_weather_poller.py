@@ -0,0 +1,186 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from ..service.hub.weather_poller import WeatherPoller
+from ..service.hub.weather_prognosis import WeatherPrognosis
+from ..service.models.enums.weather_poll_result import WeatherPollResult
+
+
+class _Poll:
+    def __init__(self, *results: WeatherPollResult):
+        self.results = list(results)
+        self.calls = 0
+
+    async def __call__(self) -> WeatherPollResult:
+        self.calls += 1
+        return self.results.pop(0) if self.results else WeatherPollResult.Unchanged
+
+
+def _intervals(poller: WeatherPoller, results: list[WeatherPollResult]) -> list[float]:
+    ret = []
+    for result in results:
+        poller._update(result, 0)
+        ret.append(poller.interval)
+    return ret
+
+
+def test_stable_forecast_backs_off_to_max():
+    poller = WeatherPoller(_Poll(), min_interval=30, max_interval=300)
+    assert _intervals(poller, [WeatherPollResult.Unchanged] * 5) == [60, 120, 240, 300, 300]
+
+
+def test_change_polls_fast_again():
+    poller = WeatherPoller(_Poll(), min_interval=30, max_interval=300)
+    _intervals(poller, [WeatherPollResult.Unchanged] * 3)
+    assert _intervals(poller, [WeatherPollResult.Changed, WeatherPollResult.Unchanged]) == [30, 60]
+
+
+def test_failures_back_off_and_recover():
+    poller = WeatherPoller(_Poll(), min_interval=30, max_interval=300, failure_max_interval=200)
+    _intervals(poller, [WeatherPollResult.Unchanged] * 4)
+    assert _intervals(poller, [WeatherPollResult.Failed] * 4) == [60, 120, 200, 200]
+    assert poller.failures == 4
+    assert _intervals(poller, [WeatherPollResult.Unchanged]) == [30]
+    assert poller.failures == 0
+    assert poller.failed == 4
+
+
+class _SlowPoll(_Poll):
+    def __init__(self, duration: float):
+        super().__init__()
+        self.duration = duration
+
+    async def __call__(self) -> WeatherPollResult:
+        self.calls += 1
+        await asyncio.sleep(self.duration)
+        return WeatherPollResult.Changed
+
+
+async def _first_poll(poller: WeatherPoller) -> None:
+    poller.start()
+    await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_start_polls_and_schedules():
+    poll = _Poll(WeatherPollResult.Changed)
+    poller = WeatherPoller(poll, min_interval=0.02, max_interval=0.04)
+    await _first_poll(poller)
+    assert poll.calls == 1
+    assert poller.is_running
+    await asyncio.sleep(0.1)
+    poller.stop()
+    assert 2 <= poll.calls <= 4
+    assert not poller.is_running
+
+
+@pytest.mark.asyncio
+async def test_refresh_polls_now_but_not_sooner_than_min_interval():
+    poll = _Poll()
+    poller = WeatherPoller(poll, min_interval=0.05, max_interval=10)
+    await _first_poll(poller)
+    poller.refresh()
+    await asyncio.sleep(0.02)
+    assert poll.calls == 1
+    await asyncio.sleep(0.06)
+    assert poll.calls == 2
+    poller.refresh()
+    poller.refresh()
+    await asyncio.sleep(0.08)
+    assert poll.calls == 3
+    poller.stop()
+
+
+@pytest.mark.asyncio
+async def test_poll_that_raises_counts_as_failed():
+    async def poll():
+        raise RuntimeError("weather integration is down")
+
+    poller = WeatherPoller(poll, min_interval=10)
+    await _first_poll(poller)
+    poller.stop()
+    assert poller.failures == 1
+    assert poller.staleness is None
+
+
+@pytest.mark.asyncio
+async def test_metrics():
+    poller = WeatherPoller(_Poll(WeatherPollResult.Changed), min_interval=10)
+    await _first_poll(poller)
+    poller.stop()
+    metrics = poller.metrics
+    assert metrics["calls_per_hour"] == 1
+    assert metrics["changes"] == 1
+    assert metrics["interval_s"] == 10
+    assert 0 <= metrics["staleness_s"] < 1
+    assert metrics["since_change_s"] is not None
+
+
+@pytest.mark.asyncio
+async def test_start_does_not_wait_for_the_first_poll():
+    poll = _SlowPoll(0.05)
+    poller = WeatherPoller(poll, min_interval=10)
+    poller.start()
+    assert poller.is_running
+    assert poll.calls == 0
+    await asyncio.sleep(0.01)
+    assert poll.calls == 1
+    assert poller.staleness is None
+    poller.start()
+    poller.refresh()
+    await asyncio.sleep(0.08)
+    assert poll.calls == 1
+    assert poller.changes == 1
+    poller.stop()
+
+
+def _hass(response=None, error: Exception | None = None):
+    async def async_call(*args, **kwargs):
+        if error is not None:
+            raise error
+        return response
+
+    return SimpleNamespace(services=SimpleNamespace(async_call=async_call))
+
+
+def _forecast(temperature: float) -> dict:
+    return {"weather.home": {"forecast": [{
+        "datetime": "2024-03-01T12:00:00+00:00",
+        "condition": "cloudy",
+        "temperature": temperature,
+        "wind_speed": 3,
+        "wind_bearing": 180,
+        "precipitation_probability": 0,
+        "precipitation": 0,
+    }]}}
+
+
+@pytest.mark.asyncio
+async def test_update_weather_prognosis_reports_result():
+    observer = SimpleNamespace(async_broadcast=lambda *args: asyncio.sleep(0))
+    prognosis = WeatherPrognosis(_hass(_forecast(1)), None, observer, "weather.home")
+    assert await prognosis.update_weather_prognosis() is WeatherPollResult.Changed
+    assert await prognosis.update_weather_prognosis() is WeatherPollResult.Unchanged
+    prognosis._hass = _hass(_forecast(2))
+    assert await prognosis.update_weather_prognosis() is WeatherPollResult.Changed
+    prognosis._hass = _hass({"weather.home": {"forecast": []}})
+    assert await prognosis.update_weather_prognosis() is WeatherPollResult.Failed
+    prognosis._hass = _hass(error=RuntimeError("down"))
+    assert await prognosis.update_weather_prognosis() is WeatherPollResult.Failed
+
+
+@pytest.mark.asyncio
+async def test_export_model_follows_a_changed_poll():
+    observer = SimpleNamespace(async_broadcast=lambda *args: asyncio.sleep(0))
+    prognosis = WeatherPrognosis(_hass(_forecast(1)), None, observer, "weather.home")
+    exports = []
+
+    async def export(*args):
+        exports.append(prognosis.forecast_version)
+
+    prognosis.async_update_export_model = export
+    assert await prognosis.async_update_weather() is WeatherPollResult.Changed
+    assert await prognosis.async_update_weather() is WeatherPollResult.Unchanged
+    assert exports == [1]
@@ -0,0 +1,229 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from ..service.hub.weather_adjustment import hourly_adjustment
+from ..service.hub.weather_prognosis import WeatherPrognosis
+from ..service.models.offset_timeline import OffsetTimeline
+from ..service.models.prognosis_columns import PrognosisColumns
+from ..service.models.prognosis_export_model import PrognosisExportModel
+from ..service.models.weather_object import WeatherObject, parse_datetime
+
+
+def _midnight(days: int = 0) -> datetime:
+    return datetime.combine(datetime.now().date() + timedelta(days=days), datetime.min.time())
+
+
+def _export(hours: int = 72, base_temp: float = 0) -> list[PrognosisExportModel]:
+    start = _midnight().astimezone(timezone.utc)
+    return [
+        PrognosisExportModel(
+            prognosis_temp=-6 + i % 9,
+            corrected_temp=-6 + i % 9,
+            windchill_temp=-8 + i % 9,
+            DT=start + timedelta(hours=i),
+            TimeDelta=i % 12,
+            _base_temp=base_temp
+        )
+        for i in range(hours)
+    ]
+
+
+def _prognosis(export: list[PrognosisExportModel]) -> WeatherPrognosis:
+    prognosis = WeatherPrognosis(None, None, None, None)
+    prognosis.set_export_model(export)
+    return prognosis
+
+
+def _offsets(start: datetime, resolution: int = 15, days: int = 2) -> OffsetTimeline:
+    slots = days * 24 * 60 // resolution
+    return OffsetTimeline(start, resolution, [(i // 7) % 5 - 2 for i in range(slots)])
+
+
+def _linear_two_hour_prog(export: list[PrognosisExportModel], thishour: datetime):
+    for p in export:
+        if timedelta.total_seconds(p.DT - thishour) == 10800:
+            return p
+    return None
+
+
+def test_indexed_lookup_matches_linear_scan():
+    export = _export()
+    prognosis = _prognosis(export)
+    for hour in range(24):
+        thishour = _midnight().replace(hour=hour).astimezone(timezone.utc)
+        assert prognosis._get_two_hour_prog(thishour) is _linear_two_hour_prog(export, thishour)
+
+
+def test_hourly_adjustment_uses_the_prognosis_three_hours_ahead():
+    export = _export()
+    prognosis = _prognosis(export)
+    for hour in range(24):
+        thishour = _midnight().replace(hour=hour).astimezone(timezone.utc)
+        expected = hourly_adjustment(_linear_two_hour_prog(export, thishour), 1)
+        assert prognosis._get_weatherprognosis_hourly_adjustment(hour, 1) == expected
+
+
+def test_adjustment_matches_no_slots():
+    prognosis = _prognosis(_export())
+    offsets = _offsets(_midnight())
+    assert prognosis.get_weatherprognosis_adjustment(offsets) == {}
+    assert prognosis.get_weatherprognosis_adjustment(dict(offsets.items())) == {}
+
+
+def test_adjustment_does_not_touch_raw_offsets():
+    prognosis = _prognosis(_export())
+    offsets = _offsets(_midnight())
+    before = offsets.values()
+    prognosis.get_weatherprognosis_adjustment(offsets)
+    assert offsets.values() == before
+
+
+def test_adjustment_snapshot_is_detached_from_prognosis():
+    prognosis = _prognosis(_export())
+    snapshot = prognosis.adjustment_snapshot()
+    expected = [prognosis._get_weatherprognosis_hourly_adjustment(hour, 0) for hour in range(24)]
+    prognosis.set_export_model([])
+    assert [prognosis._get_weatherprognosis_hourly_adjustment(hour, 0) for hour in range(24)] == [0] * 24
+    assert [snapshot.hourly(hour, 0) for hour in range(24)] == expected
+
+
+def _payload(hours: int = 48, base: float = -2) -> list[dict]:
+    start = _midnight(1)
+    return [
+        {
+            "datetime": (start + timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M:%S+00:00"),
+            "condition": "cloudy",
+            "temperature": base + i % 6,
+            "wind_speed": 3.5,
+            "wind_bearing": 200,
+            "precipitation_probability": 5,
+            "precipitation": 0,
+        }
+        for i in range(hours)
+    ]
+
+
+class _Observer:
+    def __init__(self):
+        self.broadcasts = []
+
+    async def async_broadcast(self, command, argument=None):
+        self.broadcasts.append(command)
+
+
+def _ingesting_prognosis() -> WeatherPrognosis:
+    return WeatherPrognosis(None, None, _Observer(), None)
+
+
+@pytest.mark.parametrize("value,expected", [
+    ("2024-03-01T12:00:00+00:00", datetime(2024, 3, 1, 12, tzinfo=timezone.utc)),
+    ("2024-03-01T13:00:00+01:00", datetime(2024, 3, 1, 12, tzinfo=timezone.utc)),
+    ("2024-03-01T07:30:00-04:30", datetime(2024, 3, 1, 12, tzinfo=timezone.utc)),
+    ("2024-03-01T12:00:00Z", datetime(2024, 3, 1, 12, tzinfo=timezone.utc)),
+    ("2024-03-01T12:00:00", datetime(2024, 3, 1, 12, tzinfo=timezone.utc)),
+])
+def test_parse_datetime(value, expected):
+    dt = parse_datetime(value)
+    assert dt == expected
+    assert dt.tzinfo is timezone.utc
+
+
+def test_weather_object_is_slotted():
+    w = WeatherObject("2024-03-01T12:00:00+00:00", "cloudy", 1, 2, 3, 4, 5)
+    assert not hasattr(w, "__dict__")
+    assert w.DT == datetime(2024, 3, 1, 12, tzinfo=timezone.utc)
+
+
+@pytest.mark.asyncio
+async def test_unchanged_forecast_is_not_parsed_again():
+    prognosis = _ingesting_prognosis()
+    await prognosis.async_set_prognosis(_payload())
+    parsed = prognosis.prognosis_list
+    version = prognosis.forecast_version
+    await prognosis.async_set_prognosis(_payload())
+    assert prognosis.prognosis_list is parsed
+    assert prognosis.forecast_version == version
+    assert len(prognosis.observer.broadcasts) == 1
+
+
+@pytest.mark.asyncio
+async def test_changed_forecast_is_parsed():
+    prognosis = _ingesting_prognosis()
+    await prognosis.async_set_prognosis(_payload())
+    await prognosis.async_set_prognosis(_payload(base=3))
+    assert prognosis.prognosis_list[0].Temperature == 3
+    assert len(prognosis.observer.broadcasts) == 2
+
+
+@pytest.mark.asyncio
+async def test_same_forecast_in_other_offset_is_not_a_change():
+    prognosis = _ingesting_prognosis()
+    await prognosis.async_set_prognosis(_payload())
+    utc = prognosis.prognosis_list
+    await prognosis.async_set_prognosis([
+        {**p, "datetime": parse_datetime(p["datetime"]).astimezone(timezone(timedelta(hours=2))).isoformat()}
+        for p in _payload()
+    ])
+    assert prognosis.prognosis_list is utc
+    assert len(prognosis.observer.broadcasts) == 1
+
+
+@pytest.mark.asyncio
+async def test_malformed_forecast_keeps_previous():
+    prognosis = _ingesting_prognosis()
+    await prognosis.async_set_prognosis(_payload())
+    parsed = prognosis.prognosis_list
+    await prognosis.async_set_prognosis([{"datetime": "2024-03-01T12:00:00+00:00"}])
+    assert prognosis.prognosis_list is parsed
+
+
+def _reference_hvac_prognosis(forecast: list[WeatherObject], temperature: float, now: datetime) -> list:
+    """The hour-by-hour calculation the columnar pass replaced."""
+    ret = []
+    corrected_temp_delta = 0
+    for p in [p for p in forecast if p.DT >= now]:
+        c = p.DT - now
+        if c.seconds == 0:
+            corrected_temp_delta = round(temperature - p.Temperature, 2)
+            continue
+        temp = p.Temperature
+        if 3600 <= c.seconds <= 14400:
+            temp = round(p.Temperature + corrected_temp_delta * (1 / (c.seconds / 3600)), 1)
+        windchill = 13.12
+        windchill += 0.6215 * temp
+        windchill -= 11.37 * p.Wind_Speed ** 0.16
+        windchill += 0.3965 * temp * p.Wind_Speed ** 0.16
+        ret.append(PrognosisExportModel(p.Temperature, temp, round(windchill, 1), p.DT, int(c.seconds / 3600), temperature))
+    return ret
+
+
+def _forecast_objects(hours: int = 240) -> list[WeatherObject]:
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    return [
+        WeatherObject((now + timedelta(hours=i)).isoformat(), "cloudy", -7 + (i * 7) % 13 / 2, (i * 3) % 11 / 1.5, 180, 0, 0)
+        for i in range(-2, hours)
+    ]
+
+
+@pytest.mark.parametrize("temperature", [-12.3, -0.5, 0, 4.4, 17.9])
+def test_columnar_prognosis_matches_hourly_calculation(temperature):
+    prognosis = WeatherPrognosis(None, None, None, None)
+    prognosis.prognosis_list = _forecast_objects()
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    ret = prognosis.get_hvac_prognosis(temperature)
+    assert isinstance(ret, PrognosisColumns)
+    assert ret == _reference_hvac_prognosis(prognosis.prognosis_list, temperature, now)
+
+
+def test_export_rows_are_built_lazily():
+    prognosis = WeatherPrognosis(None, None, None, None)
+    prognosis.prognosis_list = _forecast_objects()
+    ret = prognosis.get_hvac_prognosis(1.5)
+    assert ret.materialized == 0
+    prognosis.set_export_model(ret)
+    assert ret.materialized == 0
+    prognosis.adjustment_snapshot()
+    assert 0 < ret.materialized <= 24
+    assert ret[5] is ret[5]
+    assert ret[5].delta_temp_from_now == ret.delta_temp_from_now[5]